@@ -0,0 +1,320 @@
+import numpy as np
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ölçümler başsız çalışır: pygame gerçek pencere açmaz
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Bu betiğin bulunduğu dizin (alt süreçler modülleri buradan içe aktarır)
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Metrik adı -> (birim, yüksek değer daha mı iyi)
+METRICS = {
+    'env_steps_per_sec': ("adım/sn", True),
+    'env_resets_per_sec': ("reset/sn", True),
+    'render_frames_per_sec': ("kare/sn", True),
+    'train_episodes_per_sec': ("episode/sn", True),
+    'inference_latency_us': ("µs", False),
+    'inference_latency_p99_us': ("µs", False),
+    'policy_latency_us': ("µs", False),
+    'import_time': ("sn", False),
+    'first_construct_time': ("sn", False),
+    'construct_time': ("sn", False),
+    'process_time': ("sn", False),
+    'peak_rss_mb': ("MB", False),
+}
+
+# Alt süreçte soğuk import süresini ve pygame'in yüklenip yüklenmediğini ölç
+_IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import custom_taxi_env
+import_time = time.perf_counter() - start
+start = time.perf_counter()
+env = custom_taxi_env.CustomTaxiEnv()
+construct_time = time.perf_counter() - start
+print(import_time, construct_time, int('pygame' in sys.modules))
+"""
+
+
+def bench_startup(repeats=5):
+    """
+    İşçi başlatma maliyetini ölç (her ölçüm yeni bir Python süreci):
+    - import_time: custom_taxi_env modülünün soğuk import süresi
+    - first_construct_time: süreçteki ilk CustomTaxiEnv() süresi
+    - process_time: süreç başlatma + import + ilk ortam (toplam duvar saati)
+    - pygame_loaded: render() çağrılmadan pygame yüklendi mi
+    """
+    import_times = []
+    construct_times = []
+    process_times = []
+    pygame_loaded = False
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], cwd=PROJECT_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        process_times.append(time.perf_counter() - start)
+
+        import_time, construct_time, loaded = output.split()[-3:]
+        import_times.append(float(import_time))
+        construct_times.append(float(construct_time))
+        pygame_loaded |= bool(int(loaded))
+
+    return {
+        'import_time': float(np.median(import_times)),
+        'first_construct_time': float(np.median(construct_times)),
+        'process_time': float(np.median(process_times)),
+        'pygame_loaded': pygame_loaded,
+    }
+
+
+def bench_construction(repeats=200):
+    """Sıcak süreçte CustomTaxiEnv() oluşturma süresi (saniye/ortam)"""
+    from custom_taxi_env import CustomTaxiEnv
+
+    CustomTaxiEnv().close()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        CustomTaxiEnv().close()
+    return {'construct_time': (time.perf_counter() - start) / repeats}
+
+
+def bench_env_step(steps=200000, seed=0):
+    """Skaler CustomTaxiEnv.step() hızı (rastgele aksiyonlar, biten episode reset)"""
+    from custom_taxi_env import CustomTaxiEnv
+
+    env = CustomTaxiEnv()
+    env.reset(seed=seed)
+    actions = np.random.default_rng(seed).integers(env.action_space.n, size=steps).tolist()
+
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(action)
+        if done:
+            env.reset()
+    elapsed = time.perf_counter() - start
+
+    env.close()
+    return {'env_steps_per_sec': steps / elapsed}
+
+
+def bench_env_reset(resets=100000, seed=0):
+    """CustomTaxiEnv.reset() hızı"""
+    from custom_taxi_env import CustomTaxiEnv
+
+    env = CustomTaxiEnv()
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    elapsed = time.perf_counter() - start
+
+    env.close()
+    return {'env_resets_per_sec': resets / elapsed}
+
+
+def bench_render(frames=2000, seed=0):
+    """CustomTaxiEnv.render() hızı (rgb_array: ekransız, FPS sınırı olmadan)"""
+    from custom_taxi_env import CustomTaxiEnv
+
+    env = CustomTaxiEnv(render_mode="rgb_array")
+    env.reset(seed=seed)
+    env.render()
+    actions = np.random.default_rng(seed).integers(env.action_space.n, size=frames).tolist()
+
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(action)
+        if done:
+            env.reset()
+        env.render()
+    elapsed = time.perf_counter() - start
+
+    env.close()
+    return {'render_frames_per_sec': frames / elapsed}
+
+
+def bench_train(episodes=500, seed=0):
+    """train_qtable() episode hızı (geçici dizinde, çıktı bastırılarak)"""
+    from train_qtable import train_qtable
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                train_qtable(episodes=episodes, save_interval=episodes, seed=seed)
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+    return {'train_episodes_per_sec': episodes / elapsed}
+
+
+def bench_inference(queries=100000, seed=0):
+    """
+    Açgözlü aksiyon seçimi gecikmesi: Q-table üzerinde np.argmax(Q[state])
+    ve derlenmiş politikada policy.act(state)
+    """
+    from custom_taxi_env import CustomTaxiEnv
+    from policy import compile_policy
+
+    env = CustomTaxiEnv()
+    rng = np.random.default_rng(seed)
+    Q = rng.normal(size=(env.observation_space.n, env.action_space.n))
+    states = rng.integers(env.observation_space.n, size=queries).tolist()
+    policy = compile_policy(Q, env)
+    env.close()
+
+    latencies = np.empty(queries)
+    clock = time.perf_counter_ns
+    for i, state in enumerate(states):
+        start = clock()
+        np.argmax(Q[state])
+        latencies[i] = clock() - start
+    argmax_latencies = latencies.copy()
+
+    for i, state in enumerate(states):
+        start = clock()
+        policy.act(state)
+        latencies[i] = clock() - start
+
+    return {
+        'inference_latency_us': float(argmax_latencies.mean() / 1e3),
+        'inference_latency_p99_us': float(np.percentile(argmax_latencies, 99) / 1e3),
+        'policy_latency_us': float(latencies.mean() / 1e3),
+    }
+
+
+def peak_rss_mb():
+    """Sürecin en yüksek bellek kullanımı (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_suite(quick=False):
+    """Tüm ölçümleri çalıştır ve tek bir sonuç sözlüğü döndür"""
+    scale = 0.1 if quick else 1.0
+    results = {}
+    results.update(bench_startup(repeats=2 if quick else 5))
+    results.update(bench_construction(repeats=int(200 * scale)))
+    results.update(bench_env_step(steps=int(200000 * scale)))
+    results.update(bench_env_reset(resets=int(100000 * scale)))
+    results.update(bench_render(frames=int(2000 * scale)))
+    results.update(bench_train(episodes=int(500 * scale)))
+    results.update(bench_inference(queries=int(100000 * scale)))
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def compare(results, baseline, threshold=0.10, thresholds=None):
+    """
+    Sonuçları referans ölçümle karşılaştır.
+    Bir metrik, iyi yönün tersine threshold oranından fazla kötüleşirse
+    gerileme sayılır. thresholds ile metrik bazında eşik verilebilir.
+
+    Returns:
+        (metrik, referans, yeni, değişim oranı, gerileme mi) listesi
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name, (unit, higher_is_better) in METRICS.items():
+        if name not in results or name not in baseline or not baseline[name]:
+            continue
+        old, new = baseline[name], results[name]
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        rows.append((name, old, new, change, worse > thresholds.get(name, threshold)))
+    return rows
+
+
+def print_results(results):
+    print("=" * 60)
+    print("PERFORMANS ÖLÇÜMLERİ")
+    print("=" * 60)
+    for name, (unit, _) in METRICS.items():
+        if name in results:
+            print(f"  {name:<28} {results[name]:>14,.4f} {unit}")
+    print("=" * 60)
+
+
+def print_comparison(rows):
+    print("REFERANSA GÖRE")
+    print("-" * 60)
+    for name, old, new, change, regressed in rows:
+        mark = "✗ GERİLEME" if regressed else "✓"
+        print(f"  {name:<28} {old:>12,.4f} → {new:>12,.4f} ({change:+.1%}) {mark}")
+    print("=" * 60)
+
+
+def print_startup(results):
+    print("=" * 60)
+    print("BAŞLANGIÇ SÜRESİ")
+    print("=" * 60)
+    print(f"Import süresi (soğuk): {results['import_time'] * 1e3:.1f} ms")
+    print(f"İlk ortam oluşturma: {results['first_construct_time'] * 1e3:.2f} ms")
+    print(f"Ortam oluşturma (sıcak): {results['construct_time'] * 1e6:.1f} µs")
+    print(f"Süreç başlatma (toplam): {results['process_time'] * 1e3:.1f} ms")
+    print(f"pygame yüklendi mi: {'Evet' if results['pygame_loaded'] else 'Hayır'}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Taksi performans ölçümleri")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="Yalnızca başlangıç süresini ölç")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Soğuk başlangıç ölçümü tekrar sayısı")
+    parser.add_argument("--quick", action="store_true",
+                        help="Daha kısa ölçümler (duman testi)")
+    parser.add_argument("--output", default=None,
+                        help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", default="benchmark_baseline.json",
+                        help="Karşılaştırılacak referans JSON dosyası")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Sonuçları referans olarak kaydet")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="İzin verilen göreli kötüleşme (0.10 = %%10)")
+    parser.add_argument("--metric-threshold", action="append", default=[],
+                        metavar="METRİK=ORAN", help="Metrik bazında eşik")
+    args = parser.parse_args()
+
+    if args.startup_only:
+        results = bench_startup(args.repeats)
+        results.update(bench_construction())
+        print_startup(results)
+        sys.exit(0)
+
+    results = run_suite(quick=args.quick)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Sonuçlar kaydedildi: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Referans kaydedildi: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        thresholds = {name: float(value) for name, value in
+                      (item.split("=", 1) for item in args.metric_threshold)}
+        rows = compare(results, baseline, args.threshold, thresholds)
+        print_comparison(rows)
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
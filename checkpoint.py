@@ -0,0 +1,233 @@
+import numpy as np
+import json
+import os
+import queue
+import re
+import threading
+
+# Eğitici durumu dosyalarının uzantısı (Q checkpoint'iyle aynı adla)
+STATE_SUFFIX = ".state.npz"
+_Q_SUFFIXES = (".delta.npz", ".sparse.npz", ".npy")
+
+
+def atomic_save(path, array):
+    """
+    Diziyi .npy olarak atomik kaydet: önce geçici dosyaya yaz, sonra
+    os.replace ile yerine koy. Çökme anında yarım yazılmış dosya kalmaz.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _atomic_savez(path, compressed=False, **arrays):
+    """np.savez (compressed=True ise np.savez_compressed) karşılığı, atomik"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        (np.savez_compressed if compressed else np.savez)(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_q_table(path, mmap_mode=None):
+    """
+    Q-table'ı yükle.
+    - .npy: np.load(mmap_mode=...) ile; büyük tablolar belleğe okunmadan açılabilir
+    - .delta.npz: zincirdeki tam checkpoint'ten başlayıp değişen satırlar uygulanır
+      (mmap_mode verilirse taban dosya kopyala-yaz 'c' modunda açılır)
+    - .sparse.npz: q_storage.SparseQTable olarak (mmap_mode yok sayılır)
+    """
+    from q_storage import SPARSE_SUFFIX, SparseQTable
+
+    if path.endswith(SPARSE_SUFFIX):
+        return SparseQTable.load(path)
+    if not path.endswith(".delta.npz"):
+        return np.load(path, mmap_mode=mmap_mode)
+
+    # Zinciri tam checkpoint'e kadar geriye doğru izle; dosyalar hemen
+    # kapatılır (açık tutamaç aynı süreçte os.replace'i Windows'ta engeller)
+    chain = []
+    directory = os.path.dirname(path)
+    while path.endswith(".delta.npz"):
+        with np.load(path) as delta:
+            rows, values, parent = delta["rows"], delta["values"], str(delta["parent"])
+        chain.append((rows, values))
+        path = os.path.join(directory, parent)
+
+    Q = np.load(path, mmap_mode="c" if mmap_mode else None)
+    for rows, values in reversed(chain):
+        Q[rows] = values
+    return Q
+
+
+def _split_arrays(value, arrays, path):
+    """İç içe yapıdaki dizileri ayır; JSON tarafında {"__array__": anahtar} kalır"""
+    if isinstance(value, np.ndarray):
+        arrays[path] = value
+        return {'__array__': path}
+    if isinstance(value, dict):
+        return {key: _split_arrays(item, arrays, f"{path}/{key}") for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split_arrays(item, arrays, f"{path}/{index}") for index, item in enumerate(value)]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _join_arrays(value, arrays):
+    if isinstance(value, dict):
+        if set(value) == {'__array__'}:
+            return arrays[value['__array__']]
+        return {key: _join_arrays(item, arrays) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_join_arrays(item, arrays) for item in value]
+    return value
+
+
+def save_trainer_state(path, state):
+    """
+    Eğitici durumunu (epsilon, sayaçlar, RNG durumları, tampon dizileri...)
+    atomik olarak .state.npz dosyasına yaz. Diziler npz içinde, geri kalan
+    her şey tek bir JSON metni olarak saklanır.
+    """
+    arrays = {}
+    document = _split_arrays(state, arrays, "state")
+    _atomic_savez(path, __state__=np.array(json.dumps(document)), **arrays)
+
+
+def trainer_state_path(path):
+    """Q checkpoint yolu (.npy / .delta.npz / .sparse.npz) ya da durum dosyası -> durum dosyası"""
+    if path.endswith(STATE_SUFFIX):
+        return path
+    for suffix in _Q_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)] + STATE_SUFFIX
+    raise ValueError(f"Checkpoint yolu tanınmadı: {path}")
+
+
+def load_trainer_state(path):
+    """save_trainer_state() ile yazılmış durumu oku (Q checkpoint yolu da verilebilir)"""
+    with np.load(trainer_state_path(path)) as data:
+        arrays = {key: data[key] for key in data.files if key != "__state__"}
+        document = json.loads(str(data["__state__"]))
+    return _join_arrays(document, arrays)
+
+
+def latest_trainer_state(directory=".", prefix="q_table_checkpoint"):
+    """Dizindeki en yüksek episode'lu durum dosyası (yoksa None)"""
+    pattern = re.compile(rf"{re.escape(prefix)}_(\d+){re.escape(STATE_SUFFIX)}$")
+    found = [(int(match.group(1)), name) for name in os.listdir(directory)
+             if (match := pattern.match(name))]
+    return os.path.join(directory, max(found)[1]) if found else None
+
+
+class CheckpointWriter:
+    """
+    Arka plan thread'i ile Q-table checkpoint yazıcı
+
+    save() çağrısı Q'nun anlık kopyasını alıp kuyruğa koyar; diske yazma
+    eğitim döngüsünü durdurmadan ayrı thread'de yapılır. Tüm dosyalar
+    atomik olarak yerine konur.
+
+    delta=True ise ilk checkpoint (ve her full_every'ninci) tam .npy
+    olarak, diğerleri yalnızca bir öncekine göre değişen satırları içeren
+    .delta.npz olarak yazılır. Okumak için load_q_table() kullanılır.
+    Seyrek Q-table'lar (q_storage.SparseQTable) her zaman tam .sparse.npz
+    olarak yazılır.
+
+    save()'e trainer_state verilirse Q dosyası yazıldıktan sonra aynı adla
+    .state.npz yazılır (q_checkpoint alanı Q dosyasının adıdır); durum
+    dosyası varsa eşlik ettiği Q checkpoint'i tamamdır.
+    """
+
+    def __init__(self, directory=".", prefix="q_table_checkpoint", delta=False,
+                 full_every=10, max_pending=2):
+        self.directory = directory
+        self.prefix = prefix
+        self.delta = delta
+        self.full_every = full_every
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._previous = None
+        self._previous_name = None
+        self._count = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def save(self, Q, episode, trainer_state=None):
+        """
+        Q'nun anlık kopyasını yazılmak üzere kuyruğa al.
+        trainer_state içindeki diziler çağıranın kopyası olmalıdır.
+        """
+        self._raise_error()
+        # Kuyruk doluysa yazıcı yetişene kadar bekler (bellek sınırlı kalır)
+        from q_storage import SparseQTable
+
+        snapshot = Q.copy() if isinstance(Q, SparseQTable) else np.array(Q, copy=True)
+        self._queue.put((snapshot, episode, trainer_state))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(*item)
+            except Exception as e:
+                self._error = e
+
+    def _write(self, snapshot, episode, trainer_state=None):
+        name = self._write_q(snapshot, episode)
+        if trainer_state is not None:
+            trainer_state['q_checkpoint'] = name
+            save_trainer_state(os.path.join(self.directory, f"{self.prefix}_{episode}{STATE_SUFFIX}"),
+                               trainer_state)
+
+    def _write_q(self, snapshot, episode):
+        if not isinstance(snapshot, np.ndarray):
+            name = f"{self.prefix}_{episode}.sparse.npz"
+            snapshot.save(os.path.join(self.directory, name))
+            return name
+
+        write_full = (not self.delta or self._previous is None or
+                      self._previous.shape != snapshot.shape or
+                      self._count % self.full_every == 0)
+
+        if write_full:
+            name = f"{self.prefix}_{episode}.npy"
+            atomic_save(os.path.join(self.directory, name), snapshot)
+        else:
+            changed = np.flatnonzero((snapshot != self._previous).any(axis=1))
+            name = f"{self.prefix}_{episode}.delta.npz"
+            _atomic_savez(os.path.join(self.directory, name),
+                          rows=changed, values=snapshot[changed],
+                          parent=np.array(self._previous_name))
+
+        self._count += 1
+        if self.delta:
+            self._previous = snapshot
+            self._previous_name = name
+        return name
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        """Bekleyen tüm checkpoint'leri yaz ve thread'i durdur"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,127 @@
+import numpy as np
+from evaluate import evaluate_policy
+
+
+class ConvergenceMonitor:
+    """
+    Q-Learning eğitiminde yakınsama izleme ve erken durdurma kararı
+
+    Her pencere sonunda (window episode) Q-table bir önceki pencerenin
+    kopyasıyla karşılaştırılır; ölçümler ziyaret edilmiş (sıfır olmayan)
+    satırlar üzerindendir:
+        max_q_change / mean_q_change: |ΔQ| en büyük / ortalama değeri
+        policy_change: açgözlü aksiyonu değişen state oranı
+        success_rate: açgözlü politikanın tüm başlangıç state'lerindeki
+                      başarısı (%) (evaluate.evaluate_policy, ~30 ms)
+    Eşiklerin hepsi patience ardışık pencere boyunca sağlanınca converged
+    True olur. None verilen eşik kontrol edilmez.
+    """
+
+    def __init__(self, window=1000, patience=3, min_success=99.0, max_policy_change=0.005,
+                 max_q_change=None, mean_q_change=None):
+        self.window = window
+        self.patience = patience
+        self.min_success = min_success
+        self.max_policy_change = max_policy_change
+        self.max_q_change = max_q_change
+        self.mean_q_change = mean_q_change
+
+        self.history = []
+        self.streak = 0
+        self._previous = None
+        self._previous_actions = None
+
+    @property
+    def converged(self):
+        return self.streak >= self.patience
+
+    def _thresholds_hold(self, signals):
+        checks = (('success_rate', self.min_success, False),
+                  ('policy_change', self.max_policy_change, True),
+                  ('max_q_change', self.max_q_change, True),
+                  ('mean_q_change', self.mean_q_change, True))
+        for name, threshold, upper in checks:
+            if threshold is None:
+                continue
+            if (signals[name] > threshold) if upper else (signals[name] < threshold):
+                return False
+        return True
+
+    def update(self, Q, episode, env=None):
+        """Pencere sonu ölçümlerini hesapla, geçmişe ekle ve döndür"""
+        visited = np.flatnonzero(Q.any(axis=1))
+        actions = np.argmax(Q, axis=1)
+
+        if self._previous is None:
+            # İlk pencerede karşılaştırılacak kopya yok
+            max_change = mean_change = float('inf')
+            policy_change = 1.0
+            self._previous = Q.copy()
+        else:
+            change = np.abs(Q[visited] - self._previous[visited])
+            max_change = float(change.max()) if visited.size else 0.0
+            mean_change = float(change.mean()) if visited.size else 0.0
+            changed = np.count_nonzero(actions[visited] != self._previous_actions[visited])
+            policy_change = changed / max(visited.size, 1)
+            np.copyto(self._previous, Q)
+        self._previous_actions = actions
+
+        results = evaluate_policy(Q, env)
+        signals = {
+            'episode': episode,
+            'max_q_change': max_change,
+            'mean_q_change': mean_change,
+            'policy_change': policy_change,
+            'success_rate': results['success_rate'],
+            'mean_steps': results['mean_steps'],
+            'visited': int(visited.size),
+        }
+        self.streak = self.streak + 1 if self._thresholds_hold(signals) else 0
+        signals['streak'] = self.streak
+        self.history.append(signals)
+        return signals
+
+    @property
+    def config(self):
+        """Kurucu argümanları (aynı eşiklerle yeniden oluşturmak için)"""
+        return {'window': self.window, 'patience': self.patience,
+                'min_success': self.min_success, 'max_policy_change': self.max_policy_change,
+                'max_q_change': self.max_q_change, 'mean_q_change': self.mean_q_change}
+
+    def get_state(self):
+        """Eşikler, geçmiş, sayaç ve karşılaştırma kopyası (checkpoint için)"""
+        return {
+            'config': self.config,
+            'history': [dict(signals) for signals in self.history],
+            'streak': self.streak,
+            'previous': self._previous.copy() if self._previous is not None else None,
+            'previous_actions': (self._previous_actions.copy()
+                                 if self._previous_actions is not None else None),
+        }
+
+    def set_state(self, state):
+        self.history = [dict(signals) for signals in state['history']]
+        self.streak = state['streak']
+        self._previous = state['previous']
+        self._previous_actions = state['previous_actions']
+
+    def adapt_epsilon(self, epsilon, epsilon_start, epsilon_end):
+        """
+        Son pencerenin ölçümlerine göre keşif oranı
+
+        Açgözlü politikanın başarısız olduğu oran kadar keşif yeterlidir
+        (epsilon en fazla epsilon_end + (epsilon_start - epsilon_end) *
+        başarısızlık); politika artık değişmiyorsa epsilon yarıya iner.
+        """
+        signals = self.history[-1]
+        failure = 1 - signals['success_rate'] / 100
+        epsilon = min(epsilon, epsilon_end + (epsilon_start - epsilon_end) * failure)
+        if self.max_policy_change is not None and signals['policy_change'] <= self.max_policy_change:
+            epsilon *= 0.5
+        return max(epsilon_end, epsilon)
+
+    def print_report(self, signals):
+        print(f"  Yakınsama: ΔQ max {signals['max_q_change']:.3g} / ort "
+              f"{signals['mean_q_change']:.3g}, politika değişimi "
+              f"{signals['policy_change'] * 100:.2f}%, açgözlü başarı "
+              f"{signals['success_rate']:.1f}% ({signals['streak']}/{self.patience})")
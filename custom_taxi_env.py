@@ -1,7 +1,24 @@
 import numpy as np
 import gym
 from gym import Env, spaces
-import pygame
+
+# pygame yalnızca render() ilk kez çağrıldığında yüklenir (bkz. _load_pygame).
+# Eğitim/değerlendirme işçileri görüntü ve ses altsistemlerini hiç başlatmaz.
+pygame = None
+
+
+def _load_pygame():
+    """pygame modülünü ilk ihtiyaçta içe aktar"""
+    global pygame
+    if pygame is None:
+        import pygame as pygame_module
+        pygame = pygame_module
+    return pygame
+
+
+# Harita düzenine göre paylaşılan tablolar (bir kez hesaplanır)
+_TRANSITION_TABLE_CACHE = {}
+_COMPACT_INDEX_CACHE = {}
 
 
 class CustomTaxiEnv(Env):
@@ -12,10 +29,27 @@ class CustomTaxiEnv(Env):
     - Duvarlar ve girilemez bölgeler
     - Görsel labirent tasarımı
     """
+
+    # human: pencere, render_fps ile sınırlı; rgb_array: ekransız, kare döndürür
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 10}
+
+    # Renkler
+    COLOR_BG = (240, 240, 240)
+    COLOR_ROAD = (255, 255, 255)
+    COLOR_BLOCKED = (200, 50, 50)  # Kırmızı - girilemez
+    COLOR_WALL = (60, 60, 60)  # Koyu gri - duvarlar
+    COLOR_GRID = (200, 200, 200)
+    COLOR_TAXI = (255, 200, 0)  # Sarı
+    COLOR_PASSENGER = (0, 120, 255)  # Mavi
+    COLOR_DESTINATION = (0, 200, 0)  # Yeşil
+    COLOR_TEXT = (0, 0, 0)
     
     def __init__(self, grid_size=6, render_mode=None):
         super().__init__()
 
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(f"Geçersiz render_mode: {render_mode}")
+
         self.grid_size = grid_size
         self.rows = grid_size
         self.cols = grid_size
@@ -31,6 +65,9 @@ class CustomTaxiEnv(Env):
         self.walls = set()
         self._create_walls()
 
+        # Harita tabloları (hareket tablosu, geçerli hücreler)
+        self._build_layout_tables()
+
         # Actions: 0=down, 1=up, 2=right, 3=left, 4=pickup, 5=dropoff
         self.action_space = spaces.Discrete(6)
 
@@ -42,17 +79,30 @@ class CustomTaxiEnv(Env):
                      self.rows * self.cols)
         self.observation_space = spaces.Discrete(max_states)
 
+        # Geçiş tabloları ilk ihtiyaçta hesaplanır (build_transition_tables)
+        self.next_state_table = None
+        self.reward_table = None
+        self.terminal_table = None
+
+        # Erişilebilir state indeksi ilk ihtiyaçta hesaplanır (build_compact_index)
+        self.full_to_compact = None
+        self.compact_to_full = None
+
+        # None: geriye uyumluluk için "human" gibi davranır
         self.render_mode = render_mode
 
-        # Pygame init
-        pygame.init()
+        # Pygame render() içinde, ilk karede başlatılır
         self.cell_size = 100
         self.wall_thickness = 8
         self.window_size = (self.cols * self.cell_size,
                             self.rows * self.cell_size)
-        self.window = None
-        self.clock = pygame.time.Clock()
+        self.window = None   # çizim yüzeyi (human: ekran, rgb_array: ekransız)
+        self.clock = None
+        self._frame = None   # rgb_array: yüzeyle aynı belleği paylaşan (H, W, 3) dizi
         self.font = None
+        self._background = None
+        self._glyphs = None
+        self._dirty_rects = []
 
         self.reset()
 
@@ -73,6 +123,36 @@ class CustomTaxiEnv(Env):
             # Duvarı ters yönde de ekle
             self.walls.add((wall[1], wall[0]))
 
+    def _build_layout_tables(self):
+        """
+        Haritaya bağlı sabit tabloları bir kez hesapla.
+        - move_table[hücre, aksiyon]: hareket sonrası hücre, geçersizse -1
+        - valid_cells: girilebilir hücre indeksleri (hücre = row * cols + col)
+        - valid_positions: aynı hücreler (row, col) olarak; doğum tabloları
+        - valid_index: hücre -> valid_cells içindeki sıra (girilemezse -1)
+        """
+        n_cells = self.rows * self.cols
+        self.move_table = np.full((n_cells, 4), -1, dtype=np.int64)
+        deltas = [(1, 0), (-1, 0), (0, 1), (0, -1)]  # down, up, right, left
+
+        for r in range(self.rows):
+            for c in range(self.cols):
+                for action, (dr, dc) in enumerate(deltas):
+                    new_row, new_col = r + dr, c + dc
+                    if not self._is_valid_position(new_row, new_col):
+                        continue
+                    if self._has_wall_between((r, c), (new_row, new_col)):
+                        continue
+                    self.move_table[r * self.cols + c, action] = new_row * self.cols + new_col
+
+        self.valid_cells = np.array([r * self.cols + c
+                                     for r in range(self.rows)
+                                     for c in range(self.cols)
+                                     if self._is_valid_position(r, c)], dtype=np.int64)
+        self.valid_positions = [divmod(int(cell), self.cols) for cell in self.valid_cells]
+        self.valid_index = np.full(n_cells, -1, dtype=np.int64)
+        self.valid_index[self.valid_cells] = np.arange(len(self.valid_cells))
+
     def _is_valid_position(self, row, col):
         """Pozisyon geçerli mi kontrol et"""
         if row < 0 or row >= self.rows or col < 0 or col >= self.cols:
@@ -113,31 +193,250 @@ class CustomTaxiEnv(Env):
         taxi_row = state
         return taxi_row, taxi_col, pass_row, pass_col, in_taxi, dest_row, dest_col
 
+    def _layout_key(self):
+        """Geçiş tablolarını belirleyen harita anahtarı"""
+        return (self.rows, self.cols, frozenset(self.blocked), frozenset(self.walls))
+
+    def build_transition_tables(self):
+        """
+        Tüm (state, action) çiftleri için yoğun geçiş tablolarını oluştur.
+        - next_state_table[s, a]: sonraki state
+        - reward_table[s, a]: ödül (timeout cezası hariç)
+        - terminal_table[s, a]: başarılı dropoff mu
+        Tablolar harita başına bir kez hesaplanır ve salt okunurdur.
+        """
+        key = self._layout_key()
+        tables = _TRANSITION_TABLE_CACHE.get(key)
+        if tables is None:
+            tables = self._compute_transition_tables()
+            _TRANSITION_TABLE_CACHE[key] = tables
+
+        self.next_state_table, self.reward_table, self.terminal_table = tables
+        return tables
+
+    def _decode_cells(self, states):
+        """Vektörel decode: (taxi, passenger, in_taxi, dest) hücre dizileri"""
+        n_cells = self.rows * self.cols
+        dest = states % n_cells
+        rest = states // n_cells
+        in_taxi = rest % 2
+        rest //= 2
+        passenger = rest % n_cells
+        taxi = rest // n_cells
+        return taxi, passenger, in_taxi, dest
+
+    def _compute_transition_tables(self):
+        """step() mantığını tüm state'ler üzerinde vektörel olarak uygula"""
+        n_states = self.observation_space.n
+        n_cells = self.rows * self.cols
+        index_dtype = np.int32 if n_states < 2**31 else np.int64
+
+        states = np.arange(n_states, dtype=np.int64)
+        taxi, passenger, in_taxi, dest = self._decode_cells(states)
+
+        def encode(taxi_cell, in_taxi_flag):
+            return ((taxi_cell * n_cells + passenger) * 2 + in_taxi_flag) * n_cells + dest
+
+        next_state = np.empty((n_states, self.action_space.n), dtype=index_dtype)
+        reward = np.empty((n_states, self.action_space.n), dtype=np.float64)
+        terminal = np.zeros((n_states, self.action_space.n), dtype=bool)
+
+        # Hareket aksiyonları
+        for action in range(4):
+            new_cell = self.move_table[taxi, action]
+            valid = new_cell >= 0
+            next_state[:, action] = encode(np.where(valid, new_cell, taxi), in_taxi)
+            reward[:, action] = np.where(valid, -0.5, -15)
+
+        # Pickup
+        picked = (in_taxi == 0) & (taxi == passenger)
+        next_state[:, 4] = encode(taxi, in_taxi | picked)
+        reward[:, 4] = np.where(picked, 50, -10)
+
+        # Dropoff
+        delivered = (in_taxi == 1) & (taxi == dest)
+        next_state[:, 5] = states
+        reward[:, 5] = np.where(delivered, 200, -10)
+        terminal[:, 5] = delivered
+
+        for table in (next_state, reward, terminal):
+            table.flags.writeable = False
+        return next_state, reward, terminal
+
+    def step_table(self, state, action):
+        """
+        Durumsuz hızlı adım: yalnızca tablo okuması.
+        state/action skaler ya da dizi olabilir. step_count ve timeout
+        takibi yapılmaz; ortamın kendi durumu değişmez.
+
+        Returns:
+            next_state, reward, terminal
+        """
+        if self.next_state_table is None:
+            self.build_transition_tables()
+        return (self.next_state_table[state, action],
+                self.reward_table[state, action],
+                self.terminal_table[state, action])
+
+    def build_compact_index(self):
+        """
+        Yalnızca erişilebilir state'leri sayan yoğun indeksi oluştur.
+        - Taksi ve hedef girilebilir hücrelerde olmalı
+        - Yolcu taksideyse yolcu koordinatı bilgi taşımaz (tek state'e indirgenir)
+        - Yolcu bekliyorsa girilebilir hücrede ve hedeften farklı olmalı
+
+        full_to_compact[s]: tam state -> kompakt indeks (erişilemezse -1)
+        compact_to_full[i]: kompakt indeks -> temsilci tam state
+                            (yolcu taksideyse yolcu koordinatı = taksi)
+        """
+        key = self._layout_key()
+        index = _COMPACT_INDEX_CACHE.get(key)
+        if index is None:
+            index = self._compute_compact_index()
+            _COMPACT_INDEX_CACHE[key] = index
+
+        self.full_to_compact, self.compact_to_full = index
+        return index
+
+    def _compute_compact_index(self):
+        """Erişilebilir state'leri tam state sırasıyla numaralandır"""
+        n_states = self.observation_space.n
+        n_cells = self.rows * self.cols
+        valid_cell = np.zeros(n_cells, dtype=bool)
+        valid_cell[self.valid_cells] = True
+
+        states = np.arange(n_states, dtype=np.int64)
+        taxi, passenger, in_taxi, dest = self._decode_cells(states)
+        in_taxi = in_taxi.astype(bool)
+
+        reachable = valid_cell[taxi] & valid_cell[dest]
+        reachable &= in_taxi | (valid_cell[passenger] & (passenger != dest))
+        # Yolcu taksideyken temsilci state: yolcu koordinatı = taksi koordinatı
+        representative = reachable & (~in_taxi | (passenger == taxi))
+
+        compact_to_full = states[representative]
+        full_to_compact = np.full(n_states, -1, dtype=np.int32)
+        full_to_compact[compact_to_full] = np.arange(len(compact_to_full), dtype=np.int32)
+
+        # Taksideki yolcunun tüm koordinatlarını temsilciye yönlendir
+        carried = reachable & in_taxi
+        canonical = ((taxi[carried] * n_cells + taxi[carried]) * 2 + 1) * n_cells + dest[carried]
+        full_to_compact[carried] = full_to_compact[canonical]
+
+        for table in (full_to_compact, compact_to_full):
+            table.flags.writeable = False
+        return full_to_compact, compact_to_full
+
+    @property
+    def compact_state_count(self):
+        """Kompakt indeksteki state sayısı"""
+        if self.compact_to_full is None:
+            self.build_compact_index()
+        return len(self.compact_to_full)
+
+    def compact_state(self, state):
+        """Tam state'i (skaler veya dizi) kompakt indekse çevir"""
+        if self.full_to_compact is None:
+            self.build_compact_index()
+        return self.full_to_compact[state]
+
+    def encode_compact(self, taxi_row, taxi_col, pass_row, pass_col, in_taxi, dest_row, dest_col):
+        """encode() karşılığı, kompakt indeks döndürür (erişilemezse -1)"""
+        return int(self.compact_state(self.encode(taxi_row, taxi_col, pass_row, pass_col,
+                                                  in_taxi, dest_row, dest_col)))
+
+    def decode_compact(self, index):
+        """decode() karşılığı, kompakt indeksi bileşenlerine ayır"""
+        if self.compact_to_full is None:
+            self.build_compact_index()
+        return self.decode(int(self.compact_to_full[index]))
+
+    def compact_q_table(self, Q, dtype=None):
+        """Tam Q-table'ı kompakt indekse (ve istenirse dtype'a) indirge"""
+        if self.compact_to_full is None:
+            self.build_compact_index()
+        return Q[self.compact_to_full].astype(dtype or Q.dtype)
+
+    def expand_q_table(self, Q, dtype=np.float64):
+        """Kompakt Q-table'ı tam boyuta aç (erişilemeyen state'ler 0)"""
+        rows = self.compact_state(np.arange(self.observation_space.n))
+        full = np.zeros((self.observation_space.n, Q.shape[1]), dtype=dtype)
+        reachable = rows >= 0
+        full[reachable] = Q[rows[reachable]]
+        return full
+
+    def q_row_index(self, Q):
+        """
+        Q-table'ın satır indeksini belirle.
+
+        Returns:
+            None (tam state indeksi) ya da full_to_compact (kompakt Q-table)
+        """
+        if Q.shape[0] == self.observation_space.n:
+            return None
+        if Q.shape[0] == self.compact_state_count:
+            return self.full_to_compact
+        raise ValueError(f"Q-table boyutu bu haritayla uyumsuz: {Q.shape}")
+
+    def _sample_other_index(self, exclude_index, rng):
+        """
+        exclude_index dışındaki geçerli pozisyonlardan birinin sırasını seç.
+        Reddetmeden örnekleme: n-1 içinden seçip dışlanan sırayı atla.
+        exclude_index skaler ya da dizi olabilir.
+        """
+        if np.ndim(exclude_index) == 0:
+            index = int(rng.integers(len(self.valid_cells) - 1))
+            return index + (index >= exclude_index)
+        index = rng.integers(len(self.valid_cells) - 1, size=len(exclude_index))
+        return index + (index >= exclude_index)
+
+    def sample_spawns(self, count, rng=None):
+        """
+        reset() kurallarıyla count adet başlangıç durumunu tek seferde üret.
+
+        Returns:
+            taxi, passenger, dest hücre dizileri (hücre = row * cols + col)
+        """
+        rng = rng or self.np_random
+        taxi = rng.integers(len(self.valid_cells), size=count)
+        passenger = self._sample_other_index(taxi, rng)
+        dest = self._sample_other_index(passenger, rng)
+        return self.valid_cells[taxi], self.valid_cells[passenger], self.valid_cells[dest]
+
+    def sample_passengers(self, taxi_cells, rng=None):
+        """
+        reset_passenger() kurallarıyla verilen taksi hücreleri için
+        yeni yolcu ve hedefleri tek seferde üret.
+
+        Returns:
+            passenger, dest hücre dizileri
+        """
+        rng = rng or self.np_random
+        passenger = self._sample_other_index(self.valid_index[taxi_cells], rng)
+        dest = self._sample_other_index(passenger, rng)
+        return self.valid_cells[passenger], self.valid_cells[dest]
+
     def reset(self, seed=None, options=None):
-        """Ortamı sıfırla"""
+        """
+        Ortamı sıfırla.
+        Rastgelelik ortamın kendi np_random üreticisinden gelir;
+        reset(seed=...) ile tekrarlanabilir.
+        """
         super().reset(seed=seed)
+        rng = self.np_random
+        n_valid = len(self.valid_positions)
 
         # Taxi spawn - geçerli bir pozisyonda
-        valid_positions = [(r, c) for r in range(self.rows) 
-                          for c in range(self.cols) 
-                          if self._is_valid_position(r, c)]
-        
-        taxi_pos = valid_positions[np.random.randint(len(valid_positions))]
-        self.taxi_row, self.taxi_col = taxi_pos
+        taxi_index = int(rng.integers(n_valid))
+        self.taxi_row, self.taxi_col = self.valid_positions[taxi_index]
 
         # Passenger spawn - geçerli ve taxi'den farklı
-        while True:
-            pass_pos = valid_positions[np.random.randint(len(valid_positions))]
-            if pass_pos != taxi_pos:
-                self.pass_row, self.pass_col = pass_pos
-                break
+        pass_index = self._sample_other_index(taxi_index, rng)
+        self.pass_row, self.pass_col = self.valid_positions[pass_index]
 
         # Destination - geçerli ve passenger'dan farklı
-        while True:
-            dest_pos = valid_positions[np.random.randint(len(valid_positions))]
-            if dest_pos != (self.pass_row, self.pass_col):
-                self.dest_row, self.dest_col = dest_pos
-                break
+        dest_index = self._sample_other_index(pass_index, rng)
+        self.dest_row, self.dest_col = self.valid_positions[dest_index]
 
         self.passenger_in_taxi = False
         self.terminated = False
@@ -151,24 +450,16 @@ class CustomTaxiEnv(Env):
         Sadece yolcu ve hedefi yenile, taksiyi hareket ettirme.
         Taksi bıraktığı yerde kalır, yeni yolcu üretilir.
         """
-        # Geçerli pozisyonlar
-        valid_positions = [(r, c) for r in range(self.rows) 
-                          for c in range(self.cols) 
-                          if self._is_valid_position(r, c)]
-        
+        rng = self.np_random
+        taxi_index = int(self.valid_index[self.taxi_row * self.cols + self.taxi_col])
+
         # Yeni yolcu pozisyonu - taksi pozisyonundan farklı olmalı
-        while True:
-            pass_pos = valid_positions[np.random.randint(len(valid_positions))]
-            if pass_pos != (self.taxi_row, self.taxi_col):
-                self.pass_row, self.pass_col = pass_pos
-                break
+        pass_index = self._sample_other_index(taxi_index, rng)
+        self.pass_row, self.pass_col = self.valid_positions[pass_index]
 
         # Yeni hedef - yolcu pozisyonundan farklı olmalı
-        while True:
-            dest_pos = valid_positions[np.random.randint(len(valid_positions))]
-            if dest_pos != (self.pass_row, self.pass_col):
-                self.dest_row, self.dest_col = dest_pos
-                break
+        dest_index = self._sample_other_index(pass_index, rng)
+        self.dest_row, self.dest_col = self.valid_positions[dest_index]
 
         self.passenger_in_taxi = False
         self.terminated = False
@@ -259,25 +550,10 @@ class CustomTaxiEnv(Env):
             'total_reward': self.total_reward
         }
 
-    def render(self):
-        """Ortamı görselleştir"""
-        if self.window is None:
-            self.window = pygame.display.set_mode(self.window_size)
-            pygame.display.set_caption("Custom Taxi Environment - Advanced")
-            self.font = pygame.font.Font(None, 24)
-
-        # Renkler
-        COLOR_BG = (240, 240, 240)
-        COLOR_ROAD = (255, 255, 255)
-        COLOR_BLOCKED = (200, 50, 50)  # Kırmızı - girilemez
-        COLOR_WALL = (60, 60, 60)  # Koyu gri - duvarlar
-        COLOR_GRID = (200, 200, 200)
-        COLOR_TAXI = (255, 200, 0)  # Sarı
-        COLOR_PASSENGER = (0, 120, 255)  # Mavi
-        COLOR_DESTINATION = (0, 200, 0)  # Yeşil
-        COLOR_TEXT = (0, 0, 0)
-
-        self.window.fill(COLOR_BG)
+    def _build_background(self):
+        """Sabit harita katmanını (hücreler, engeller, duvarlar) bir kez çiz"""
+        background = pygame.Surface(self.window_size)
+        background.fill(self.COLOR_BG)
 
         # Hücreleri çiz
         for r in range(self.rows):
@@ -287,20 +563,21 @@ class CustomTaxiEnv(Env):
 
                 # Hücre rengi
                 if (r, c) in self.blocked:
-                    color = COLOR_BLOCKED
+                    color = self.COLOR_BLOCKED
                 else:
-                    color = COLOR_ROAD
+                    color = self.COLOR_ROAD
 
-                pygame.draw.rect(self.window, color,
+                pygame.draw.rect(background, color,
                                (x, y, self.cell_size, self.cell_size))
                 
                 # Grid çizgileri (ince)
-                pygame.draw.rect(self.window, COLOR_GRID,
+                pygame.draw.rect(background, self.COLOR_GRID,
                                (x, y, self.cell_size, self.cell_size), 1)
 
-        # Duvarları çiz
-        for wall in self.walls:
-            pos1, pos2 = wall
+        # Duvarları çiz (her duvar self.walls'ta iki yönde var, bir kez çiz)
+        for pos1, pos2 in self.walls:
+            if pos1 > pos2:
+                continue
             r1, c1 = pos1
             r2, c2 = pos2
             
@@ -309,66 +586,248 @@ class CustomTaxiEnv(Env):
                 # Sağdaki hücre
                 wall_x = max(c1, c2) * self.cell_size
                 wall_y = r1 * self.cell_size
-                pygame.draw.rect(self.window, COLOR_WALL,
+                pygame.draw.rect(background, self.COLOR_WALL,
                                (wall_x - self.wall_thickness//2, wall_y,
                                 self.wall_thickness, self.cell_size))
             else:  # Dikey duvar (hücreler alt alta)
                 # Alttaki hücre
                 wall_x = c1 * self.cell_size
                 wall_y = max(r1, r2) * self.cell_size
-                pygame.draw.rect(self.window, COLOR_WALL,
+                pygame.draw.rect(background, self.COLOR_WALL,
                                (wall_x, wall_y - self.wall_thickness//2,
                                 self.cell_size, self.wall_thickness))
 
+        return background
+
+    def _draw_marker(self, row, col, color, glyph):
+        """Hücre ortasına harfli daire çiz, değişen alanı döndür"""
+        x = col * self.cell_size + self.cell_size // 2
+        y = row * self.cell_size + self.cell_size // 2
+        rect = pygame.draw.circle(self.window, color, (x, y), 18)
+        pygame.draw.circle(self.window, self.COLOR_TEXT, (x, y), 18, 2)
+        self.window.blit(glyph, glyph.get_rect(center=(x, y)))
+        return rect
+
+    def _create_canvas(self):
+        """İlk karede çizim yüzeyini oluştur"""
+        if self.render_mode == "rgb_array":
+            # Ekran ve saat yok; yüzey numpy tamponunu doğrudan paylaşır,
+            # böylece döndürülen kare kopyasız bir görünümdür
+            width, height = self.window_size
+            self._frame = np.zeros((height, width, 3), dtype=np.uint8)
+            return pygame.image.frombuffer(self._frame, self.window_size, "RGB")
+
+        pygame.display.init()
+        self.clock = pygame.time.Clock()
+        window = pygame.display.set_mode(self.window_size)
+        pygame.display.set_caption("Custom Taxi Environment - Advanced")
+        return window
+
+    def render(self):
+        """
+        Ortamı görselleştir.
+        Sabit harita ve harfler önbellekte tutulur; her karede yalnızca
+        taksi, yolcu, hedef ve bilgi metninin eski/yeni alanları güncellenir.
+
+        render_mode="rgb_array" ise ekran açılmaz, FPS sınırı yoktur ve
+        (yükseklik, genişlik, 3) uint8 kare döndürülür. Kare, çizim
+        yüzeyinin kendisidir (kopya değil): sonraki render() üzerine yazar;
+        saklamak için kopyalanmalıdır (bkz. episode_recorder.EpisodeRecorder).
+        """
+        first_frame = self.window is None
+        if first_frame:
+            # Yalnızca gereken altsistemler (ses vb. başlatılmaz)
+            _load_pygame()
+            pygame.font.init()
+            self.window = self._create_canvas()
+            self.font = pygame.font.Font(None, 24)
+            self._background = self._build_background()
+            self._glyphs = {
+                'D': self.font.render("D", True, self.COLOR_TEXT),
+                'P': self.font.render("P", True, self.COLOR_TEXT),
+                'P_taxi': self.font.render("P", True, self.COLOR_PASSENGER),
+            }
+            self._dirty_rects = []
+            self.window.blit(self._background, (0, 0))
+
+        # Önceki karenin hareketli öğelerini arka planla sil
+        previous_rects = self._dirty_rects
+        for rect in previous_rects:
+            self.window.blit(self._background, rect, rect)
+
         # Destination işareti (yeşil daire)
-        dest_x = self.dest_col * self.cell_size + self.cell_size // 2
-        dest_y = self.dest_row * self.cell_size + self.cell_size // 2
-        pygame.draw.circle(self.window, COLOR_DESTINATION, (dest_x, dest_y), 18)
-        pygame.draw.circle(self.window, COLOR_TEXT, (dest_x, dest_y), 18, 2)
-        
-        # "D" harfi
-        text = self.font.render("D", True, COLOR_TEXT)
-        text_rect = text.get_rect(center=(dest_x, dest_y))
-        self.window.blit(text, text_rect)
+        rects = [self._draw_marker(self.dest_row, self.dest_col,
+                                   self.COLOR_DESTINATION, self._glyphs['D'])]
 
         # Passenger (eğer taksiye binmemişse)
         if not self.passenger_in_taxi:
-            pass_x = self.pass_col * self.cell_size + self.cell_size // 2
-            pass_y = self.pass_row * self.cell_size + self.cell_size // 2
-            pygame.draw.circle(self.window, COLOR_PASSENGER, (pass_x, pass_y), 18)
-            pygame.draw.circle(self.window, COLOR_TEXT, (pass_x, pass_y), 18, 2)
-            
-            # "P" harfi
-            text = self.font.render("P", True, COLOR_TEXT)
-            text_rect = text.get_rect(center=(pass_x, pass_y))
-            self.window.blit(text, text_rect)
+            rects.append(self._draw_marker(self.pass_row, self.pass_col,
+                                           self.COLOR_PASSENGER, self._glyphs['P']))
 
         # Taxi (sarı kare)
         taxi_x = self.taxi_col * self.cell_size + self.cell_size // 4
         taxi_y = self.taxi_row * self.cell_size + self.cell_size // 4
         taxi_size = self.cell_size // 2
         
-        pygame.draw.rect(self.window, COLOR_TAXI,
-                        (taxi_x, taxi_y, taxi_size, taxi_size))
-        pygame.draw.rect(self.window, COLOR_TEXT,
+        rects.append(pygame.draw.rect(self.window, self.COLOR_TAXI,
+                                      (taxi_x, taxi_y, taxi_size, taxi_size)))
+        pygame.draw.rect(self.window, self.COLOR_TEXT,
                         (taxi_x, taxi_y, taxi_size, taxi_size), 3)
         
         # Eğer yolcu taksideyse, taxi'nin üzerinde "P" göster
         if self.passenger_in_taxi:
-            text = self.font.render("P", True, COLOR_PASSENGER)
-            text_rect = text.get_rect(center=(taxi_x + taxi_size//2, taxi_y + taxi_size//2))
-            self.window.blit(text, text_rect)
+            glyph = self._glyphs['P_taxi']
+            self.window.blit(glyph, glyph.get_rect(center=(taxi_x + taxi_size//2,
+                                                           taxi_y + taxi_size//2)))
 
         # Bilgi metni
         info_text = f"Steps: {self.step_count} | Reward: {self.total_reward:.0f}"
-        text_surface = self.font.render(info_text, True, COLOR_TEXT)
-        self.window.blit(text_surface, (10, 10))
+        text_surface = self.font.render(info_text, True, self.COLOR_TEXT)
+        rects.append(self.window.blit(text_surface, (10, 10)))
+        self._dirty_rects = rects
+
+        if self.render_mode == "rgb_array":
+            return self._frame
 
-        pygame.display.flip()
-        self.clock.tick(10)  # 10 FPS
+        if first_frame:
+            pygame.display.flip()
+        else:
+            pygame.display.update(previous_rects + rects)
+        self.clock.tick(self.metadata["render_fps"])
 
     def close(self):
-        """Pygame penceresini kapat"""
+        """Pygame penceresini / çizim yüzeyini kapat"""
         if self.window is not None:
-            pygame.quit()
+            # Ekransız yüzeyler için pygame kapatılmaz (diğer ortamlar kullanıyor olabilir)
+            if self.render_mode != "rgb_array":
+                pygame.quit()
             self.window = None
+            self._frame = None
+
+
+class VectorCustomTaxiEnv:
+    """
+    Vektörleştirilmiş Taksi Ortamı
+    - N adet CustomTaxiEnv tek bir step(actions) çağrısıyla ilerler
+    - Durum NumPy dizilerinde tutulur (hücre = row * cols + col)
+    - Ödüller ve geçişler CustomTaxiEnv.step() ile birebir aynıdır
+    - Biten ortamlar otomatik olarak sıfırlanır:
+        autoreset="reset"     -> reset() kuralları (taksi de yeniden doğar)
+        autoreset="passenger" -> reset_passenger() kuralları (taksi yerinde kalır)
+    """
+
+    def __init__(self, num_envs, grid_size=6, autoreset="reset", seed=None):
+        if autoreset not in ("reset", "passenger"):
+            raise ValueError(f"Geçersiz autoreset modu: {autoreset}")
+
+        self.num_envs = num_envs
+        self.autoreset = autoreset
+
+        # Harita, encode ve uzaylar tek bir skaler ortamdan alınır
+        self.base_env = CustomTaxiEnv(grid_size=grid_size)
+        self.rows = self.base_env.rows
+        self.cols = self.base_env.cols
+        self.n_cells = self.rows * self.cols
+        self.move_table = self.base_env.move_table
+        self.valid_cells = self.base_env.valid_cells
+        self.action_space = self.base_env.action_space
+        self.observation_space = self.base_env.observation_space
+
+        self.rng = np.random.default_rng(seed)
+
+        self.taxi_cell = np.zeros(num_envs, dtype=np.int64)
+        self.pass_cell = np.zeros(num_envs, dtype=np.int64)
+        self.dest_cell = np.zeros(num_envs, dtype=np.int64)
+        self.passenger_in_taxi = np.zeros(num_envs, dtype=bool)
+        self.step_count = np.zeros(num_envs, dtype=np.int64)
+        self.total_reward = np.zeros(num_envs, dtype=np.float64)
+
+    def _spawn(self, mask, keep_taxi):
+        """Maskelenen ortamlar için yeni görev üret"""
+        n = int(np.count_nonzero(mask))
+        if n == 0:
+            return
+
+        if keep_taxi:
+            passenger, dest = self.base_env.sample_passengers(self.taxi_cell[mask], self.rng)
+        else:
+            taxi, passenger, dest = self.base_env.sample_spawns(n, self.rng)
+            self.taxi_cell[mask] = taxi
+
+        self.pass_cell[mask] = passenger
+        self.dest_cell[mask] = dest
+
+        self.passenger_in_taxi[mask] = False
+        self.step_count[mask] = 0
+        self.total_reward[mask] = 0
+
+    def encode(self, taxi_cell, pass_cell, in_taxi, dest_cell):
+        """CustomTaxiEnv.encode() ile aynı indeksleme, dizi girdileri için"""
+        i = taxi_cell * self.n_cells + pass_cell
+        i = i * 2 + in_taxi
+        return i * self.n_cells + dest_cell
+
+    def _get_states(self):
+        """Tüm ortamların durumlarını encode et"""
+        return self.encode(self.taxi_cell, self.pass_cell,
+                           self.passenger_in_taxi, self.dest_cell)
+
+    def reset(self, seed=None, options=None):
+        """Tüm ortamları reset() kurallarıyla sıfırla"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+
+        self._spawn(np.ones(self.num_envs, dtype=bool), keep_taxi=False)
+        return self._get_states(), {}
+
+    def step(self, actions):
+        """
+        Tüm ortamlarda birer adım at
+
+        Returns:
+            states, rewards, dones, truncated, info
+            info['final_state']: otomatik sıfırlamadan önceki son durum
+        """
+        actions = np.asarray(actions)
+        self.step_count += 1
+        rewards = np.full(self.num_envs, -0.5)
+
+        # Hareket aksiyonları
+        moving = actions < 4
+        new_cell = self.move_table[self.taxi_cell, np.minimum(actions, 3)]
+        rewards[moving & (new_cell < 0)] = -15
+        moved = moving & (new_cell >= 0)
+        self.taxi_cell[moved] = new_cell[moved]
+
+        # Pickup
+        pickup = actions == 4
+        picked = pickup & ~self.passenger_in_taxi & (self.taxi_cell == self.pass_cell)
+        rewards[pickup] = np.where(picked[pickup], 50, -10)
+        self.passenger_in_taxi |= picked
+
+        # Dropoff
+        dropoff = actions == 5
+        dones = dropoff & self.passenger_in_taxi & (self.taxi_cell == self.dest_cell)
+        rewards[dropoff] = np.where(dones[dropoff], 200, -10)
+
+        self.total_reward += rewards
+
+        # Çok uzun sürerse timeout
+        timeout = self.step_count > 200
+        dones |= timeout
+        rewards[timeout] -= 10
+
+        final_states = self._get_states()
+        info = {
+            'step_count': self.step_count.copy(),
+            'total_reward': self.total_reward.copy(),
+            'final_state': final_states,
+        }
+
+        self._spawn(dones, keep_taxi=(self.autoreset == "passenger"))
+        states = self._get_states() if dones.any() else final_states.copy()
+
+        return states, rewards, dones, np.zeros(self.num_envs, dtype=bool), info
+
+    def close(self):
+        self.base_env.close()
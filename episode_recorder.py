@@ -0,0 +1,250 @@
+import numpy as np
+import argparse
+import json
+import os
+import sys
+
+from checkpoint import _atomic_savez
+from custom_taxi_env import CustomTaxiEnv
+
+
+# Episode dizini sütunları (episode başına bir satır)
+EPISODE_COLUMNS = {
+    'start': np.int64,     # ilk karenin kayıttaki global indeksi
+    'length': np.int64,    # kare sayısı (reset karesi dahil)
+    'reward': np.float64,
+    'success': np.bool_,
+}
+
+
+class EpisodeRecorder:
+    """
+    Çok sayıda episode'un karelerini tek bir önceden ayrılmış diziye kaydeder
+
+    frames dizisi (capacity, yükseklik, genişlik, 3) uint8 boyutunda bir kez
+    ayrılır; env.render()'ın döndürdüğü kare (rgb_array modunda yüzeyin
+    kendisi) doğrudan sıradaki yuvaya kopyalanır, kare başına başka ayırma
+    yapılmaz. downsample > 1 ise her eksende her downsample'ıncı piksel alınır.
+
+    directory verilmezse kayıt bellekte kalır; sığmayan episode atılır ve
+    record_episode() None döner. directory verilirse dizi dolduğunda kareler
+    sıkıştırılmış parça olarak ({directory}/frames_{parça:05d}.npz) yazılır
+    ve dizi yeniden kullanılır; meta.json episode dizinini tutar
+    (bkz. RecordingReader). Episode'lar parça sınırlarını aşabilir.
+    """
+
+    def __init__(self, env, capacity=1000, directory=None, downsample=1):
+        if env.render_mode != "rgb_array":
+            raise ValueError("EpisodeRecorder için render_mode='rgb_array' gerekli")
+        self.env = env
+        self.capacity = capacity
+        self.directory = directory
+        self.downsample = downsample
+
+        width, height = env.window_size
+        self.frame_shape = (-(-height // downsample), -(-width // downsample), 3)
+        self.frames = np.zeros((capacity,) + self.frame_shape, dtype=np.uint8)
+        self.episodes = {name: [] for name in EPISODE_COLUMNS}
+        self._position = 0
+        self._chunk = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._write_meta()
+
+    @property
+    def frame_count(self):
+        """Kaydedilen toplam kare sayısı (diske yazılan parçalar dahil)"""
+        return self._chunk * self.capacity + self._position
+
+    def __len__(self):
+        return len(self.episodes['start'])
+
+    def add_frame(self, frame):
+        """Kareyi sıradaki yuvaya kopyala; bellekte yer kalmadıysa False"""
+        if self._position == self.capacity:
+            if self.directory is None:
+                return False
+            self.flush()
+        d = self.downsample
+        np.copyto(self.frames[self._position], frame[::d, ::d] if d > 1 else frame)
+        self._position += 1
+        return True
+
+    def record_episode(self, policy=None, rng=None):
+        """
+        Bir episode oynat ve her adımın karesini kaydet
+
+        Args:
+            policy: act(state) metodu olan politika (policy.CompiledPolicy),
+                    state -> aksiyon fonksiyonu ya da None (rastgele)
+            rng: Rastgele aksiyonlar için üretici
+
+        Returns:
+            episode özeti (start, length, reward, success) ya da bellekte
+            yer kalmadıysa None
+        """
+        env = self.env
+        if policy is None:
+            rng = rng or np.random.default_rng()
+            act = lambda state: rng.integers(env.action_space.n)
+        else:
+            act = policy.act if hasattr(policy, 'act') else policy
+
+        start = self.frame_count
+        state, _ = env.reset()
+        recorded = self.add_frame(env.render())
+        total_reward = 0
+        done = False
+        while recorded and not done:
+            state, reward, done, _, _ = env.step(act(state))
+            total_reward += reward
+            recorded = self.add_frame(env.render())
+
+        if not recorded:
+            # Yalnızca tam episode'lar tutulur
+            self._position = start - self._chunk * self.capacity
+            return None
+
+        summary = {'start': start, 'length': self.frame_count - start,
+                   'reward': float(total_reward), 'success': bool(total_reward > 0)}
+        for name, value in summary.items():
+            self.episodes[name].append(value)
+        return summary
+
+    def record(self, policy=None, episodes=100, rng=None):
+        """En fazla episodes kadar episode kaydet; kaydedilen sayıyı döndür"""
+        for count in range(episodes):
+            if self.record_episode(policy, rng) is None:
+                return count
+        return episodes
+
+    def episode_frames(self, index):
+        """Bellekteki kayıttan episode karelerini (görünüm) döndür"""
+        if self.directory is not None:
+            raise ValueError("Diske yazılan kayıtlar RecordingReader ile okunur")
+        start = self.episodes['start'][index]
+        return self.frames[start:start + self.episodes['length'][index]]
+
+    def save(self, path):
+        """Bellekteki kaydı tek bir sıkıştırılmış .npz dosyasına yaz"""
+        arrays = {name: np.array(values, dtype=EPISODE_COLUMNS[name])
+                  for name, values in self.episodes.items()}
+        _atomic_savez(path, compressed=True, frames=self.frames[:self._position], **arrays)
+
+    def flush(self):
+        """Dizideki kareleri sıradaki parçaya yaz (yalnızca directory ile)"""
+        if self.directory is None or self._position == 0:
+            return
+        path = os.path.join(self.directory, f"frames_{self._chunk:05d}.npz")
+        _atomic_savez(path, compressed=True, frames=self.frames[:self._position])
+        # Yarım parça bir sonraki flush'ta üzerine yazılmasın diye dizi her zaman sıfırlanır
+        self._chunk += 1
+        self._position = 0
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            'frame_shape': list(self.frame_shape),
+            'downsample': self.downsample,
+            'chunks': self._chunk,
+            'frames': self.frame_count,
+            'episodes': self.episodes,
+        }
+        tmp_path = os.path.join(self.directory, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.directory, "meta.json"))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class RecordingReader:
+    """
+    EpisodeRecorder dizinini oku; yalnızca istenen episode'un düştüğü
+    parçalar açılır (son açılan parça önbellekte tutulur).
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.frame_shape = tuple(meta['frame_shape'])
+        self.downsample = meta['downsample']
+        self.frames = meta['frames']
+        self.episodes = {name: np.array(meta['episodes'][name], dtype=dtype)
+                         for name, dtype in EPISODE_COLUMNS.items()}
+        # Parça sınırları (parçalar farklı uzunlukta olabilir)
+        self._chunk_starts = [0]
+        for chunk in range(meta['chunks']):
+            with np.load(self._chunk_path(chunk)) as data:
+                self._chunk_starts.append(self._chunk_starts[-1] + len(data['frames']))
+        self._cached = (None, None)
+
+    def _chunk_path(self, chunk):
+        return os.path.join(self.directory, f"frames_{chunk:05d}.npz")
+
+    def _load_chunk(self, chunk):
+        if self._cached[0] != chunk:
+            with np.load(self._chunk_path(chunk)) as data:
+                self._cached = (chunk, data['frames'])
+        return self._cached[1]
+
+    def __len__(self):
+        return len(self.episodes['start'])
+
+    def episode(self, index):
+        """Episode karelerini (length, yükseklik, genişlik, 3) dizi olarak döndür"""
+        start = int(self.episodes['start'][index])
+        stop = start + int(self.episodes['length'][index])
+        first = int(np.searchsorted(self._chunk_starts, start, side='right')) - 1
+        last = int(np.searchsorted(self._chunk_starts, stop - 1, side='right')) - 1
+        parts = []
+        for chunk in range(first, last + 1):
+            offset = self._chunk_starts[chunk]
+            parts.append(self._load_chunk(chunk)[max(start - offset, 0):stop - offset])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Episode'ları ekransız kaydet (rgb_array)")
+    parser.add_argument("policy", nargs="?", default="q_table.npy",
+                        help="Q-table ya da derlenmiş politika (.policy.npz); 'random' = rastgele")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--output", default="recordings",
+                        help="Kayıt dizini (sıkıştırılmış kare parçaları + meta.json)")
+    parser.add_argument("--capacity", type=int, default=2000,
+                        help="Önceden ayrılan kare dizisi / parça boyutu (kare)")
+    parser.add_argument("--downsample", type=int, default=2,
+                        help="Her eksende her N'inci piksel")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    from policy import load_policy_or_q_table
+
+    env = CustomTaxiEnv(render_mode="rgb_array")
+    env.reset(seed=args.seed)
+    policy = None
+    if args.policy != "random":
+        if not os.path.exists(args.policy):
+            print(f"HATA: {args.policy} bulunamadı!")
+            sys.exit(2)
+        policy = load_policy_or_q_table(args.policy, env)
+
+    with EpisodeRecorder(env, args.capacity, args.output, args.downsample) as recorder:
+        recorder.record(policy, args.episodes, np.random.default_rng(args.seed))
+
+    successes = np.count_nonzero(recorder.episodes['success'])
+    print("=" * 60)
+    print(f"✓ {len(recorder)} episode kaydedildi: {args.output}/")
+    print(f"  Kare: {recorder.frame_count} ({recorder.frame_shape[1]}x{recorder.frame_shape[0]})")
+    print(f"  Başarı: {successes}/{len(recorder)}")
+    print("=" * 60)
+    env.close()
@@ -0,0 +1,174 @@
+import numpy as np
+import argparse
+import os
+import sys
+import time
+from custom_taxi_env import CustomTaxiEnv
+from policy import CompiledPolicy, greedy_actions, load_policy_or_q_table
+
+# step() 201. adımda timeout verir (step_count > 200)
+EPISODE_STEPS = 201
+
+
+def start_states(env):
+    """
+    reset() ile üretilebilecek tüm başlangıç state'leri.
+    Taksi geçerli hücrede, yolcu != taksi, hedef != yolcu, yolcu taksi dışında
+    (varsayılan haritada 34 * 33 * 33 = 37026 state).
+    """
+    n_cells = env.rows * env.cols
+    cells = env.valid_cells
+    taxi, passenger, dest = (grid.ravel() for grid in
+                             np.meshgrid(cells, cells, cells, indexing="ij"))
+    keep = (passenger != taxi) & (dest != passenger)
+    return ((taxi[keep] * n_cells + passenger[keep]) * 2) * n_cells + dest[keep]
+
+
+def reaches_terminal(successor, goal, states):
+    """
+    Politika grafiğinde states'ten başlayan yol teslimata ulaşır mı?
+    Teslimat yapan state'ler bir yutak düğüme bağlanır ve işaretçi
+    ikilemesiyle (jump = jump[jump]) state sayısından uzun yollar izlenir;
+    döngüye giren yollar yutağa hiç ulaşmaz.
+    """
+    sink = len(successor)
+    jump = np.append(np.where(goal, sink, successor), sink)
+    hops = 1
+    while hops < len(jump):
+        jump = jump[jump]
+        hops *= 2
+    return jump[states] == sink
+
+
+def evaluate_policy(Q, env=None, max_steps=EPISODE_STEPS):
+    """
+    Açgözlü politikayı tüm başlangıç state'lerinden aynı anda çalıştır.
+    Rastgelelik yoktur; sonuçlar örnekleme değil tam kapsamadır.
+
+    Args:
+        Q: Q-table (tam ya da kompakt) veya CompiledPolicy
+        env: Haritası kullanılacak ortam (None = varsayılan CustomTaxiEnv)
+        max_steps: Episode uzunluğu sınırı (son adımda -10 timeout cezası)
+
+    Returns:
+        sonuç sözlüğü: success_rate (%), mean_steps / worst_steps (başarılı
+        episode'lar), mean_reward, loops (teslimata hiç ulaşmayan),
+        timeouts (ulaşır ama max_steps içinde değil), failed_states
+    """
+    start = time.perf_counter()
+    env = env or CustomTaxiEnv()
+    next_state, reward, terminal = env.build_transition_tables()
+    actions = Q.actions if isinstance(Q, CompiledPolicy) else greedy_actions(Q, env)
+
+    starts = start_states(env)
+    states = starts.copy()
+    steps = np.zeros(len(starts), dtype=np.int64)
+    returns = np.zeros(len(starts), dtype=np.float64)
+    active = np.arange(len(starts))
+
+    for step in range(1, max_steps + 1):
+        current = states[active]
+        action = actions[current]
+        returns[active] += reward[current, action]
+        states[active] = next_state[current, action]
+        delivered = terminal[current, action]
+        steps[active[delivered]] = step
+        active = active[~delivered]
+        if len(active) == 0:
+            break
+
+    returns[steps == max_steps] -= 10
+    returns[active] -= 10
+
+    # Başarısız başlangıçlar: döngü mü, yoksa yalnızca çok mu uzun?
+    state_ids = np.arange(len(next_state))
+    successor = next_state[state_ids, actions]
+    goal = terminal[state_ids, actions]
+    failed_states = starts[active]
+    eventually = reaches_terminal(successor, goal, failed_states)
+
+    success = steps > 0
+    successes = int(success.sum())
+    return {
+        'start_states': len(starts),
+        'successes': successes,
+        'success_rate': successes / len(starts) * 100,
+        'mean_steps': float(steps[success].mean()) if successes else float('nan'),
+        'worst_steps': int(steps.max()) if successes else 0,
+        'mean_reward': float(returns.mean()),
+        'loops': int((~eventually).sum()),
+        'timeouts': int(eventually.sum()),
+        'failed_states': failed_states,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def print_report(results, env=None, show_failures=5):
+    """Değerlendirme sonuçlarını yazdır"""
+    print("=" * 60)
+    print("AÇGÖZLÜ POLİTİKA DEĞERLENDİRMESİ (TÜM BAŞLANGIÇLAR)")
+    print("=" * 60)
+    print(f"Başlangıç state sayısı: {results['start_states']}")
+    print(f"Başarılı: {results['successes']} ({results['success_rate']:.2f}%)")
+    print(f"Ortalama adım: {results['mean_steps']:.2f}")
+    print(f"En kötü adım: {results['worst_steps']}")
+    print(f"Ortalama ödül: {results['mean_reward']:.2f}")
+    print(f"Döngüye giren: {results['loops']}")
+    print(f"Timeout (geç teslimat): {results['timeouts']}")
+    print(f"Süre: {results['elapsed'] * 1000:.1f} ms")
+
+    failed = results['failed_states']
+    if len(failed) and show_failures:
+        env = env or CustomTaxiEnv()
+        print(f"\nBaşarısız başlangıçlardan örnekler (ilk {min(show_failures, len(failed))}):")
+        for state in failed[:show_failures]:
+            taxi_row, taxi_col, pass_row, pass_col, _, dest_row, dest_col = env.decode(int(state))
+            print(f"  Taksi ({taxi_row}, {taxi_col})  Yolcu ({pass_row}, {pass_col})  "
+                  f"Hedef ({dest_row}, {dest_col})")
+    print("=" * 60)
+
+
+def check_gates(results, min_success=100.0, max_mean_steps=None, max_worst_steps=None):
+    """
+    Dağıtım kapısı: eşikleri sağlamayan metriklerin listesini döndür
+    (boş liste = geçti).
+    """
+    failures = []
+    if results['success_rate'] < min_success:
+        failures.append(f"başarı oranı {results['success_rate']:.2f}% < {min_success}%")
+    if max_mean_steps is not None and not results['mean_steps'] <= max_mean_steps:
+        failures.append(f"ortalama adım {results['mean_steps']:.2f} > {max_mean_steps}")
+    if max_worst_steps is not None and results['worst_steps'] > max_worst_steps:
+        failures.append(f"en kötü adım {results['worst_steps']} > {max_worst_steps}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Q-table'ı tüm başlangıç state'lerinde değerlendir")
+    parser.add_argument("q_table", nargs="?", default="q_table.npy",
+                        help="Değerlendirilecek Q-table ya da .policy.npz dosyası")
+    parser.add_argument("--max-steps", type=int, default=EPISODE_STEPS,
+                        help="Episode uzunluğu sınırı")
+    parser.add_argument("--min-success", type=float, default=100.0,
+                        help="Gereken en düşük başarı oranı (%%)")
+    parser.add_argument("--max-mean-steps", type=float, default=None,
+                        help="İzin verilen en yüksek ortalama adım")
+    parser.add_argument("--max-worst-steps", type=int, default=None,
+                        help="İzin verilen en yüksek adım sayısı")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.q_table):
+        print(f"HATA: {args.q_table} bulunamadı!")
+        sys.exit(2)
+
+    env = CustomTaxiEnv()
+    policy = load_policy_or_q_table(args.q_table, env)
+    results = evaluate_policy(policy, env, max_steps=args.max_steps)
+    print_report(results, env)
+
+    failures = check_gates(results, args.min_success, args.max_mean_steps, args.max_worst_steps)
+    if failures:
+        for failure in failures:
+            print(f"✗ Kapı geçilemedi: {failure}")
+        sys.exit(1)
+    print("✓ Tüm kapılar geçildi")
@@ -0,0 +1,167 @@
+import numpy as np
+import argparse
+import os
+import sys
+import time
+from custom_taxi_env import CustomTaxiEnv
+from policy import CompiledPolicy, compile_policy, load_policy_or_q_table
+
+# Adım türleri (istatistik için)
+STEP_EMPTY = 0   # Yolcusuz sürüş (yolcuya gidiş)
+STEP_LOADED = 1  # Yolculu sürüş
+STEP_WASTED = 2  # Geçersiz hareket / yanlış pickup-dropoff (taksi yerinde kalır)
+
+
+def policy_successor_tables(policy, env):
+    """
+    Politika altında state başına sonraki state, teslimat ve adım türü.
+    Filo simülasyonu her adımda yalnızca bu tablolardan okuma yapar.
+    """
+    next_state, reward, terminal = env.build_transition_tables()
+    states = np.arange(len(next_state))
+    actions = policy.actions
+    successor = next_state[states, actions].astype(np.int64)
+    delivers = terminal[states, actions]
+
+    in_taxi = env._decode_cells(states)[2].astype(bool)
+    step_kind = np.where(in_taxi, STEP_LOADED, STEP_EMPTY).astype(np.uint8)
+    step_kind[reward[states, actions] <= -10] = STEP_WASTED
+    return successor, delivers, step_kind
+
+
+def simulate_fleet(policy, num_taxis=1000, steps=10000, seed=None, job_step_limit=200,
+                   step_seconds=10.0, env=None):
+    """
+    Tek politikayla sürekli görevdeki taksi filosunu başsız simüle et.
+    Taksi yolcuyu bıraktığı yerde kalır ve hemen yeni görev alır
+    (reset_passenger() kuralları, sample_passengers ile toplu).
+
+    Args:
+        policy: CompiledPolicy ya da Q-table (tam veya kompakt)
+        num_taxis: Filodaki taksi sayısı
+        steps: Simüle edilecek adım sayısı (taksi başına)
+        seed: Doğum/görev üretimi tohumu
+        job_step_limit: Bu kadar adımda bitmeyen görev başarısız sayılır
+                        ve taksiye yeni yolcu verilir
+        step_seconds: Bir adımın simüle süresi (görev/saat hesabı için)
+        env: Haritası kullanılacak ortam (None = varsayılan CustomTaxiEnv)
+
+    Returns:
+        sonuç sözlüğü (jobs, failed_jobs, jobs_per_hour, oranlar, kuyruk süreleri)
+    """
+    env = env or CustomTaxiEnv()
+    if not isinstance(policy, CompiledPolicy):
+        policy = compile_policy(policy, env)
+    n_cells = env.rows * env.cols
+    successor, delivers, step_kind = policy_successor_tables(policy, env)
+    rng = np.random.default_rng(seed)
+
+    taxi, passenger, dest = env.sample_spawns(num_taxis, rng)
+    state = ((taxi * n_cells + passenger) * 2) * n_cells + dest
+    job_steps = np.zeros(num_taxis, dtype=np.int64)
+
+    kind_counts = np.zeros(3, dtype=np.int64)
+    # Görev süresi histogramı (adım); kuyruk yüzdelikleri buradan
+    duration_counts = np.zeros(job_step_limit + 1, dtype=np.int64)
+    failed_jobs = 0
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        kind_counts += np.bincount(step_kind[state], minlength=3)
+        finished = delivers[state]
+        state = successor[state]
+        job_steps += 1
+
+        timed_out = job_steps >= job_step_limit
+        timed_out &= ~finished
+        renew = finished | timed_out
+        if not renew.any():
+            continue
+
+        done_index = np.flatnonzero(finished)
+        duration_counts += np.bincount(job_steps[done_index], minlength=job_step_limit + 1)
+        failed_jobs += int(np.count_nonzero(timed_out))
+
+        # Taksi aynı yerde kalır, yalnızca yolcu ve hedef yenilenir
+        renew_index = np.flatnonzero(renew)
+        taxi_cells = state[renew_index] // (n_cells * 2 * n_cells)
+        passenger, dest = env.sample_passengers(taxi_cells, rng)
+        state[renew_index] = ((taxi_cells * n_cells + passenger) * 2) * n_cells + dest
+        job_steps[renew_index] = 0
+    elapsed = time.perf_counter() - start
+
+    jobs = int(duration_counts.sum())
+    total_steps = num_taxis * steps
+    simulated_hours = steps * step_seconds / 3600
+    cumulative = np.cumsum(duration_counts)
+
+    def percentile(q):
+        if jobs == 0:
+            return float('nan')
+        return int(np.searchsorted(cumulative, q / 100 * jobs))
+
+    return {
+        'num_taxis': num_taxis,
+        'steps': steps,
+        'jobs': jobs,
+        'failed_jobs': failed_jobs,
+        'jobs_per_hour': jobs / simulated_hours,
+        'jobs_per_taxi_hour': jobs / simulated_hours / num_taxis,
+        'empty_ratio': kind_counts[STEP_EMPTY] / total_steps,
+        'loaded_ratio': kind_counts[STEP_LOADED] / total_steps,
+        'wasted_ratio': kind_counts[STEP_WASTED] / total_steps,
+        'mean_job_steps': float((duration_counts * np.arange(len(duration_counts))).sum() / jobs)
+                          if jobs else float('nan'),
+        'p50_job_steps': percentile(50),
+        'p95_job_steps': percentile(95),
+        'p99_job_steps': percentile(99),
+        'max_job_steps': int(np.flatnonzero(duration_counts)[-1]) if jobs else 0,
+        'elapsed': elapsed,
+        'steps_per_sec': total_steps / elapsed,
+    }
+
+
+def print_fleet_report(results, step_seconds=10.0):
+    print("=" * 60)
+    print("FİLO SİMÜLASYONU")
+    print("=" * 60)
+    print(f"Taksi sayısı: {results['num_taxis']}")
+    print(f"Simüle adım (taksi başına): {results['steps']} "
+          f"({results['steps'] * step_seconds / 3600:.1f} saat, adım = {step_seconds} sn)")
+    print(f"Tamamlanan görev: {results['jobs']}")
+    print(f"Başarısız görev (süre aşımı): {results['failed_jobs']}")
+    print(f"Görev/saat (filo): {results['jobs_per_hour']:,.0f}")
+    print(f"Görev/saat (taksi başına): {results['jobs_per_taxi_hour']:.2f}")
+    print(f"Boş sürüş oranı: {results['empty_ratio'] * 100:.1f}%")
+    print(f"Yolculu sürüş oranı: {results['loaded_ratio'] * 100:.1f}%")
+    print(f"Boşa giden adım oranı: {results['wasted_ratio'] * 100:.1f}%")
+    print(f"Görev süresi (adım): ortalama {results['mean_job_steps']:.2f}, "
+          f"p50 {results['p50_job_steps']}, p95 {results['p95_job_steps']}, "
+          f"p99 {results['p99_job_steps']}, en kötü {results['max_job_steps']}")
+    print(f"Simülasyon hızı: {results['steps_per_sec'] / 1e6:.1f} M adım/sn "
+          f"({results['elapsed']:.2f} sn)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Başsız taksi filosu simülasyonu")
+    parser.add_argument("policy", nargs="?", default="q_table.npy",
+                        help="Q-table ya da .policy.npz dosyası")
+    parser.add_argument("--taxis", type=int, default=10000, help="Taksi sayısı")
+    parser.add_argument("--steps", type=int, default=2000, help="Taksi başına adım")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--job-step-limit", type=int, default=200,
+                        help="Görev başına en fazla adım")
+    parser.add_argument("--step-seconds", type=float, default=10.0,
+                        help="Bir adımın simüle süresi (sn)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.policy):
+        print(f"HATA: {args.policy} bulunamadı!")
+        sys.exit(2)
+
+    env = CustomTaxiEnv()
+    policy = load_policy_or_q_table(args.policy, env)
+    results = simulate_fleet(policy, args.taxis, args.steps, args.seed,
+                             args.job_step_limit, args.step_seconds, env)
+    print_fleet_report(results, args.step_seconds)
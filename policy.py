@@ -0,0 +1,145 @@
+import numpy as np
+import argparse
+import os
+import sys
+from custom_taxi_env import CustomTaxiEnv
+from checkpoint import _atomic_savez, load_q_table
+
+# Derlenmiş politika dosyalarının uzantısı (bkz. load_policy)
+POLICY_SUFFIX = ".policy.npz"
+
+
+def greedy_actions(Q, env):
+    """
+    Her tam state için açgözlü aksiyon (np.argmax ile aynı eşitlik kuralı).
+    Kompakt Q-table'larda erişilemeyen state'lere 0 atanır.
+    """
+    row_index = env.q_row_index(Q)
+    actions = np.argmax(Q, axis=1).astype(np.uint8)
+    if row_index is None:
+        return actions
+    return np.where(row_index >= 0, actions[row_index], 0).astype(np.uint8)
+
+
+class CompiledPolicy:
+    """
+    Çıkarım için derlenmiş açgözlü politika
+
+    Tam state başına bir uint8 aksiyon tutar (varsayılan haritada 91 KB,
+    float64 Q-table 4.3 MB). İsteğe bağlı olarak ikinci en iyi aksiyon ve
+    en iyi ile ikinci arasındaki Q farkı (güven payı) saklanır.
+    """
+
+    def __init__(self, actions, second_actions=None, margins=None):
+        self.actions = actions
+        self.second_actions = second_actions
+        self.margins = margins
+
+    def __len__(self):
+        return len(self.actions)
+
+    @property
+    def nbytes(self):
+        """Politika dizilerinin toplam bellek kullanımı (bayt)"""
+        return sum(array.nbytes for array in (self.actions, self.second_actions, self.margins)
+                   if array is not None)
+
+    def act(self, state):
+        """Tek state için aksiyon"""
+        return int(self.actions[state])
+
+    def act_batch(self, states):
+        """State dizisi için aksiyon dizisi"""
+        return self.actions[states]
+
+    def save(self, path):
+        """Politikayı atomik olarak .policy.npz dosyasına yaz"""
+        arrays = {'actions': self.actions}
+        if self.second_actions is not None:
+            arrays['second_actions'] = self.second_actions
+            arrays['margins'] = self.margins
+        _atomic_savez(path, **arrays)
+
+
+def compile_policy(Q, env=None, second_best=False):
+    """
+    Q-table'ı (tam ya da kompakt) derlenmiş politikaya çevir.
+
+    Args:
+        Q: Q-table
+        env: Haritası kullanılacak ortam (None = varsayılan CustomTaxiEnv)
+        second_best: İkinci en iyi aksiyonu ve güven payını da hesapla
+    """
+    env = env or CustomTaxiEnv()
+    actions = greedy_actions(Q, env)
+    if not second_best:
+        return CompiledPolicy(actions)
+
+    Q = np.asarray(Q)
+    rows = np.arange(len(Q))
+    best = np.argmax(Q, axis=1)
+    masked = Q.astype(np.float64)
+    masked[rows, best] = -np.inf
+    second = np.argmax(masked, axis=1)
+    margin = (Q[rows, best] - Q[rows, second]).astype(np.float32)
+
+    row_index = env.q_row_index(Q)
+    if row_index is not None:
+        reachable = row_index >= 0
+        second = np.where(reachable, second[row_index], 0)
+        margin = np.where(reachable, margin[row_index], 0).astype(np.float32)
+    return CompiledPolicy(actions, second.astype(np.uint8), margin)
+
+
+def load_policy(path):
+    """Derlenmiş politikayı yükle (.policy.npz)"""
+    with np.load(path) as data:
+        if 'second_actions' in data:
+            return CompiledPolicy(data['actions'], data['second_actions'], data['margins'])
+        return CompiledPolicy(data['actions'])
+
+
+def load_policy_or_q_table(path, env=None):
+    """
+    Dosya derlenmiş politikaysa doğrudan, Q-table ise derleyerek yükle.
+    Tüketiciler (run_taxi, evaluate) iki formatı da bu yolla kabul eder.
+    """
+    if path.endswith(POLICY_SUFFIX):
+        return load_policy(path)
+    return compile_policy(load_q_table(path, mmap_mode="r"), env)
+
+
+def export_policy(q_table_path="q_table.npy", output_path=None, second_best=False):
+    """
+    Q-table dosyasını derlenmiş politika dosyasına dönüştür.
+
+    Returns:
+        yazılan dosyanın yolu
+    """
+    if output_path is None:
+        output_path = os.path.splitext(q_table_path)[0] + POLICY_SUFFIX
+    Q = load_q_table(q_table_path, mmap_mode="r")
+    policy = compile_policy(Q, second_best=second_best)
+    policy.save(output_path)
+
+    print(f"✓ Politika derlendi: {q_table_path} -> {output_path}")
+    print(f"  Q-table: {Q.nbytes / 1024:.0f} KB ({Q.dtype}), politika: {policy.nbytes / 1024:.0f} KB")
+    if policy.margins is not None:
+        print(f"  Güven payı = 0 (eşit Q) state sayısı: {np.count_nonzero(policy.margins == 0)}")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Q-table'dan derlenmiş politika üret")
+    parser.add_argument("q_table", nargs="?", default="q_table.npy",
+                        help="Kaynak Q-table dosyası")
+    parser.add_argument("--output", default=None,
+                        help=f"Çıktı dosyası (varsayılan: <q_table>{POLICY_SUFFIX})")
+    parser.add_argument("--second-best", action="store_true",
+                        help="İkinci en iyi aksiyonu ve güven payını da sakla")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.q_table):
+        print(f"HATA: {args.q_table} bulunamadı!")
+        sys.exit(2)
+    export_policy(args.q_table, args.output, args.second_best)
@@ -0,0 +1,368 @@
+import numpy as np
+import argparse
+import asyncio
+import os
+import socket
+import time
+from custom_taxi_env import CustomTaxiEnv
+from policy import load_policy_or_q_table
+
+# Geçersiz sorgular için yanıt satırı
+ERROR_REPLY = b"ERR"
+
+
+class PolicyServer:
+    """
+    Yerel mikro-toplu politika sunucusu (asyncio, Unix soketi ya da TCP)
+
+    Protokol satır tabanlıdır; her istek satırına bir yanıt satırı döner:
+    - "12345"                 : encode() ile üretilmiş state ID
+    - "tr tc pr pc in dr dc"  : encode() argüman sırasıyla 7 sayı
+    - "taxi pass dest in"     : hücre indeksleri (row * cols + col) ve in_taxi
+    Yanıt aksiyon numarasıdır (0-5), geçersiz sorguda "ERR".
+
+    Bir okumada gelen tüm satırlar tek parça olarak çözülür; aynı olay
+    döngüsü turunda bekleyen tüm bağlantıların parçaları birleştirilip tek
+    vektörel tablo okumasıyla yanıtlanır. Kaynak dosyanın mtime'ı değişince
+    politika arka planda yeniden yüklenir ve referans iki toplu okuma
+    arasında değiştirilir; bekleyen istekler düşmez.
+    """
+
+    def __init__(self, path="q_table.npy", reload_interval=1.0, env=None):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.env = env or CustomTaxiEnv()
+        self.n_cells = self.env.rows * self.env.cols
+        self.n_states = self.env.observation_space.n
+
+        self.policy = load_policy_or_q_table(path, self.env)
+        self._mtime = os.stat(path).st_mtime_ns
+        self._failed_mtime = None
+        self._pending = []
+        self._wakeup = None
+        self._server = None
+        self._tasks = []
+
+        self.requests = 0
+        self.batches = 0
+        self.reloads = 0
+        self.reload_failures = 0
+
+    # ------------------------------------------------------------------
+    # Sorgu çözme ve toplu okuma
+    # ------------------------------------------------------------------
+
+    def parse_queries(self, data):
+        """
+        Satır bloğunu state ID dizisine çevir (geçersiz satırlar -1).
+        Her satır tek sayıysa tek np.array çağrısıyla çözülür.
+        """
+        lines = data.split(b"\n")
+        tokens = data.split()
+        if len(tokens) == len(lines) and b" " not in data and b"," not in data:
+            try:
+                states = np.array(tokens, dtype=np.int64)
+            except (ValueError, OverflowError):
+                pass
+            else:
+                states[(states < 0) | (states >= self.n_states)] = -1
+                return states
+
+        states = np.empty(len(lines), dtype=np.int64)
+        for i, line in enumerate(lines):
+            states[i] = self._parse_line(line)
+        return states
+
+    def _parse_line(self, line):
+        """Tek satırı state ID'ye çevir (geçersizse -1)"""
+        fields = line.replace(b",", b" ").replace(b"(", b" ").replace(b")", b" ").split()
+        try:
+            values = [int(field) for field in fields]
+        except ValueError:
+            return -1
+
+        if len(values) == 1:
+            state = values[0]
+        elif len(values) == 7:
+            taxi_row, taxi_col, pass_row, pass_col, in_taxi, dest_row, dest_col = values
+            coords = (taxi_row, pass_row, dest_row, taxi_col, pass_col, dest_col)
+            if not all(0 <= value < limit for value, limit in
+                       zip(coords, (self.env.rows,) * 3 + (self.env.cols,) * 3)):
+                return -1
+            state = self.env.encode(taxi_row, taxi_col, pass_row, pass_col,
+                                    in_taxi, dest_row, dest_col)
+        elif len(values) == 4:
+            taxi, passenger, dest, in_taxi = values
+            if not all(0 <= cell < self.n_cells for cell in (taxi, passenger, dest)):
+                return -1
+            state = ((taxi * self.n_cells + passenger) * 2 + bool(in_taxi)) * self.n_cells + dest
+        else:
+            return -1
+        return state if 0 <= state < self.n_states else -1
+
+    def lookup(self, states):
+        """State ID dizisi için aksiyonlar (geçersiz state'ler -1)"""
+        actions = self.policy.actions[states].astype(np.int16)
+        actions[states < 0] = -1
+        return actions
+
+    @staticmethod
+    def format_replies(actions):
+        """Aksiyon dizisini yanıt satırlarına çevir"""
+        replies = [ERROR_REPLY if action < 0 else b"%d" % action for action in actions.tolist()]
+        return b"\n".join(replies) + b"\n"
+
+    # ------------------------------------------------------------------
+    # asyncio sunucusu
+    # ------------------------------------------------------------------
+
+    async def _batch_loop(self):
+        """Bekleyen parçaları birleştirip tek tablo okumasıyla yanıtla"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Aynı turda gelen diğer bağlantıların parçalarını da topla
+            await asyncio.sleep(0)
+            pending, self._pending = self._pending, []
+            if not pending:
+                continue
+
+            states = np.concatenate([chunk for chunk, _ in pending])
+            actions = self.lookup(states)
+            offset = 0
+            for chunk, future in pending:
+                if not future.done():
+                    future.set_result(actions[offset:offset + len(chunk)])
+                offset += len(chunk)
+
+            self.requests += len(states)
+            self.batches += 1
+
+    async def _handle_client(self, reader, writer):
+        """Bağlantı başına: tam satırları oku, toplu okumaya gönder, yanıtla"""
+        loop = asyncio.get_running_loop()
+        buffer = b""
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                lines, newline, buffer = buffer.rpartition(b"\n")
+                if not newline:
+                    buffer = lines + buffer
+                    continue
+
+                future = loop.create_future()
+                self._pending.append((self.parse_queries(lines), future))
+                self._wakeup.set()
+                writer.write(self.format_replies(await future))
+                await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+    async def _reload_loop(self):
+        """Kaynak dosya değişince politikayı yeniden yükle"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                continue
+            if mtime == self._mtime:
+                continue
+
+            try:
+                # Yükleme/derleme olay döngüsünü bloklamasın
+                policy = await loop.run_in_executor(None, load_policy_or_q_table,
+                                                    self.path, self.env)
+            except Exception as e:
+                # Yarım yazılmış dosya vb. (EOFError, UnpicklingError, ...): eski
+                # politikayla devam edilir, sonraki turda yeniden denenir
+                self.reload_failures += 1
+                if mtime != self._failed_mtime:
+                    self._failed_mtime = mtime
+                    print(f"⚠️  Yeniden yükleme başarısız ({self.path}): "
+                          f"{type(e).__name__}: {e}")
+                continue
+            self._mtime = mtime
+            self.policy = policy
+            self.reloads += 1
+            print(f"⟳ Politika yeniden yüklendi: {self.path} (#{self.reloads})")
+
+    async def start(self, unix_path=None, host="127.0.0.1", port=8765):
+        """Sunucuyu başlat (unix_path verilirse Unix soketi, yoksa TCP)"""
+        self._wakeup = asyncio.Event()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self._server = await asyncio.start_unix_server(self._handle_client, path=unix_path)
+        else:
+            self._server = await asyncio.start_server(self._handle_client, host, port)
+        self._tasks = [asyncio.create_task(self._batch_loop())]
+        if self.reload_interval:
+            self._tasks.append(asyncio.create_task(self._reload_loop()))
+        return self._server
+
+    async def stop(self):
+        """Sunucuyu ve arka plan görevlerini durdur"""
+        self._server.close()
+        await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def serve_forever(self, unix_path=None, host="127.0.0.1", port=8765):
+        server = await self.start(unix_path, host, port)
+        address = unix_path or f"{host}:{port}"
+        print("=" * 60)
+        print("POLİTİKA SUNUCUSU")
+        print("=" * 60)
+        print(f"Kaynak: {self.path}")
+        print(f"Adres: {address}")
+        print(f"Yeniden yükleme kontrolü: {self.reload_interval} sn")
+        print("=" * 60)
+        try:
+            await server.serve_forever()
+        finally:
+            print(f"\nİstek: {self.requests}, toplu okuma: {self.batches}, "
+                  f"ortalama toplu boyut: {self.requests / max(self.batches, 1):.1f}")
+
+
+class PolicyClient:
+    """
+    Sunucuya bağlanan basit senkron istemci (dağıtım süreçleri için)
+
+    actions(states) bir dizi state ID'yi tek yazmada gönderir ve
+    yanıtları aynı sırayla döndürür (geçersiz sorgular -1).
+    """
+
+    def __init__(self, unix_path=None, host="127.0.0.1", port=8765):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port))
+        self._file = self.sock.makefile("rb")
+
+    def actions(self, states):
+        """State ID'leri (ya da sorgu satırları) için aksiyonlar"""
+        lines = [state if isinstance(state, bytes) else b"%d" % state for state in states]
+        self.sock.sendall(b"\n".join(lines) + b"\n")
+        replies = [self._file.readline().strip() for _ in lines]
+        return [-1 if reply == ERROR_REPLY else int(reply) for reply in replies]
+
+    def action(self, state):
+        return self.actions([state])[0]
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def _bench_connection(open_connection, states, pipeline, latencies):
+    """Tek bağlantı: states'i pipeline'lık parçalar halinde gönder/bekle"""
+    reader, writer = await open_connection()
+    for start in range(0, len(states), pipeline):
+        chunk = states[start:start + pipeline]
+        payload = b"\n".join(b"%d" % state for state in chunk.tolist()) + b"\n"
+        sent = time.perf_counter()
+        writer.write(payload)
+        await writer.drain()
+        for _ in range(len(chunk)):
+            await reader.readline()
+        latencies.append(time.perf_counter() - sent)
+    writer.close()
+
+
+async def run_benchmark(unix_path=None, host="127.0.0.1", port=8765,
+                        connections=16, requests=200000, pipeline=64, seed=0):
+    """
+    Gecikme/verim ölçümü: connections adet eşzamanlı bağlantı, her biri
+    pipeline'lık parçalarla toplam requests sorgu gönderir.
+
+    Returns:
+        qps, parça başına p50/p99 gecikme (ms)
+    """
+    if unix_path:
+        def open_connection():
+            return asyncio.open_unix_connection(unix_path)
+    else:
+        def open_connection():
+            return asyncio.open_connection(host, port)
+
+    env = CustomTaxiEnv()
+    rng = np.random.default_rng(seed)
+    per_connection = requests // connections
+    latencies = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _bench_connection(open_connection,
+                          rng.integers(env.observation_space.n, size=per_connection),
+                          pipeline, latencies)
+        for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': per_connection * connections,
+        'elapsed': elapsed,
+        'qps': per_connection * connections / elapsed,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def print_benchmark(results, connections, pipeline):
+    print("=" * 60)
+    print("POLİTİKA SUNUCUSU ÖLÇÜMÜ")
+    print("=" * 60)
+    print(f"Bağlantı: {connections}, parça boyutu: {pipeline}")
+    print(f"Toplam sorgu: {results['requests']}")
+    print(f"Süre: {results['elapsed']:.2f} sn")
+    print(f"Verim: {results['qps']:,.0f} sorgu/sn")
+    print(f"Parça gecikmesi p50: {results['latency_p50_ms']:.3f} ms")
+    print(f"Parça gecikmesi p99: {results['latency_p99_ms']:.3f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yerel mikro-toplu politika sunucusu")
+    parser.add_argument("mode", choices=["serve", "bench"],
+                        help="serve: sunucuyu başlat, bench: çalışan sunucuyu ölç")
+    parser.add_argument("--policy", default="q_table.npy",
+                        help="Q-table ya da .policy.npz dosyası")
+    parser.add_argument("--unix", default=None,
+                        help="Unix soket yolu (verilmezse TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reload-interval", type=float, default=1.0,
+                        help="Dosya değişikliği kontrol aralığı (sn, 0 = kapalı)")
+    parser.add_argument("--connections", type=int, default=16,
+                        help="bench: eşzamanlı bağlantı sayısı")
+    parser.add_argument("--requests", type=int, default=200000,
+                        help="bench: toplam sorgu sayısı")
+    parser.add_argument("--pipeline", type=int, default=64,
+                        help="bench: bağlantı başına tek yazmadaki sorgu sayısı")
+    args = parser.parse_args()
+
+    if args.mode == "serve":
+        server = PolicyServer(args.policy, reload_interval=args.reload_interval)
+        try:
+            asyncio.run(server.serve_forever(args.unix, args.host, args.port))
+        except KeyboardInterrupt:
+            print("\n⏸ Sunucu durduruldu.")
+    else:
+        results = asyncio.run(run_benchmark(args.unix, args.host, args.port,
+                                            args.connections, args.requests, args.pipeline))
+        print_benchmark(results, args.connections, args.pipeline)
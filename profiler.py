@@ -0,0 +1,90 @@
+import numpy as np
+import json
+
+
+class PhaseProfiler:
+    """
+    Eğitim döngüsü için faz bazlı süre ölçer
+
+    Her faz için toplam süre ve çağrı sayısı tutulur. Adım gecikmesi
+    (aksiyon seçimi + env.step + güncelleme) her sample_every adımda bir
+    logaritmik aralıklı bir histograma eklenir.
+
+    'monitor' fazı yakınsama izlemesidir (tüm başlangıç state'lerinde
+    açgözlü değerlendirme dahil); istatistik kayıtlarından ayrı tutulur.
+
+    Kapalıyken maliyet olmaması için eğitim döngüsü profiler None
+    değilse ölçüm yapar; bu sınıf yalnızca açıkken oluşturulur.
+    """
+
+    PHASES = ('action', 'env_step', 'update', 'stats', 'monitor', 'checkpoint')
+
+    def __init__(self, sample_every=64, min_latency=1e-7, max_latency=1e-2, bins=40):
+        self.sample_every = sample_every
+        self.totals = dict.fromkeys(self.PHASES, 0.0)
+        self.counts = dict.fromkeys(self.PHASES, 0)
+        # Kenarlar saniye cinsinden; ilk/son kutu aralık dışını da toplar
+        self.bin_edges = np.geomspace(min_latency, max_latency, bins + 1)
+        self.histogram = np.zeros(bins, dtype=np.int64)
+        self._until_sample = sample_every
+
+    def add(self, phase, seconds):
+        """Bir fazın tek çağrısını kaydet"""
+        self.totals[phase] += seconds
+        self.counts[phase] += 1
+
+    def add_step(self, action_time, step_time, update_time):
+        """Bir eğitim adımının üç fazını tek çağrıda kaydet"""
+        totals = self.totals
+        counts = self.counts
+        totals['action'] += action_time
+        totals['env_step'] += step_time
+        totals['update'] += update_time
+        counts['action'] += 1
+        counts['env_step'] += 1
+        counts['update'] += 1
+
+        self._until_sample -= 1
+        if self._until_sample == 0:
+            self._until_sample = self.sample_every
+            latency = action_time + step_time + update_time
+            index = np.searchsorted(self.bin_edges, latency) - 1
+            self.histogram[min(max(index, 0), len(self.histogram) - 1)] += 1
+
+    def latency_percentile(self, q):
+        """Örneklenen adım gecikmesinin yaklaşık yüzdeliği (kutu üst kenarı, saniye)"""
+        total = self.histogram.sum()
+        if total == 0:
+            return 0.0
+        index = np.searchsorted(np.cumsum(self.histogram), q / 100 * total)
+        return float(self.bin_edges[min(index + 1, len(self.bin_edges) - 1)])
+
+    def print_report(self):
+        """Faz tablosunu yazdır"""
+        grand_total = sum(self.totals.values()) or 1.0
+        print("  Profil (kümülatif):")
+        for phase in self.PHASES:
+            count = self.counts[phase]
+            per_call = self.totals[phase] / count * 1e6 if count else 0.0
+            print(f"    {phase:<11} {self.totals[phase]:8.2f} sn  "
+                  f"{count:>10} çağrı  {per_call:8.2f} µs/çağrı  "
+                  f"{self.totals[phase] / grand_total * 100:5.1f}%")
+        print(f"    adım gecikmesi p50 ≤ {self.latency_percentile(50) * 1e6:.1f} µs, "
+              f"p99 ≤ {self.latency_percentile(99) * 1e6:.1f} µs")
+
+    def to_dict(self):
+        return {
+            'phases': {phase: {'total_seconds': self.totals[phase],
+                               'calls': self.counts[phase]}
+                       for phase in self.PHASES},
+            'step_latency_histogram': {
+                'bin_edges_seconds': self.bin_edges.tolist(),
+                'counts': self.histogram.tolist(),
+                'sample_every': self.sample_every,
+            },
+        }
+
+    def export(self, path):
+        """Profili JSON olarak kaydet"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
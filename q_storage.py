@@ -0,0 +1,311 @@
+import numpy as np
+import argparse
+import os
+import sys
+from checkpoint import _atomic_savez
+
+# Seyrek Q-table dosyalarının uzantısı (bkz. checkpoint.load_q_table)
+SPARSE_SUFFIX = ".sparse.npz"
+
+# Boş hash yuvası işareti ve Fibonacci hash çarpanı (2^64 / altın oran)
+_EMPTY = -1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+# Tekil state indeksi sayılan tipler (skaler hızlı yol)
+_SCALAR_TYPES = (int, np.integer)
+
+
+class SparseQTable:
+    """
+    Seyrek, dizi tabanlı Q-table (açık adresleme, doğrusal yoklama)
+
+    Yalnızca güncellenen state'ler için satır ayrılır; okunmamış/yazılmamış
+    state'ler sıfır satır gibi davranır. Erişim arayüzü yoğun diziyle aynıdır:
+        Q[state]              -> satır (aksiyon değerleri)
+        Q[state, action]      -> skaler
+        Q[state, action] = v  -> satır yoksa ayrılır
+        Q[states]             -> (len(states), n_actions) toplu okuma
+        Q[states] = rows      -> toplu yazma
+    np.asarray(Q) / to_dense() yoğun .npy formatına, from_dense() geri çevirir.
+
+    Hash tablosu (keys, slot_rows) yük oranı max_load'u aşınca iki katına
+    büyür; satır değerleri ayrı bir dizide ekleme sırasıyla tutulur.
+    """
+
+    def __init__(self, n_states, n_actions, dtype=np.float64, capacity=1024, max_load=0.5):
+        self.shape = (n_states, n_actions)
+        self.dtype = np.dtype(dtype)
+        self.max_load = max_load
+
+        self._size = 0
+        self._values = np.zeros((capacity, n_actions), dtype=self.dtype)
+        self._row_keys = np.empty(capacity, dtype=np.int64)
+        self._zero_row = np.zeros(n_actions, dtype=self.dtype)
+        self._zero_row.flags.writeable = False
+        self._allocate_slots(self._slot_capacity(capacity))
+
+    # ------------------------------------------------------------------
+    # Hash tablosu
+    # ------------------------------------------------------------------
+
+    def _slot_capacity(self, rows):
+        """rows kadar anahtarı max_load altında tutan 2'nin kuvveti"""
+        capacity = 16
+        while capacity * self.max_load < rows:
+            capacity *= 2
+        return capacity
+
+    def _allocate_slots(self, capacity):
+        self._bits = capacity.bit_length() - 1
+        self._shift = 64 - self._bits
+        self._mask = capacity - 1
+        self._keys = np.full(capacity, _EMPTY, dtype=np.int64)
+        self._slot_rows = np.empty(capacity, dtype=np.int64)
+
+    def _hash(self, states):
+        """Vektörel Fibonacci hash (uint64 taşması kasıtlı)"""
+        with np.errstate(over="ignore"):
+            mixed = states.astype(np.uint64) * np.uint64(_GOLDEN)
+        return (mixed >> np.uint64(self._shift)).astype(np.int64)
+
+    def _find(self, state):
+        """Skaler arama: satır indeksi ya da -1"""
+        slot = ((state * _GOLDEN) & _MASK64) >> self._shift
+        # ndarray.item Python int döndürür; numpy skalerinden belirgin hızlı
+        key_at = self._keys.item
+        key = key_at(slot)
+        while key != state:
+            if key == _EMPTY:
+                return -1
+            slot = (slot + 1) & self._mask
+            key = key_at(slot)
+        return self._slot_rows.item(slot)
+
+    def lookup(self, states):
+        """Toplu arama: state dizisi için satır indeksleri (yoksa -1)"""
+        states = np.asarray(states, dtype=np.int64)
+        rows = np.full(states.shape, -1, dtype=np.int64)
+        slots = self._hash(states)
+        pending = np.arange(states.size)
+        flat_states = states.reshape(-1)
+        flat_rows = rows.reshape(-1)
+        slots = slots.reshape(-1)
+        while pending.size:
+            keys = self._keys[slots[pending]]
+            hit = keys == flat_states[pending]
+            flat_rows[pending[hit]] = self._slot_rows[slots[pending[hit]]]
+            pending = pending[~hit & (keys != _EMPTY)]
+            slots[pending] = (slots[pending] + 1) & self._mask
+        return rows
+
+    def _insert_slots(self, states, rows):
+        """Tabloda olmayan, birbirinden farklı anahtarları toplu yerleştir"""
+        slots = self._hash(states)
+        pending = np.arange(len(states))
+        while pending.size:
+            candidate_slots = slots[pending]
+            free = self._keys[candidate_slots] == _EMPTY
+            # Aynı boş yuvayı hedefleyenlerden ilki kazanır
+            free_slots, first = np.unique(candidate_slots[free], return_index=True)
+            winners = pending[free][first]
+            self._keys[free_slots] = states[winners]
+            self._slot_rows[free_slots] = rows[winners]
+
+            placed = np.zeros(len(states), dtype=bool)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+            slots[pending] = (slots[pending] + 1) & self._mask
+
+    def _grow_rows(self, needed):
+        """Satır dizilerini gerekirse iki katına büyüt, hash tablosunu yeniden kur"""
+        if needed > len(self._values):
+            capacity = max(needed, 2 * len(self._values))
+            values = np.zeros((capacity, self.shape[1]), dtype=self.dtype)
+            values[:self._size] = self._values[:self._size]
+            row_keys = np.empty(capacity, dtype=np.int64)
+            row_keys[:self._size] = self._row_keys[:self._size]
+            self._values, self._row_keys = values, row_keys
+
+        if needed > len(self._keys) * self.max_load:
+            self._allocate_slots(self._slot_capacity(needed))
+            self._insert_slots(self._row_keys[:self._size], np.arange(self._size))
+
+    def _find_or_insert(self, state):
+        """Skaler: satır indeksi, yoksa sıfır satır ayır"""
+        row = self._find(state)
+        if row >= 0:
+            return row
+        self._grow_rows(self._size + 1)
+        row = self._size
+        self._size += 1
+        self._row_keys[row] = state
+        self._insert_slots(np.array([state], dtype=np.int64), np.array([row]))
+        return row
+
+    def _find_or_insert_many(self, states):
+        """Toplu: satır indeksleri, eksik state'ler için satır ayır"""
+        states = np.asarray(states, dtype=np.int64)
+        rows = self.lookup(states)
+        missing = np.unique(states[rows < 0])
+        if missing.size:
+            self._grow_rows(self._size + missing.size)
+            new_rows = np.arange(self._size, self._size + missing.size)
+            self._row_keys[new_rows] = missing
+            self._size += missing.size
+            self._insert_slots(missing, new_rows)
+            rows = self.lookup(states)
+        return rows
+
+    # ------------------------------------------------------------------
+    # Yoğun dizi arayüzü
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return self.shape[0]
+
+    @property
+    def visited(self):
+        """Satır ayrılmış state sayısı"""
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Hash tablosu ve satır dizilerinin toplam bellek kullanımı (bayt)"""
+        return (self._keys.nbytes + self._slot_rows.nbytes +
+                self._values.nbytes + self._row_keys.nbytes)
+
+    def states(self):
+        """Satır ayrılmış state'ler (ekleme sırasıyla)"""
+        return self._row_keys[:self._size]
+
+    def rows(self):
+        """states() ile aynı sıradaki satır değerleri (görünüm)"""
+        return self._values[:self._size]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            state, action = key
+            if isinstance(state, _SCALAR_TYPES):
+                row = self._find(int(state))
+                return self._values[row, action] if row >= 0 else self.dtype.type(0)
+            return self.get_rows(state)[np.arange(np.size(state)), action]
+        if isinstance(key, _SCALAR_TYPES):
+            row = self._find(int(key))
+            return self._values[row] if row >= 0 else self._zero_row
+        return self.get_rows(key)
+
+    def __setitem__(self, key, value):
+        # Satır ayırma self._values'ı büyütebilir; önce satır indeksi alınır
+        if isinstance(key, tuple):
+            state, action = key
+            if isinstance(state, _SCALAR_TYPES):
+                row = self._find_or_insert(int(state))
+            else:
+                row = self._find_or_insert_many(state)
+            self._values[row, action] = value
+        elif isinstance(key, _SCALAR_TYPES):
+            row = self._find_or_insert(int(key))
+            self._values[row] = value
+        else:
+            rows = self._find_or_insert_many(key)
+            self._values[rows] = value
+
+    def get_rows(self, states):
+        """Toplu okuma: (len(states), n_actions), ayrılmamış satırlar sıfır"""
+        rows = self.lookup(states)
+        out = np.zeros(rows.shape + (self.shape[1],), dtype=self.dtype)
+        found = rows >= 0
+        out[found] = self._values[rows[found]]
+        return out
+
+    def argmax(self, axis=None, out=None, **kwargs):
+        """np.argmax(Q, axis=1) karşılığı; ayrılmamış satırlar için 0"""
+        if axis != 1:
+            return np.argmax(self.to_dense(), axis=axis, out=out, **kwargs)
+        actions = np.zeros(self.shape[0], dtype=np.int64)
+        actions[self.states()] = np.argmax(self.rows(), axis=1)
+        if out is not None:
+            out[...] = actions
+            return out
+        return actions
+
+    def to_dense(self, dtype=None):
+        """Yoğun (n_states, n_actions) diziye çevir"""
+        dense = np.zeros(self.shape, dtype=dtype or self.dtype)
+        dense[self.states()] = self.rows()
+        return dense
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_dense(dtype)
+
+    @classmethod
+    def from_dense(cls, Q, dtype=None):
+        """Yoğun Q-table'dan yalnızca sıfır olmayan satırları al"""
+        Q = np.asarray(Q)
+        states = np.flatnonzero(Q.any(axis=1))
+        table = cls(Q.shape[0], Q.shape[1], dtype or Q.dtype, capacity=max(len(states), 16))
+        table[states] = Q[states]
+        return table
+
+    def copy(self):
+        table = SparseQTable(self.shape[0], self.shape[1], self.dtype,
+                             capacity=max(self._size, 16), max_load=self.max_load)
+        if self._size:
+            table[self.states()] = self.rows()
+        return table
+
+    # ------------------------------------------------------------------
+    # Dosya formatı
+    # ------------------------------------------------------------------
+
+    def save(self, path):
+        """Ayrılmış satırları atomik olarak .sparse.npz dosyasına yaz"""
+        _atomic_savez(path, states=self.states(), values=self.rows(),
+                      shape=np.array(self.shape, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            n_states, n_actions = (int(value) for value in data["shape"])
+            states, values = data["states"], data["values"]
+        table = cls(n_states, n_actions, values.dtype, capacity=max(len(states), 16))
+        if len(states):
+            table[states] = values
+        return table
+
+
+def make_q_table(storage, n_states, n_actions, dtype=np.float64):
+    """
+    Boş Q-table oluştur.
+
+    Args:
+        storage: "dense" (np.zeros) ya da "sparse" (SparseQTable)
+    """
+    if storage == "dense":
+        return np.zeros((n_states, n_actions), dtype=dtype)
+    if storage == "sparse":
+        return SparseQTable(n_states, n_actions, dtype)
+    raise ValueError(f"Bilinmeyen Q-table depolaması: {storage}")
+
+
+if __name__ == "__main__":
+    from checkpoint import atomic_save, load_q_table
+
+    parser = argparse.ArgumentParser(description="Yoğun .npy ve seyrek .sparse.npz Q-table dönüşümü")
+    parser.add_argument("source", help="Kaynak Q-table (.npy ya da .sparse.npz)")
+    parser.add_argument("target", help="Hedef dosya (.npy ya da .sparse.npz)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"HATA: {args.source} bulunamadı!")
+        sys.exit(2)
+
+    Q = load_q_table(args.source, mmap_mode="r")
+    if args.target.endswith(SPARSE_SUFFIX):
+        if not isinstance(Q, SparseQTable):
+            Q = SparseQTable.from_dense(Q)
+        Q.save(args.target)
+    else:
+        atomic_save(args.target, np.asarray(Q))
+    print(f"✓ {args.source} -> {args.target} (şekil: {Q.shape})")
@@ -0,0 +1,212 @@
+import numpy as np
+
+
+class SumTree:
+    """
+    Öncelik toplamları için iki seviyeli toplam ağacı
+
+    Yapraklar (geçiş öncelikleri) block_size genişliğinde bloklara ayrılır,
+    her bloğun toplamı block_sums'ta tutulur. Geniş dallanma sayesinde
+    örnekleme ve toplu güncelleme, ikili ağacın log2(N) seviyesi yerine
+    birkaç vektör işlemiyle yapılır. set() yalnızca yaprağı yazar ve bloğu
+    kirli işaretler; blok toplamları bir sonraki okumada yenilenir.
+    """
+
+    def __init__(self, capacity, block_size=None):
+        self.block_size = block_size or min(64, capacity)
+        n_blocks = -(-capacity // self.block_size)
+        self.priorities = np.zeros(n_blocks * self.block_size, dtype=np.float64)
+        self.block_sums = np.zeros(n_blocks, dtype=np.float64)
+        self._blocks = self.priorities.reshape(n_blocks, self.block_size)
+        self._dirty = np.zeros(n_blocks, dtype=bool)
+        self._has_dirty = False
+
+    @property
+    def nbytes(self):
+        return self.priorities.nbytes + self.block_sums.nbytes + self._dirty.nbytes
+
+    @property
+    def total(self):
+        self._refresh()
+        return float(self.block_sums.sum())
+
+    def leaves(self, indices):
+        return self.priorities[indices]
+
+    def _refresh(self):
+        if self._has_dirty:
+            blocks = np.flatnonzero(self._dirty)
+            self.block_sums[blocks] = self._blocks[blocks].sum(axis=1)
+            self._dirty[blocks] = False
+            self._has_dirty = False
+
+    def set(self, index, priority):
+        """Skaler güncelleme (bellek ayırmaz)"""
+        self.priorities[index] = priority
+        self._dirty[index // self.block_size] = True
+        self._has_dirty = True
+
+    def update(self, indices, priorities):
+        """Toplu güncelleme; etkilenen blokların toplamları yeniden hesaplanır"""
+        self.priorities[indices] = priorities
+        blocks = np.unique(indices // self.block_size)
+        self.block_sums[blocks] = self._blocks[blocks].sum(axis=1)
+
+    def get_state(self):
+        self._refresh()
+        return {'priorities': self.priorities.copy(), 'block_sums': self.block_sums.copy()}
+
+    def set_state(self, state):
+        self.priorities[:] = state['priorities']
+        self.block_sums[:] = state['block_sums']
+        self._dirty[:] = False
+        self._has_dirty = False
+
+    def find(self, values):
+        """Kümülatif önceliği values olan yaprak indeksleri"""
+        self._refresh()
+        cumulative = np.cumsum(self.block_sums)
+        blocks = np.minimum(np.searchsorted(cumulative, values, side="right"),
+                            len(cumulative) - 1)
+        offsets = values - (cumulative[blocks] - self.block_sums[blocks])
+        # Satır satır cumsum(axis=1) yerine tek düz cumsum (belirgin hızlı);
+        # her satırın başlangıç toplamı eşiğe eklenir
+        inner = np.cumsum(self._blocks[blocks]).reshape(len(blocks), self.block_size)
+        offsets[1:] += inner[:-1, -1]
+        positions = np.minimum((inner <= offsets[:, None]).sum(axis=1), self.block_size - 1)
+        return blocks * self.block_size + positions
+
+
+class ReplayBuffer:
+    """
+    Sabit boyutlu halka tamponunda deneyim tekrarı (experience replay)
+
+    Geçişler önceden ayrılmış tipli dizilerde tutulur:
+        states, next_states: uint32   actions: uint8
+        rewards: float32              dones: bool
+    add() yalnızca skaler atama yapar (bellek ayırmaz); tampon dolunca en
+    eski geçişin üzerine yazılır.
+
+    prioritized=False: düzgün örnekleme
+    prioritized=True: |TD hatası| + epsilon üssü priority_exponent ile orantılı
+        örnekleme (SumTree); yeni geçişler en yüksek öncelikle eklenir.
+        sample() önem ağırlıklarını (N * P(i))^-beta / max döndürür.
+    """
+
+    def __init__(self, capacity, prioritized=False, priority_exponent=0.6, beta=0.4,
+                 epsilon=1e-3, seed=None):
+        self.capacity = capacity
+        self.prioritized = prioritized
+        self.priority_exponent = priority_exponent
+        self.beta = beta
+        self.epsilon = epsilon
+
+        self.states = np.zeros(capacity, dtype=np.uint32)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.uint32)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self._next = 0
+        self._count = 0
+        self._tree = SumTree(capacity) if prioritized else None
+        self._max_priority = 1.0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        total = (self.states.nbytes + self.actions.nbytes + self.rewards.nbytes +
+                 self.next_states.nbytes + self.dones.nbytes)
+        if self._tree is not None:
+            total += self._tree.nbytes
+        return total
+
+    def add(self, state, action, reward, next_state, done):
+        """Tek geçiş ekle"""
+        index = self._next
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+        if self._tree is not None:
+            self._tree.set(index, self._max_priority)
+
+        self._next = index + 1 if index + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """Geçiş grubu ekle (dizilerle; halkanın sonunu aşan kısım başa sarar)"""
+        count = min(len(states), self.capacity)
+        indices = (self._next + np.arange(count)) % self.capacity
+        self.states[indices] = states[-count:]
+        self.actions[indices] = actions[-count:]
+        self.rewards[indices] = rewards[-count:]
+        self.next_states[indices] = next_states[-count:]
+        self.dones[indices] = dones[-count:]
+        if self._tree is not None:
+            self._tree.update(indices, self._max_priority)
+
+        self._next = (self._next + count) % self.capacity
+        self._count = min(self._count + count, self.capacity)
+
+    def sample(self, batch_size):
+        """
+        Geçiş grubu örnekle
+
+        Returns:
+            indices, states, actions, rewards, next_states, dones, weights
+            (weights: önem ağırlıkları; düzgün örneklemede None)
+        """
+        if self._tree is None:
+            indices = self.rng.integers(self._count, size=batch_size)
+            weights = None
+        else:
+            # Tabakalı örnekleme: toplam öncelik batch_size eşit parçaya bölünür
+            total = self._tree.total
+            values = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+            # Kayan nokta yuvarlaması boş yapraklara taşırmasın
+            indices = np.minimum(self._tree.find(values), self._count - 1)
+            probabilities = self._tree.leaves(indices) / total
+            weights = (self._count * probabilities) ** -self.beta
+            weights /= weights.max()
+
+        return (indices, self.states[indices], self.actions[indices], self.rewards[indices],
+                self.next_states[indices], self.dones[indices], weights)
+
+    def get_state(self):
+        """Tampon içeriği, konum ve RNG durumu (checkpoint için kopya)"""
+        return {
+            'states': self.states.copy(),
+            'actions': self.actions.copy(),
+            'rewards': self.rewards.copy(),
+            'next_states': self.next_states.copy(),
+            'dones': self.dones.copy(),
+            'next': self._next,
+            'count': self._count,
+            'max_priority': self._max_priority,
+            'tree': self._tree.get_state() if self._tree is not None else None,
+            'rng': self.rng.bit_generator.state,
+        }
+
+    def set_state(self, state):
+        for name in ('states', 'actions', 'rewards', 'next_states', 'dones'):
+            getattr(self, name)[:] = state[name]
+        self._next = state['next']
+        self._count = state['count']
+        self._max_priority = state['max_priority']
+        if self._tree is not None:
+            self._tree.set_state(state['tree'])
+        self.rng.bit_generator.state = state['rng']
+
+    def update_priorities(self, indices, td_errors):
+        """Örneklenen geçişlerin önceliklerini yeni TD hatalarıyla güncelle"""
+        if self._tree is None:
+            return
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.priority_exponent
+        self._tree.update(indices, priorities)
+        self._max_priority = max(self._max_priority, float(priorities.max()))
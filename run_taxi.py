@@ -1,17 +1,22 @@
 import numpy as np
 from custom_taxi_env import CustomTaxiEnv
+from checkpoint import load_q_table
+from policy import POLICY_SUFFIX, compile_policy, load_policy
 import pygame
 import time
 import os
 
-def run_trained_taxi(q_table_path="q_table.npy", delay=0.3, max_episodes=None):
+def run_trained_taxi(q_table_path="q_table.npy", delay=0.3, max_episodes=None, mmap=True):
     """
     Eğitilmiş Q-table ile taksiyi çalıştır
     
     Args:
-        q_table_path: Q-table dosya yolu
+        q_table_path: Q-table ya da derlenmiş politika (.policy.npz) dosya yolu
         delay: Her adım arasındaki bekleme süresi (saniye)
         max_episodes: Maksimum görev sayısı (None = sonsuz)
+        mmap: Q-table'ı belleğe okumadan mmap ile aç. Okuma yalnızca
+              ertelenir: politika derlenirken (tek argmax geçişi) tablo bir
+              kez baştan sona okunur, sonrasında Q'ya erişilmez.
     """
     
     # Q-table'ı yükle
@@ -20,12 +25,18 @@ def run_trained_taxi(q_table_path="q_table.npy", delay=0.3, max_episodes=None):
         print("Önce 'python train_qtable.py' ile eğitim yapın.")
         return
     
-    Q = np.load(q_table_path)
-    print(f"✓ Q-table yüklendi: {q_table_path}")
-    print(f"  Q-table boyutu: {Q.shape}")
-    print(f"  Toplam öğrenilen state sayısı: {np.count_nonzero(Q)}")
-    
     env = CustomTaxiEnv()
+    if q_table_path.endswith(POLICY_SUFFIX):
+        policy = load_policy(q_table_path)
+        print(f"✓ Politika yüklendi: {q_table_path}")
+        print(f"  State sayısı: {len(policy)} ({policy.nbytes / 1024:.0f} KB)")
+    else:
+        Q = load_q_table(q_table_path, mmap_mode="r" if mmap else None)
+        print(f"✓ Q-table yüklendi: {q_table_path}")
+        print(f"  Q-table boyutu: {Q.shape}")
+        # Tablonun tek tam okuması: adım başına argmax yerine state başına
+        # tek aksiyon (kompakt Q-table'lar dahil)
+        policy = compile_policy(Q, env)
     
     print("\n" + "=" * 60)
     print("OTONOM TAKSİ ÇALIŞIYOR")
@@ -60,7 +71,7 @@ def run_trained_taxi(q_table_path="q_table.npy", delay=0.3, max_episodes=None):
                         raise KeyboardInterrupt
                 
                 # En iyi aksiyonu seç (exploitation only, no exploration)
-                action = np.argmax(Q[state])
+                action = policy.act(state)
                 
                 # Adım at
                 state, reward, done, _, info = env.step(action)
@@ -149,3 +160,6 @@ if __name__ == "__main__":
     
     # 5. Özel Q-table dosyası
     # run_trained_taxi(q_table_path="q_table_20241128_143000.npy", delay=0.2)
+    
+    # 6. Derlenmiş politika (python policy.py q_table.npy)
+    # run_trained_taxi(q_table_path="q_table.policy.npz", delay=0.2)
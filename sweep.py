@@ -0,0 +1,339 @@
+import numpy as np
+import argparse
+import contextlib
+import csv
+import inspect
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from custom_taxi_env import CustomTaxiEnv
+from evaluate import evaluate_policy
+from q_storage import SPARSE_SUFFIX, SparseQTable
+from train_qtable import train_qtable
+
+# Sonuç tablosu sütunları (parametre sütunları bunlardan önce gelir)
+RESULT_COLUMNS = ('run_id', 'seed', 'success_rate', 'mean_steps', 'worst_steps',
+                  'train_success_rate', 'trained_episodes', 'env_steps', 'elapsed', 'q_table')
+
+# Sweep ile verilemeyen train_qtable argümanları (tohum run başına atanır)
+_RESERVED_PARAMS = ('seed',)
+
+
+def _sample_value(rng, distribution):
+    """
+    Rastgele arama için tek değer örnekle.
+    distribution: değer listesi (eşit olasılıkla seçim) ya da
+    {"low": a, "high": b, "log": bool, "int": bool} aralığı
+    """
+    if isinstance(distribution, list):
+        return distribution[rng.integers(len(distribution))]
+    low, high = distribution['low'], distribution['high']
+    if distribution.get('log'):
+        value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    else:
+        value = float(rng.uniform(low, high))
+    return int(round(value)) if distribution.get('int') else value
+
+
+def expand_spec(spec):
+    """
+    Sweep tanımından konfigürasyon listesi üret (deterministik sırayla).
+
+    spec:
+        search: "grid" (tüm kombinasyonlar) ya da "random" (samples adet)
+        params: {train_qtable argümanı: değer listesi | aralık}
+        fixed: Tüm run'larda aynı argümanlar
+        samples: Rastgele aramada konfigürasyon sayısı
+        seed: Rastgele arama ve run tohumları için ana tohum
+    """
+    params = spec.get('params', {})
+    fixed = spec.get('fixed', {})
+    valid = set(inspect.signature(train_qtable).parameters) - set(_RESERVED_PARAMS)
+    unknown = sorted((set(params) | set(fixed)) - valid)
+    if unknown:
+        raise ValueError(f"train_qtable argümanı değil: {', '.join(unknown)}")
+
+    names = sorted(params)
+    search = spec.get('search', 'grid')
+    if search == 'grid':
+        combos = itertools.product(*(params[name] for name in names))
+        configs = [dict(zip(names, values)) for values in combos]
+    elif search == 'random':
+        rng = np.random.default_rng(spec.get('seed'))
+        configs = [{name: _sample_value(rng, params[name]) for name in names}
+                   for _ in range(spec.get('samples', 10))]
+    else:
+        raise ValueError(f"Geçersiz arama türü: {search}")
+    return [{**fixed, **config} for config in configs]
+
+
+def plan_runs(spec):
+    """(run_id, config, seed) listesi; her konfigürasyon repeats kez, farklı tohumla"""
+    configs = expand_spec(spec)
+    repeats = spec.get('repeats', 1)
+    seeds = np.random.SeedSequence(spec.get('seed')).spawn(len(configs) * repeats)
+    runs = []
+    for index, config in enumerate(configs):
+        for repeat in range(repeats):
+            run = index * repeats + repeat
+            seed = int(seeds[run].generate_state(1)[0])
+            runs.append((f"run_{run:03d}", config, seed))
+    return runs
+
+
+def _warm_layout_caches(grid_sizes):
+    """
+    Geçiş tabloları ve kompakt indeks harita başına modül önbelleğinde
+    tutulur (salt okunur). fork ile başlatılan işçiler ana süreçte
+    hesaplanmış tabloları kopyala-yaz sayfalarla paylaşır; spawn'da her
+    işçi bir kez hesaplar.
+    """
+    for grid_size in grid_sizes:
+        env = CustomTaxiEnv(grid_size=grid_size)
+        env.build_transition_tables()
+        env.build_compact_index()
+        env.close()
+
+
+def _write_json(path, data):
+    """JSON'u atomik yaz (yarıda kesilen run tamamlanmış görünmesin)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _run_config(run, sweep_dir):
+    """
+    İşçi: tek konfigürasyonu kendi dizininde eğit ve değerlendir.
+    train_qtable çıktıları (Q-table, istatistikler, checkpoint'ler, log)
+    run dizinine yazılır; result.json en son yazılır ve tamamlanmanın işaretidir.
+    """
+    run_id, config, seed = run
+    run_dir = os.path.abspath(os.path.join(sweep_dir, run_id))
+    os.makedirs(run_dir, exist_ok=True)
+
+    cwd = os.getcwd()
+    os.chdir(run_dir)
+    try:
+        with open("train.log", "w") as log, contextlib.redirect_stdout(log):
+            start = time.perf_counter()
+            Q, stats = train_qtable(seed=seed, **config)
+            elapsed = time.perf_counter() - start
+            env = CustomTaxiEnv(grid_size=config.get('grid_size', 6))
+            results = evaluate_policy(Q, env)
+            env.close()
+    finally:
+        os.chdir(cwd)
+
+    q_name = f"q_table{SPARSE_SUFFIX}" if isinstance(Q, SparseQTable) else "q_table.npy"
+    row = {
+        'run_id': run_id,
+        'config': config,
+        'seed': seed,
+        'success_rate': results['success_rate'],
+        'mean_steps': results['mean_steps'],
+        'worst_steps': results['worst_steps'],
+        'train_success_rate': stats['final']['success_rate'],
+        'trained_episodes': stats['episodes'],
+        'env_steps': stats['env_steps'],
+        'elapsed': elapsed,
+        'q_table': os.path.join(run_dir, q_name),
+    }
+    _write_json(os.path.join(run_dir, "result.json"), row)
+    return row
+
+
+def _run_config_star(args):
+    return _run_config(*args)
+
+
+def load_results(sweep_dir):
+    """Tamamlanmış run'ların sonuçları (result.json olanlar)"""
+    rows = []
+    if not os.path.isdir(sweep_dir):
+        return rows
+    for name in sorted(os.listdir(sweep_dir)):
+        path = os.path.join(sweep_dir, name, "result.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                rows.append(json.load(f))
+    return rows
+
+
+def run_sweep(spec, sweep_dir="sweep", workers=None):
+    """
+    Sweep'i süreç havuzunda çalıştır; yarıda kalmış sweep kaldığı yerden
+    devam eder (result.json'u olan run'lar tekrar çalıştırılmaz).
+
+    Args:
+        spec: expand_spec() formatında tanım; None ise sweep_dir/spec.json
+        sweep_dir: Run dizinleri, spec.json ve results.csv'nin yeri
+        workers: Eşzamanlı run sayısı (None = CPU sayısı)
+
+    Returns:
+        Tüm tamamlanmış run satırları (önceki oturumlar dahil)
+    """
+    spec_path = os.path.join(sweep_dir, "spec.json")
+    if spec is None:
+        if not os.path.exists(spec_path):
+            raise FileNotFoundError(f"{spec_path} bulunamadı")
+        with open(spec_path) as f:
+            spec = json.load(f)
+    elif os.path.exists(spec_path):
+        with open(spec_path) as f:
+            if json.load(f) != json.loads(json.dumps(spec)):
+                raise ValueError(f"{sweep_dir} farklı bir spec ile başlatılmış")
+    os.makedirs(sweep_dir, exist_ok=True)
+    _write_json(spec_path, spec)
+
+    runs = plan_runs(spec)
+    finished = {row['run_id'] for row in load_results(sweep_dir)}
+    pending = [run for run in runs if run[0] not in finished]
+    workers = max(1, min(workers or os.cpu_count(), len(pending) or 1))
+
+    print("=" * 60)
+    print("HİPERPARAMETRE TARAMASI")
+    print("=" * 60)
+    print(f"Dizin: {sweep_dir}")
+    print(f"Run: {len(runs)} (tamamlanmış {len(runs) - len(pending)}, kalan {len(pending)})")
+    print(f"İşçi sayısı: {workers}")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    if pending:
+        grid_sizes = sorted({config.get('grid_size', 6) for _, config, _ in pending})
+        _warm_layout_caches(grid_sizes)
+        methods = mp.get_all_start_methods()
+        context = mp.get_context("fork" if "fork" in methods else None)
+        with context.Pool(workers, initializer=_warm_layout_caches,
+                          initargs=(grid_sizes,)) as pool:
+            tasks = [(run, sweep_dir) for run in pending]
+            for done, row in enumerate(pool.imap_unordered(_run_config_star, tasks), 1):
+                print(f"[{done}/{len(pending)}] {row['run_id']}  başarı {row['success_rate']:.1f}%  "
+                      f"ortalama adım {row['mean_steps']:.1f}  {row['elapsed']:.1f} sn  "
+                      f"{_format_config(row['config'])}")
+    print(f"Süre: {time.perf_counter() - start:.1f} sn")
+
+    rows = load_results(sweep_dir)
+    write_results_table(rank_runs(rows), os.path.join(sweep_dir, "results.csv"))
+    return rows
+
+
+def _format_config(config):
+    return " ".join(f"{name}={value:.4g}" if isinstance(value, float) else f"{name}={value}"
+                    for name, value in sorted(config.items()))
+
+
+def rank_runs(rows):
+    """Run'ları başarı oranına (azalan), sonra ortalama adıma (artan) göre sırala"""
+    return sorted(rows, key=lambda row: (-row['success_rate'], _nan_last(row['mean_steps'])))
+
+
+def _nan_last(value):
+    return float('inf') if value is None or np.isnan(value) else value
+
+
+def rank_configs(rows):
+    """
+    Aynı konfigürasyonun tekrarlarını birleştirip sırala.
+
+    Returns:
+        [{config, runs, success_rate, mean_steps, best_run}] (en iyi önce)
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(json.dumps(row['config'], sort_keys=True), []).append(row)
+
+    ranked = []
+    for group in groups.values():
+        best = rank_runs(group)[0]
+        steps = [row['mean_steps'] for row in group if not np.isnan(row['mean_steps'])]
+        ranked.append({
+            'config': group[0]['config'],
+            'runs': len(group),
+            'success_rate': float(np.mean([row['success_rate'] for row in group])),
+            'mean_steps': float(np.mean(steps)) if steps else float('nan'),
+            'best_run': best['run_id'],
+            'q_table': best['q_table'],
+        })
+    return rank_runs(ranked)
+
+
+def write_results_table(rows, path):
+    """Sıralı run satırlarını CSV olarak yaz (parametreler ayrı sütunlarda)"""
+    names = sorted({name for row in rows for name in row['config']})
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', *names, *RESULT_COLUMNS])
+        for rank, row in enumerate(rows, 1):
+            writer.writerow([rank, *(row['config'].get(name, '') for name in names),
+                             *(row[column] for column in RESULT_COLUMNS)])
+
+
+def print_ranking(rows, top=10):
+    ranked = rank_configs(rows)
+    print("=" * 60)
+    print(f"SIRALAMA (en iyi {min(top, len(ranked))} / {len(ranked)} konfigürasyon)")
+    print("=" * 60)
+    for rank, entry in enumerate(ranked[:top], 1):
+        print(f"{rank:>3}. başarı {entry['success_rate']:6.2f}%  ortalama adım "
+              f"{entry['mean_steps']:6.2f}  ({entry['runs']} run, en iyi {entry['best_run']})")
+        print(f"     {_format_config(entry['config'])}")
+    if ranked:
+        print(f"En iyi Q-table: {ranked[0]['q_table']}")
+    print("=" * 60)
+    return ranked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="train_qtable için paralel hiperparametre taraması")
+    parser.add_argument("spec", nargs="?", default=None,
+                        help="Sweep tanımı (JSON); verilmezse komut satırı ızgarası "
+                             "ya da --dir içindeki spec.json (devam) kullanılır")
+    parser.add_argument("--dir", default="sweep", help="Sweep dizini")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Eşzamanlı run sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--alpha", type=float, nargs="+")
+    parser.add_argument("--gamma", type=float, nargs="+")
+    parser.add_argument("--epsilon-decay", type=float, nargs="+")
+    parser.add_argument("--episodes", type=int, nargs="+")
+    parser.add_argument("--random", type=int, default=None,
+                        help="Izgara yerine bu kadar rastgele konfigürasyon örnekle")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="Konfigürasyon başına farklı tohumlu run sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="Gösterilecek konfigürasyon sayısı")
+    args = parser.parse_args()
+
+    spec = None
+    if args.spec:
+        if not os.path.exists(args.spec):
+            print(f"HATA: {args.spec} bulunamadı!")
+            sys.exit(2)
+        with open(args.spec) as f:
+            spec = json.load(f)
+    else:
+        params = {name: values for name, values in (
+            ('alpha', args.alpha), ('gamma', args.gamma),
+            ('epsilon_decay', args.epsilon_decay), ('episodes', args.episodes)) if values}
+        if params:
+            spec = {'search': 'grid', 'params': params, 'repeats': args.repeats, 'seed': args.seed}
+            if args.random:
+                spec.update(search='random', samples=args.random)
+        elif not os.path.exists(os.path.join(args.dir, "spec.json")):
+            print("HATA: spec dosyası, parametre listesi ya da devam edilecek sweep dizini gerekli")
+            sys.exit(2)
+
+    try:
+        rows = run_sweep(spec, args.dir, args.workers)
+    except ValueError as e:
+        print(f"HATA: {e}")
+        sys.exit(2)
+    print_ranking(rows, args.top)
+    print(f"✓ Sonuç tablosu: {os.path.join(args.dir, 'results.csv')}")
@@ -1,8 +1,20 @@
 import numpy as np
-from custom_taxi_env import CustomTaxiEnv
+from custom_taxi_env import CustomTaxiEnv, VectorCustomTaxiEnv
 import pygame
+import pytest
 import time
 
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Dosya yazan testler için geçici çalışma dizini. Eğitim çıktıları
+    (q_table, checkpoint, istatistik) göreli yollara yazıldığından test
+    bu dizinde çalışır; dizin ve eski cwd pytest tarafından geri alınır.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
 def test_environment():
     """
     Ortamı test et - rastgele aksiyonlarla
@@ -144,6 +156,729 @@ def test_specific_scenario():
     env.close()
 
 
+def test_vector_env_matches_scalar():
+    """
+    VectorCustomTaxiEnv, skaler ortamla aynı ödül ve geçişleri üretmeli
+    """
+    num_envs = 64
+    vec_env = VectorCustomTaxiEnv(num_envs, seed=0)
+    envs = [CustomTaxiEnv() for _ in range(num_envs)]
+    rng = np.random.default_rng(1)
+
+    def sync(i):
+        # Skaler ortamı vektör ortamın i. durumuna eşitle
+        env = envs[i]
+        env.taxi_row, env.taxi_col = divmod(int(vec_env.taxi_cell[i]), env.cols)
+        env.pass_row, env.pass_col = divmod(int(vec_env.pass_cell[i]), env.cols)
+        env.dest_row, env.dest_col = divmod(int(vec_env.dest_cell[i]), env.cols)
+        env.passenger_in_taxi = bool(vec_env.passenger_in_taxi[i])
+        env.step_count = int(vec_env.step_count[i])
+        env.total_reward = 0
+
+    states, _ = vec_env.reset()
+    for i in range(num_envs):
+        sync(i)
+        assert envs[i]._get_state() == states[i]
+
+    for _ in range(1000):
+        actions = rng.integers(6, size=num_envs)
+        states, rewards, dones, _, info = vec_env.step(actions)
+
+        for i, env in enumerate(envs):
+            state, reward, done, _, _ = env.step(int(actions[i]))
+            assert state == info['final_state'][i]
+            assert np.float64(reward) == rewards[i]
+            assert done == dones[i]
+            if done:
+                sync(i)
+            assert env._get_state() == states[i]
+
+    vec_env.close()
+    print("✓ Vektör ortam skaler ortamla birebir aynı")
+
+
+def test_transition_tables_match_step():
+    """
+    Geçiş tabloları her (state, action) çifti için step() ile aynı olmalı
+    """
+    env = CustomTaxiEnv()
+    next_state, reward, terminal = env.build_transition_tables()
+
+    for state in range(env.observation_space.n):
+        components = env.decode(state)
+        for action in range(env.action_space.n):
+            (env.taxi_row, env.taxi_col, env.pass_row, env.pass_col,
+             env.passenger_in_taxi, env.dest_row, env.dest_col) = components
+            env.step_count = 0
+
+            s, r, done, _, _ = env.step(action)
+            assert s == next_state[state, action]
+            assert r == reward[state, action]
+            assert done == terminal[state, action]
+
+    env.close()
+    print("✓ Geçiş tabloları step() ile birebir aynı")
+
+
+def test_batch_update_duplicates():
+    """
+    Toplu Q güncellemesi tekrar eden (state, action) çiftlerinde
+    tanımlı semantiği izlemeli
+    """
+    from train_qtable import q_learning_batch_update
+
+    rng = np.random.default_rng(0)
+    alpha, gamma = 0.15, 0.98
+    Q = rng.normal(size=(20, 6))
+    states = rng.integers(5, size=200)
+    actions = rng.integers(2, size=200)
+    rewards = rng.normal(size=200)
+    next_states = rng.integers(20, size=200)
+    targets = rewards + gamma * Q[next_states].max(axis=1)
+
+    # Sıralı: hedefler grup başındaki Q'dan, güncellemeler sırayla
+    expected = Q.copy()
+    for s, a, target in zip(states, actions, targets):
+        expected[s, a] += alpha * (target - expected[s, a])
+    sequential = Q.copy()
+    q_learning_batch_update(sequential, states, actions, rewards, next_states,
+                            alpha, gamma, duplicates="sequential")
+    assert np.allclose(sequential, expected)
+
+    # Ortalama: her çift için ortalama hedefle tek güncelleme
+    expected = Q.copy()
+    for s, a in set(zip(states, actions)):
+        mask = (states == s) & (actions == a)
+        expected[s, a] += alpha * (targets[mask].mean() - expected[s, a])
+    average = Q.copy()
+    q_learning_batch_update(average, states, actions, rewards, next_states,
+                            alpha, gamma, duplicates="average")
+    assert np.allclose(average, expected)
+
+    print("✓ Toplu güncelleme tekrar semantiği doğru")
+
+
+def test_compact_index():
+    """
+    Kompakt indeks encode/decode ile tutarlı olmalı ve erişilebilir
+    state'ler arasındaki geçişleri korumalı
+    """
+    env = CustomTaxiEnv()
+    full_to_compact, compact_to_full = env.build_compact_index()
+    next_state, reward, terminal = env.build_transition_tables()
+
+    # encode_compact / decode_compact gidiş-dönüş
+    for index in range(0, env.compact_state_count, 97):
+        assert env.encode_compact(*env.decode_compact(index)) == index
+
+    # reset() her zaman indekslenen bir state üretir
+    for _ in range(200):
+        state, _ = env.reset()
+        assert full_to_compact[state] >= 0
+
+    # Erişilebilir state'lerden geçişler indeks içinde kalır ve aynı kompakt
+    # state'e düşen tam state'ler aynı şekilde davranır
+    reachable = np.flatnonzero(full_to_compact >= 0)
+    representative = compact_to_full[full_to_compact[reachable]]
+    assert (full_to_compact[next_state[reachable]] >= 0).all()
+    assert (full_to_compact[next_state[reachable]] ==
+            full_to_compact[next_state[representative]]).all()
+    assert (reward[reachable] == reward[representative]).all()
+    assert (terminal[reachable] == terminal[representative]).all()
+
+    env.close()
+    print(f"✓ Kompakt indeks: {env.observation_space.n} -> {env.compact_state_count} state")
+
+
+def test_float16_training_rejected():
+    """
+    float16'da 200 civarındaki Q değerlerine küçük güncellemeler
+    eklenemez; eğitim bu tipi reddetmeli
+    """
+    from train_qtable import train_qtable
+
+    q = np.float16(190.0)
+    assert q + np.float16(0.05) == q   # alpha * td_error yuvarlanıp kaybolur
+    with pytest.raises(ValueError):
+        train_qtable(episodes=1, dtype=np.float16)
+    print("✓ float16 eğitim tipi reddediliyor")
+
+
+def test_seeded_spawns():
+    """
+    reset(seed=...) tekrarlanabilir olmalı; doğumlar geçerli hücrelerde ve
+    kurallara uygun olmalı (yolcu != taksi, hedef != yolcu)
+    """
+    env_a = CustomTaxiEnv()
+    env_b = CustomTaxiEnv()
+    states_a = [env_a.reset(seed=7)[0]] + [env_a.reset()[0] for _ in range(50)]
+    states_b = [env_b.reset(seed=7)[0]] + [env_b.reset()[0] for _ in range(50)]
+    assert states_a == states_b
+
+    for _ in range(500):
+        env_a.reset_passenger()
+        taxi = (env_a.taxi_row, env_a.taxi_col)
+        passenger = (env_a.pass_row, env_a.pass_col)
+        assert passenger != taxi
+        assert (env_a.dest_row, env_a.dest_col) != passenger
+        assert env_a._is_valid_position(*passenger)
+
+    # Toplu doğum
+    taxi, passenger, dest = env_a.sample_spawns(10000)
+    assert (taxi != passenger).all() and (passenger != dest).all()
+    assert (env_a.valid_index[taxi] >= 0).all() and (env_a.valid_index[dest] >= 0).all()
+    passenger, dest = env_a.sample_passengers(taxi)
+    assert (taxi != passenger).all() and (passenger != dest).all()
+
+    env_a.close()
+    env_b.close()
+    print("✓ Tohumlu doğumlar tekrarlanabilir ve kurallara uygun")
+
+
+def test_exhaustive_evaluation():
+    """
+    Optimal (değer iterasyonu) politika tüm başlangıçlarda başarılı olmalı;
+    her state'te aynı aksiyonu seçen politika döngüye girmeli
+    """
+    from train_qtable import value_iteration
+    from evaluate import evaluate_policy, check_gates
+
+    env = CustomTaxiEnv()
+    Q, _ = value_iteration(env=env)
+    results = evaluate_policy(Q, env)
+    assert results['start_states'] == 34 * 33 * 33
+    assert results['success_rate'] == 100.0
+    assert results['loops'] == 0 and results['timeouts'] == 0
+    assert check_gates(results) == []
+
+    # Kompakt Q-table aynı sonucu vermeli
+    compact = evaluate_policy(env.compact_q_table(Q, np.float32), env)
+    assert compact['mean_steps'] == results['mean_steps']
+
+    stuck = evaluate_policy(np.zeros_like(Q), env)
+    assert stuck['successes'] == 0
+    assert stuck['loops'] == stuck['start_states']
+    assert check_gates(stuck)
+
+    env.close()
+    print(f"✓ Tüm başlangıçlar değerlendirildi ({results['mean_steps']:.2f} ortalama adım)")
+
+
+def test_compiled_policy(tmp_path):
+    """Derlenmiş politika argmax ile aynı aksiyonları vermeli ve diske gidip gelmeli"""
+    from policy import compile_policy, load_policy
+
+    env = CustomTaxiEnv()
+    rng = np.random.default_rng(0)
+    Q = rng.normal(size=(env.observation_space.n, env.action_space.n))
+    policy = compile_policy(Q, env, second_best=True)
+
+    states = rng.integers(env.observation_space.n, size=1000)
+    for state in states:
+        assert policy.act(state) == np.argmax(Q[state])
+    second = np.sort(Q[states], axis=1)
+    assert np.allclose(policy.margins[states], second[:, -1] - second[:, -2], atol=1e-5)
+
+    path = str(tmp_path / "test_q_table.policy.npz")
+    policy.save(path)
+    loaded = load_policy(path)
+    assert loaded.actions.dtype == np.uint8
+    assert np.array_equal(loaded.actions, policy.actions)
+    assert np.array_equal(loaded.second_actions, policy.second_actions)
+
+    env.close()
+    print(f"✓ Derlenmiş politika doğru ({policy.nbytes / 1024:.0f} KB)")
+
+
+def test_policy_server(tmp_path):
+    """Sunucu eşzamanlı bağlantılardaki sorguları tablo ile aynı yanıtlamalı"""
+    import asyncio
+    from policy_server import PolicyServer
+
+    env = CustomTaxiEnv()
+    rng = np.random.default_rng(0)
+    Q = rng.normal(size=(env.observation_space.n, env.action_space.n))
+    q_path = str(tmp_path / "test_server_q_table.npy")
+    socket_path = str(tmp_path / "test_policy.sock")
+    np.save(q_path, Q)
+    server = PolicyServer(q_path, reload_interval=0, env=env)
+
+    state = env.encode(2, 1, 4, 5, False, 0, 3)
+    queries = [b"17", b"2 1 4 5 0 0 3", b"(13, 29, 3, 0)", b"-4", b"abc"]
+    expected = [np.argmax(Q[17]), np.argmax(Q[state]), np.argmax(Q[state]), -1, -1]
+
+    async def query(lines):
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(b"\n".join(lines) + b"\n")
+        replies = [(await reader.readline()).strip() for _ in lines]
+        writer.close()
+        return [-1 if reply == b"ERR" else int(reply) for reply in replies]
+
+    async def main():
+        await server.start(unix_path=socket_path)
+        try:
+            return await asyncio.gather(*(query(queries) for _ in range(8)))
+        finally:
+            await server.stop()
+
+    results = asyncio.run(main())
+    assert all(result == expected for result in results)
+    assert server.requests == 8 * len(queries)
+
+    env.close()
+    print(f"✓ Politika sunucusu {server.batches} toplu okumada yanıtladı")
+
+
+def test_policy_server_reload(tmp_path):
+    """Bozuk dosyada yeniden yükleme başarısız olmalı ama döngü durmamalı"""
+    import asyncio
+    import os
+    from policy_server import PolicyServer
+
+    env = CustomTaxiEnv()
+    rng = np.random.default_rng(0)
+    q_path = str(tmp_path / "test_reload_q_table.npy")
+    np.save(q_path, rng.normal(size=(env.observation_space.n, env.action_space.n)))
+    server = PolicyServer(q_path, reload_interval=0.01, env=env)
+    Q = rng.normal(size=(env.observation_space.n, env.action_space.n))
+
+    async def wait_for(condition):
+        for _ in range(500):
+            if condition():
+                return True
+            await asyncio.sleep(0.01)
+        return False
+
+    async def main():
+        await server.start(unix_path=str(tmp_path / "test_reload.sock"))
+        try:
+            # Yarım yazılmış (boş) dosya: np.load EOFError verir
+            open(q_path, "wb").close()
+            os.utime(q_path, ns=(1, 1))
+            assert await wait_for(lambda: server.reload_failures > 0)
+            assert server.reloads == 0
+
+            np.save(q_path, Q)
+            assert await wait_for(lambda: server.reloads == 1)
+        finally:
+            await server.stop()
+
+    asyncio.run(main())
+    assert np.array_equal(server.policy.actions, np.argmax(Q, axis=1))
+    env.close()
+    print(f"✓ Bozuk dosyadan sonra yeniden yükleme sürüyor ({server.reload_failures} hata)")
+
+
+def test_fleet_simulation():
+    """
+    Optimal politikayla filo görevleri süre aşımı olmadan bitirmeli;
+    hep aynı aksiyonu seçen politikada tüm görevler süre aşımına uğramalı
+    """
+    from train_qtable import value_iteration
+    from fleet import simulate_fleet
+
+    env = CustomTaxiEnv()
+    Q, _ = value_iteration(env=env)
+    results = simulate_fleet(Q, num_taxis=500, steps=400, seed=0, env=env)
+    assert results['jobs'] > 0 and results['failed_jobs'] == 0
+    assert results['max_job_steps'] <= 22
+    assert results['wasted_ratio'] == 0
+    assert abs(results['empty_ratio'] + results['loaded_ratio'] - 1) < 1e-9
+
+    stuck = simulate_fleet(np.zeros_like(Q), num_taxis=100, steps=450,
+                           seed=0, job_step_limit=200, env=env)
+    assert stuck['jobs'] == 0 and stuck['failed_jobs'] == 200
+
+    env.close()
+    print(f"✓ Filo simülasyonu ({results['jobs_per_taxi_hour']:.1f} görev/saat/taksi)")
+
+
+def test_sparse_q_table():
+    """Seyrek Q-table yoğun diziyle aynı okuma/yazma sonuçlarını vermeli"""
+    from q_storage import SparseQTable
+
+    rng = np.random.default_rng(0)
+    n_states, n_actions = 93312, 6
+    dense = np.zeros((n_states, n_actions))
+    sparse = SparseQTable(n_states, n_actions, capacity=16)
+
+    # Skaler güncellemeler (eğitim döngüsündeki gibi) - tablo birkaç kez büyür
+    for state, action in zip(rng.integers(n_states, size=5000), rng.integers(n_actions, size=5000)):
+        value = dense[state, action] + rng.random()
+        dense[state, action] = value
+        sparse[state, action] = value
+    assert sparse.visited == np.count_nonzero(dense.any(axis=1))
+
+    # Toplu okuma/yazma
+    states = rng.integers(n_states, size=20000)
+    assert np.array_equal(sparse[states], dense[states])
+    rows = rng.random((100, n_actions))
+    dense[states[:100]] = rows
+    sparse[states[:100]] = rows
+    assert np.array_equal(sparse.to_dense(), dense)
+    for state in states[:200]:
+        assert np.array_equal(sparse[state], dense[state])
+        assert np.argmax(sparse[state]) == np.argmax(dense[state])
+
+    # Yoğun formata gidiş-dönüş
+    assert np.array_equal(SparseQTable.from_dense(dense).to_dense(), dense)
+    assert np.array_equal(np.argmax(sparse, axis=1), np.argmax(dense, axis=1))
+    print(f"✓ Seyrek Q-table yoğun diziyle aynı ({sparse.visited} satır)")
+
+
+def test_planning_modes():
+    """Dyna-Q ve öncelikli tarama kısa eğitimde çalışmalı ve aynı tohumla tekrarlanabilir olmalı"""
+    from train_qtable import train_qtable_planning
+
+    for planning in ("dyna", "prioritized"):
+        Q_a, stats = train_qtable_planning(episodes=20, planning=planning, planning_steps=3,
+                                           eval_interval=10, seed=5, save=False)
+        Q_b, _ = train_qtable_planning(episodes=20, planning=planning, planning_steps=3,
+                                       eval_interval=10, seed=5, save=False)
+        assert np.array_equal(Q_a, Q_b)
+        assert stats['planning_updates'] > 0
+        assert stats['hyperparameters']['planning_alpha'] == 1.0   # CLI varsayılanı
+        assert [episode for episode, *_ in stats['evaluations']] == [10, 20]
+    print("✓ Planlama modları çalışıyor")
+
+
+def test_delta_checkpoint_chain(tmp_path, monkeypatch):
+    """Delta zinciri tam tabloyu vermeli ve açtığı dosyaları kapatmalı"""
+    from checkpoint import CheckpointWriter, load_q_table
+
+    writer = CheckpointWriter(str(tmp_path), delta=True)
+    Q = np.zeros((10, 6))
+    for episode in range(1, 5):
+        Q[episode] = episode
+        writer.save(Q, episode)
+    writer.close()
+
+    opened = []
+    original_load = np.load
+
+    def tracking_load(*args, **kwargs):
+        result = original_load(*args, **kwargs)
+        if isinstance(result, np.lib.npyio.NpzFile):
+            opened.append(result)
+        return result
+
+    monkeypatch.setattr(np, "load", tracking_load)
+    loaded = load_q_table(str(tmp_path / "q_table_checkpoint_4.delta.npz"))
+    assert np.array_equal(loaded, Q)
+    assert len(opened) == 3 and all(delta.fid is None for delta in opened)
+    print("✓ Delta checkpoint zinciri doğru ve dosyalar kapalı")
+
+
+def test_vectorized_checkpoints(workdir):
+    """
+    Bir adımda birden çok rapor aralığı geçildiğinde ara kayıt tablonun
+    ulaştığı episode sayısıyla etiketlenmeli
+    """
+    import os
+    from train_qtable import train_qtable_vectorized
+
+    # 64 ortam aynı adımda timeout olur: tek adımda çok sayıda aralık geçilir
+    Q, _ = train_qtable_vectorized(episodes=200, num_envs=64, save_interval=5, seed=0)
+    labels = sorted(int(name[len("q_table_checkpoint_"):-len(".npy")])
+                    for name in os.listdir(".") if name.startswith("q_table_checkpoint_"))
+    assert labels[-1] == 200
+    assert all(later // 5 > earlier // 5 for earlier, later in zip(labels, labels[1:]))
+    assert np.array_equal(np.load("q_table_checkpoint_200.npy"), Q)
+    print("✓ Vektörel eğitim ara kayıtları doğru etiketleniyor")
+
+
+def test_replay_buffer():
+    """Replay tamponu halka gibi sarmalı, öncelikle orantılı örneklemeli"""
+    from replay_buffer import ReplayBuffer
+    from train_qtable import q_learning_batch_update
+
+    buffer = ReplayBuffer(100, seed=0)
+    for i in range(250):
+        buffer.add(i, i % 6, -0.5, i + 1, i % 7 == 0)
+    assert len(buffer) == 100
+    assert sorted(buffer.states.tolist()) == list(range(150, 250))
+    _, states, actions, _, next_states, dones, weights = buffer.sample(64)
+    assert weights is None
+    assert np.array_equal(next_states, states + 1)
+    assert np.array_equal(dones, states % 7 == 0)
+
+    # Öncelikli örnekleme: yalnızca önceliği sıfırdan büyük geçişler, orantılı sıklıkta
+    buffer = ReplayBuffer(1000, prioritized=True, priority_exponent=1.0, epsilon=0.0, seed=0)
+    for i in range(1000):
+        buffer.add(i, 0, 0.0, i, False)
+    errors = np.zeros(1000)
+    errors[[10, 500, 999]] = [1.0, 2.0, 1.0]
+    buffer.update_priorities(np.arange(1000), errors)
+    indices = buffer.sample(4000)[0]
+    counts = np.bincount(indices, minlength=1000)
+    assert counts.sum() == counts[[10, 500, 999]].sum()
+    assert abs(counts[500] / 4000 - 0.5) < 0.05
+
+    # Önem ağırlıkları 1 iken ağırlıklı güncelleme ağırlıksızla aynı
+    rng = np.random.default_rng(0)
+    Q_a = rng.random((20, 6))
+    Q_b = Q_a.copy()
+    batch = (rng.integers(20, size=200), rng.integers(6, size=200),
+             rng.random(200), rng.integers(20, size=200))
+    for duplicates in ("sequential", "average"):
+        q_learning_batch_update(Q_a, *batch, 0.3, 0.9, duplicates)
+        q_learning_batch_update(Q_b, *batch, 0.3, 0.9, duplicates,
+                                importance_weights=np.ones(200))
+        assert np.allclose(Q_a, Q_b)
+    print("✓ Replay tamponu doğru çalışıyor")
+
+
+def test_terminal_dropoff_update(workdir):
+    """
+    Tüm eğiticilerde başarılı teslimat terminal olmalı: alpha=1 ile
+    teslimat çifti tam olarak 200 olur (sonraki state'ten bootstrap
+    edilseydi 200'ü aşardı). Tek süreçli eğiticiler tohumla
+    deterministiktir ve uçtan uca çalıştırılır; sonucu süreç
+    zamanlamasına bağlı Hogwild ve aktör–öğrenici için güncelleme yolları
+    sabit bir teslimat geçişiyle doğrudan sınanır.
+    """
+    from transition_ring import TransitionRing
+    from train_qtable import (is_terminal, q_learning_batch_update, q_learning_step,
+                              train_qtable, train_qtable_planning, train_qtable_vectorized)
+
+    env = CustomTaxiEnv()
+    env.build_transition_tables()
+    delivers = env.terminal_table[:, 5]
+    options = dict(episodes=300, alpha=1.0, seed=0)
+    trainers = [
+        lambda: train_qtable(save_interval=300, **options),
+        lambda: train_qtable(save_interval=300, replay="uniform", replay_batch_size=64, **options),
+        lambda: train_qtable_vectorized(num_envs=32, save_interval=300, **options),
+        lambda: train_qtable_planning(planning="dyna", planning_steps=3, eval_interval=300,
+                                      save=False, **options),
+        lambda: train_qtable_planning(planning="prioritized", planning_steps=3,
+                                      eval_interval=300, save=False, **options),
+    ]
+    for trainer in trainers:
+        Q, _ = trainer()
+        visited = Q[delivers, 5][Q[delivers, 5] != 0]
+        assert len(visited) > 10
+        assert np.all(visited == 200)
+
+    # Sabit teslimat geçişi: sonraki state'in Q satırı büyükken bile hedef 200
+    state = int(np.flatnonzero(delivers)[0])
+    next_state, reward, _ = env.step_table(state, 5)
+    assert reward == 200 and is_terminal(True, 5, reward)
+    assert not is_terminal(True, 5, -20) and not is_terminal(True, 0, -10.5)
+    Q = np.full((env.observation_space.n, env.action_space.n), 150.0)
+
+    # Hogwild işçisinin güncellemesi
+    hogwild_Q = Q.copy()
+    q_learning_step(hogwild_Q, state, 5, reward, next_state, True, 1.0, 0.95)
+    assert hogwild_Q[state, 5] == 200
+
+    # Aktör halkaya terminal bayrağıyla yazar, öğrenici grup güncellemesi yapar
+    ring = TransitionRing(4)
+    try:
+        ring.push(state, 5, reward, next_state, is_terminal(True, 5, reward), 1)
+        count, states, actions, rewards, next_states, dones, _ = ring.read(4)
+        learner_Q = Q.copy()
+        q_learning_batch_update(learner_Q, states, actions, rewards, next_states, 1.0, 0.95,
+                                dones=dones)
+        ring.release(count)
+        del states, actions, rewards, next_states, dones   # halka görünümleri
+        assert learner_Q[state, 5] == 200
+    finally:
+        ring.close()
+        ring.unlink()
+    env.close()
+    print("✓ Teslimat güncellemesi terminal")
+
+
+def test_convergence_monitor():
+    """Yakınsama izleyici değişimi ölçmeli, eşikler patience pencere sağlanınca durmalı"""
+    from convergence import ConvergenceMonitor
+    from train_qtable import value_iteration
+
+    Q, _ = value_iteration()
+    monitor = ConvergenceMonitor(window=10, patience=2, max_q_change=1e-9)
+
+    # Optimal Q-table değişmezse ilk karşılaştırmadan sonra patience pencerede yakınsar
+    signals = monitor.update(Q, 10)
+    assert signals['success_rate'] == 100.0 and not monitor.converged
+    signals = monitor.update(Q, 20)
+    assert signals['max_q_change'] == 0.0 and signals['policy_change'] == 0.0
+    assert not monitor.converged
+    monitor.update(Q, 30)
+    assert monitor.converged
+    assert monitor.adapt_epsilon(0.5, 1.0, 0.01) == 0.01
+
+    # Politika değişimi ardışık pencere sayacını sıfırlar
+    changed = Q.copy()
+    visited = np.flatnonzero(Q.any(axis=1))
+    changed[visited[:len(visited) // 10]] *= -1
+    signals = monitor.update(changed, 40)
+    assert signals['policy_change'] > 0.05 and monitor.streak == 0
+    print("✓ Yakınsama izleme çalışıyor")
+
+
+def test_profiler_monitor_phase(workdir):
+    """Yakınsama izlemesinin süresi istatistik fazından ayrı ölçülmeli"""
+    import glob
+    import json
+    from convergence import ConvergenceMonitor
+    from train_qtable import train_qtable
+
+    _, stats = train_qtable(episodes=20, save_interval=10, seed=0, profile=True,
+                            monitor=ConvergenceMonitor(window=10))
+    phases = stats['profile']['phases']
+    assert phases['stats']['calls'] == 20
+    assert phases['monitor']['calls'] == 2 and phases['monitor']['total_seconds'] > 0
+    with open(glob.glob("training_profile_*.json")[0]) as f:
+        assert json.load(f)['phases']['monitor'] == phases['monitor']
+    print("✓ Yakınsama izlemesi ayrı profil fazında")
+
+
+def test_sweep(workdir):
+    """Sweep run'ları ayrı dizinlerde çalıştırmalı, bitmiş run'ları tekrarlamamalı"""
+    import os
+    from sweep import load_results, rank_configs, run_sweep
+
+    sweep_dir = "test_sweep"
+    spec = {'search': 'grid', 'params': {'alpha': [0.1, 0.3]},
+            'fixed': {'episodes': 20, 'save_interval': 10}, 'repeats': 2, 'seed': 0}
+    rows = run_sweep(spec, sweep_dir, workers=2)
+    assert sorted(row['run_id'] for row in rows) == ['run_000', 'run_001', 'run_002', 'run_003']
+    assert len({row['seed'] for row in rows}) == 4
+    assert all(os.path.exists(row['q_table']) for row in rows)
+
+    # Yarıda kalmış sweep: yalnızca sonucu olmayan run yeniden çalışır
+    os.remove(os.path.join(sweep_dir, "run_002", "result.json"))
+    resumed = {row['run_id']: row for row in run_sweep(None, sweep_dir, workers=2)}
+    before = {row['run_id']: row for row in rows}
+    assert resumed['run_000'] == before['run_000']
+    assert resumed['run_002']['seed'] == before['run_002']['seed']
+    assert len(load_results(sweep_dir)) == 4
+
+    ranked = rank_configs(resumed.values())
+    assert [entry['runs'] for entry in ranked] == [2, 2]
+    assert ranked[0]['success_rate'] >= ranked[1]['success_rate']
+    assert os.path.exists(os.path.join(sweep_dir, "results.csv"))
+    print("✓ Hiperparametre taraması ve devam etme çalışıyor")
+
+
+def test_resume_training(workdir):
+    """Ara kayıttan devam eden eğitim kesintisiz eğitimle birebir aynı olmalı"""
+    from train_qtable import train_qtable
+    from training_stats import StatsReader
+
+    options = dict(episodes=40, save_interval=20, seed=5, replay="uniform", replay_batch_size=32)
+    Q_full, stats_full = train_qtable(**options)
+    columns = ('rewards', 'steps', 'success')
+    full = {name: StatsReader(stats_full['path']).column(name).copy() for name in columns}
+
+    Q_resumed, stats_resumed = train_qtable(resume_from="q_table_checkpoint_20.state.npz",
+                                            **options)
+    resumed = StatsReader(stats_resumed['path'])
+    assert stats_resumed['path'] == stats_full['path'] and len(resumed) == 40
+    assert np.array_equal(Q_full, Q_resumed)
+    assert stats_resumed['env_steps'] == stats_full['env_steps']
+    assert all(np.array_equal(full[name], resumed.column(name)) for name in columns)
+
+    # Farklı hiperparametrelerle devam reddedilir
+    with pytest.raises(ValueError):
+        train_qtable(resume_from="q_table_checkpoint_20.state.npz", **dict(options, alpha=0.5))
+    print("✓ Ara kayıttan birebir devam çalışıyor")
+
+
+def test_actor_learner(workdir, monkeypatch):
+    """
+    Halka sarmalı; öğrenici her geçişi tam bir kez tüketmeli. Kilitsiz (x86)
+    ve kilitli (zayıf bellek modelli platformlar) sıralama aynı davranmalı.
+    """
+    import multiprocessing as mp
+    import train_qtable
+    from transition_ring import SharedPolicy, TransitionRing
+
+    for lock in (None, mp.Lock()):
+        # Aynı bloğa bağlanan üretici ve tüketici, sınırda sarma ve dolu halka
+        producer = TransitionRing(8, lock=lock)
+        consumer = TransitionRing(8, name=producer.name, lock=lock)
+        policy = SharedPolicy(4, lock=lock)
+        reader = SharedPolicy(4, name=policy.name, lock=lock)
+        try:
+            assert all(producer.push(i, i % 6, -0.5, i + 1, False, 1) for i in range(6))
+            count, states = consumer.read(4)[:2]
+            assert count == 4 and states.tolist() == [0, 1, 2, 3]
+            consumer.release(count)
+            assert all(producer.push(i, 0, -0.5, i + 1, False, 2) for i in range(6, 12))
+            assert not producer.push(12, 0, 0.0, 13, False, 2)
+            count, states, _, _, next_states, _, versions = consumer.read(100)
+            assert count == 4 and states.tolist() == [4, 5, 6, 7]   # halka sonuna kadar
+            assert np.array_equal(next_states, states + 1) and versions.tolist() == [1, 1, 2, 2]
+            consumer.release(count)
+            assert consumer.read(100)[1].tolist() == [8, 9, 10, 11]
+
+            out = np.zeros(4, dtype=np.uint8)
+            version = policy.publish([3, 2, 1, 0])
+            assert reader.read(out) == version == reader.version == 1
+            assert out.tolist() == [3, 2, 1, 0]
+        finally:
+            for shared in (consumer, reader):
+                shared.close()
+            for shared in (producer, policy):
+                shared.close()
+                shared.unlink()
+
+    # Kilitli yol aktör süreçleriyle uçtan uca (x86'da da zorlanarak)
+    monkeypatch.setattr(train_qtable, "ordering_lock", mp.Lock)
+    Q, stats = train_qtable.train_qtable_actor_learner(episodes=60, actors=2, save_interval=30,
+                                                       ring_capacity=256, batch_size=64,
+                                                       publish_interval=128, seed=0)
+    assert stats['episodes'] == 60
+    assert stats['updates'] == stats['env_steps']
+    assert stats['replayed'] > 0 and stats['staleness']['policy_versions'] > 1
+    assert np.any(Q != 0)
+    print("✓ Aktör–öğrenici hattı çalışıyor")
+
+
+def test_rgb_array_recorder(tmp_path):
+    """rgb_array render ve EpisodeRecorder testi"""
+    from episode_recorder import EpisodeRecorder, RecordingReader
+
+    display_was_init = pygame.display.get_init()
+    env = CustomTaxiEnv(render_mode="rgb_array")
+    env.reset(seed=0)
+    frame = env.render()
+    width, height = env.window_size
+    assert frame.shape == (height, width, 3) and frame.dtype == np.uint8
+    assert np.shares_memory(frame, env.render())   # kopyasız: hep aynı tampon
+    assert pygame.display.get_init() == display_was_init
+
+    # Bellekte: sığmayan episode atılır, kayıtlı episode'lar tutarlı kalır
+    recorder = EpisodeRecorder(env, capacity=300)
+    recorded = recorder.record(None, episodes=10, rng=np.random.default_rng(0))
+    assert 1 <= recorded < 10 and len(recorder) == recorded
+    assert recorder.frame_count == sum(recorder.episodes['length']) <= 300
+    last = recorder.episode_frames(recorded - 1)
+    assert len(last) == recorder.episodes['length'][-1]
+    assert not np.array_equal(last[0], last[-1])
+
+    # Diskte: episode'lar parça sınırlarını aşar, okuyucu aynı kareleri verir
+    run_dir = str(tmp_path / "recordings")
+    env.reset(seed=1)
+    with EpisodeRecorder(env, capacity=64, directory=run_dir, downsample=2) as recorder:
+        recorder.record(None, episodes=3, rng=np.random.default_rng(1))
+        last = recorder.frames[recorder._position - 1].copy()
+    reader = RecordingReader(run_dir)
+    assert len(reader) == 3 and reader.frames == recorder.frame_count
+    lengths = [len(reader.episode(i)) for i in range(3)]
+    assert lengths == list(recorder.episodes['length'])
+    assert reader.episode(2).shape[1:] == ((height + 1) // 2, (width + 1) // 2, 3)
+    assert np.array_equal(reader.episode(2)[-1], last)
+    assert np.array_equal(last, frame[::2, ::2])   # son render karesi
+    env.close()
+
+    with pytest.raises(ValueError):
+        CustomTaxiEnv(render_mode="ansi")
+    print("✓ Ekransız render ve episode kaydı çalışıyor")
+
+
 if __name__ == "__main__":
     try:
         # Genel test
@@ -1,10 +1,28 @@
 import numpy as np
-from custom_taxi_env import CustomTaxiEnv
+from custom_taxi_env import CustomTaxiEnv, VectorCustomTaxiEnv
+from checkpoint import (CheckpointWriter, atomic_save, latest_trainer_state, load_q_table,
+                        load_trainer_state)
+from training_stats import RollingMean, StatsWriter
+from profiler import PhaseProfiler
+from q_storage import SPARSE_SUFFIX, SparseQTable, make_q_table
+from replay_buffer import ReplayBuffer
+from convergence import ConvergenceMonitor
+from transition_ring import SharedPolicy, TransitionRing, ordering_lock
+import argparse
+import heapq
+import multiprocessing as mp
 import os
+import sys
+import time
 from datetime import datetime
+from multiprocessing import shared_memory
 
 def train_qtable(episodes=50000, alpha=0.1, gamma=0.95, epsilon_start=1.0, 
-                 epsilon_end=0.01, epsilon_decay=0.995, save_interval=5000):
+                 epsilon_end=0.01, epsilon_decay=0.995, save_interval=5000,
+                 compact=False, dtype=np.float64, checkpoint_delta=False, seed=None,
+                 profile=False, storage="dense", grid_size=6, replay=None,
+                 replay_capacity=100000, replay_batch_size=256, replay_interval=8,
+                 monitor=None, early_stop=False, adaptive_epsilon=False, resume_from=None):
     """
     Q-Learning ile taksi eğitimi
     
@@ -16,18 +34,141 @@ def train_qtable(episodes=50000, alpha=0.1, gamma=0.95, epsilon_start=1.0,
         epsilon_end: Minimum exploration oranı
         epsilon_decay: Epsilon azalma oranı
         save_interval: Her kaç episode'da bir kayıt yapılacağı
+        compact: Q-table yalnızca erişilebilir state'leri içersin
+                 (bkz. CustomTaxiEnv.build_compact_index)
+        dtype: Q-table veri tipi (float64 veya float32).
+               Güncelleme hesabı her zaman float64 ile yapılır. float16
+               reddedilir: 200 civarında adım 0.125 olduğundan yarım
+               adımdan küçük alpha * td_error güncellemeleri sıfıra
+               yuvarlanır ve öğrenme sessizce durur (float16 yalnızca
+               çözücülerin kaydettiği tablolar içindir, bkz. solve_qtable).
+        checkpoint_delta: Ara kayıtlarda yalnızca değişen satırları yaz
+                          (bkz. checkpoint.CheckpointWriter)
+        seed: Ortam ve keşif RNG tohumu (None = rastgele)
+        profile: Faz bazlı süre ölçümü (aksiyon seçimi, env.step, güncelleme,
+                 istatistik, yakınsama izleme, checkpoint); raporlarla birlikte yazdırılır ve
+                 sonda training_profile_<zaman>.json olarak kaydedilir
+        storage: "dense" (np.zeros) ya da "sparse" (yalnızca güncellenen
+                 state'ler için satır ayıran q_storage.SparseQTable;
+                 büyük grid_size değerleri için)
+        grid_size: Ortam grid boyutu
+        replay: None (her geçiş bir kez kullanılır), "uniform" ya da
+                "prioritized" deneyim tekrarı (bkz. replay_buffer.ReplayBuffer);
+                her replay_interval adımda tampondan replay_batch_size
+                geçiş q_learning_batch_update ile yeniden uygulanır
+        replay_capacity: Tampondaki en fazla geçiş sayısı
+        replay_batch_size: Tekrar grubu boyutu
+        replay_interval: Kaç ortam adımında bir tekrar yapılacağı
+        monitor: convergence.ConvergenceMonitor; her monitor.window
+                 episode'da Q değişimi, politika değişimi ve açgözlü başarı
+                 ölçülür (early_stop/adaptive_epsilon verilip monitor
+                 verilmezse varsayılan eşiklerle oluşturulur)
+        early_stop: Eşikler monitor.patience ardışık pencere sağlanınca dur
+        adaptive_epsilon: Epsilon, çarpımsal azalmaya ek olarak pencere
+                          ölçümleriyle düşürülür (bkz. adapt_epsilon)
+        resume_from: Ara kayıttan devam (q_table_checkpoint_<ep>.state.npz
+                     ya da eşlik ettiği Q dosyası). Q, epsilon, RNG
+                     durumları, hareketli ortalamalar, replay tamponu ve
+                     yakınsama geçmişi geri yüklenir; istatistikler aynı
+                     dizinde kayıt episode'undan itibaren yeniden yazılır.
+                     episodes dışındaki hiperparametreler kayıttakiyle aynı
+                     olmalıdır; aynı save_interval ile sonuç kesintisiz
+                     eğitimle birebir aynıdır.
     """
     
-    env = CustomTaxiEnv()
+    if compact and storage != "dense":
+        raise ValueError("compact yalnızca yoğun (dense) Q-table ile kullanılabilir")
+    if np.dtype(dtype) == np.float16:
+        raise ValueError("float16 ile eğitim desteklenmez (küçük güncellemeler sıfıra yuvarlanır); "
+                         "float32 kullanın")
+    if replay not in (None, "uniform", "prioritized"):
+        raise ValueError(f"Geçersiz replay modu: {replay}")
+    if replay and storage != "dense":
+        raise ValueError("replay yalnızca yoğun (dense) Q-table ile kullanılabilir")
+    resume_state = load_trainer_state(resume_from) if resume_from is not None else None
+    if monitor is None and resume_state is not None and resume_state['monitor'] is not None:
+        monitor = ConvergenceMonitor(**resume_state['monitor']['config'])
+    if monitor is None and (early_stop or adaptive_epsilon):
+        monitor = ConvergenceMonitor()
+    if monitor is not None and storage != "dense":
+        raise ValueError("Yakınsama izleme yalnızca yoğun (dense) Q-table ile kullanılabilir")
+    
+    env = CustomTaxiEnv(grid_size=grid_size)
+    
+    # Tekrarlanabilirlik: ortam doğumları, keşif ve replay örneklemesi için ayrı RNG akışları
+    env_seed, explore_seed, replay_seed = np.random.SeedSequence(seed).spawn(3)
+    env.reset(seed=int(env_seed.generate_state(1)[0]))
+    rng = np.random.default_rng(explore_seed)
+    n_actions = env.action_space.n
     
     # Q-table'ı başlat
-    Q = np.zeros((env.observation_space.n, env.action_space.n))
+    if compact:
+        row_index = env.compact_state(np.arange(env.observation_space.n))
+        Q = np.zeros((env.compact_state_count, env.action_space.n), dtype=dtype)
+    else:
+        row_index = None
+        Q = make_q_table(storage, env.observation_space.n, env.action_space.n, dtype)
+    
+    replay_buffer = None
+    if replay:
+        replay_buffer = ReplayBuffer(replay_capacity, prioritized=(replay == "prioritized"),
+                                     seed=replay_seed)
+    
+    hyperparameters = {
+        'episodes': episodes,
+        'alpha': alpha,
+        'gamma': gamma,
+        'epsilon_start': epsilon_start,
+        'epsilon_end': epsilon_end,
+        'epsilon_decay': epsilon_decay,
+        'compact': compact,
+        'dtype': np.dtype(dtype).name,
+        'seed': seed,
+        'storage': storage,
+        'grid_size': grid_size,
+        'replay': replay,
+        'replay_capacity': replay_capacity,
+        'replay_batch_size': replay_batch_size,
+        'replay_interval': replay_interval,
+        'early_stop': early_stop,
+        'adaptive_epsilon': adaptive_epsilon
+    }
     
-    # Eğitim istatistikleri
-    rewards_history = []
-    steps_history = []
-    success_history = []
+    # Eğitim istatistikleri: diske sütunlu parçalar halinde akar,
+    # raporlar için yalnızca sabit boyutlu hareketli ortalamalar tutulur
+    final_window = min(1000, episodes)
+    window_stats = [RollingMean(save_interval) for _ in range(3)]
+    final_stats = [RollingMean(final_window) for _ in range(3)]
     epsilon = epsilon_start
+    env_steps = 0
+    start_episode = 1
+    
+    if resume_state is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stats_path = f"training_stats_{timestamp}"
+        stats_writer = StatsWriter(stats_path, metadata={'hyperparameters': hyperparameters})
+    else:
+        _check_resume_state(resume_state, hyperparameters, monitor)
+        Q = load_q_table(os.path.join(os.path.dirname(resume_from), resume_state['q_checkpoint']))
+        timestamp = resume_state['timestamp']
+        stats_path = resume_state['stats_path']
+        stats_writer = StatsWriter(stats_path, metadata={'hyperparameters': hyperparameters},
+                                   start_row=resume_state['episode'])
+        for rolling, saved in zip(window_stats + final_stats,
+                                  resume_state['window_stats'] + resume_state['final_stats']):
+            rolling.set_state(saved)
+        epsilon = resume_state['epsilon']
+        env_steps = resume_state['env_steps']
+        start_episode = resume_state['episode'] + 1
+        rng.bit_generator.state = resume_state['rng']
+        env.np_random.bit_generator.state = resume_state['env_rng']
+        if replay_buffer is not None:
+            replay_buffer.set_state(resume_state['replay'])
+        if monitor is not None:
+            monitor.set_state(resume_state['monitor'])
+            if early_stop and monitor.converged:
+                # Kayıtlı eğitim bu episode'da erken durmuştu
+                start_episode = episodes + 1
     
     print("=" * 60)
     print("TAKSI Q-LEARNING EĞİTİMİ BAŞLIYOR")
@@ -36,33 +177,73 @@ def train_qtable(episodes=50000, alpha=0.1, gamma=0.95, epsilon_start=1.0,
     print(f"Alpha (öğrenme oranı): {alpha}")
     print(f"Gamma (indirim faktörü): {gamma}")
     print(f"Epsilon: {epsilon_start} → {epsilon_end} (decay: {epsilon_decay})")
+    print(f"Q-table: {Q.shape} {Q.dtype} {storage} ({Q.nbytes / 1e6:.1f} MB)")
+    if resume_state is not None:
+        print(f"Devam: {resume_from} (episode {resume_state['episode']}, epsilon {epsilon:.4f})")
+    if replay_buffer is not None:
+        print(f"Replay: {replay}, kapasite {replay_capacity} ({replay_buffer.nbytes / 1e6:.1f} MB), "
+              f"her {replay_interval} adımda {replay_batch_size} geçiş")
+    if monitor is not None:
+        print(f"Yakınsama izleme: her {monitor.window} episode, sabır {monitor.patience} "
+              f"(erken durdurma: {'açık' if early_stop else 'kapalı'}, "
+              f"uyarlamalı epsilon: {'açık' if adaptive_epsilon else 'kapalı'})")
     print("=" * 60)
     
-    for episode in range(1, episodes + 1):
+    # Ara kayıtlar arka planda yazılır
+    checkpoints = CheckpointWriter(delta=checkpoint_delta)
+    
+    # Profil kapalıyken döngüdeki tek maliyet 'if profiler' kontrolleridir
+    profiler = PhaseProfiler() if profile else None
+    clock = time.perf_counter
+    
+    for episode in range(start_episode, episodes + 1):
         state, _ = env.reset()
+        row = state if row_index is None else row_index[state]
         total_reward = 0
         steps = 0
         done = False
         
         while not done:
+            if profiler:
+                t_action = clock()
+            
             # Epsilon-greedy action selection
-            if np.random.rand() < epsilon:
-                action = env.action_space.sample()  # Explore
+            if rng.random() < epsilon:
+                action = rng.integers(n_actions)  # Explore
             else:
-                action = np.argmax(Q[state])  # Exploit
+                action = np.argmax(Q[row])  # Exploit
+            
+            if profiler:
+                t_step = clock()
             
             # Adım at
             next_state, reward, done, _, info = env.step(action)
+            next_row = next_state if row_index is None else row_index[next_state]
+            
+            if profiler:
+                t_update = clock()
             
             # Q-değerini güncelle (Q-Learning update rule)
-            old_value = Q[state, action]
-            next_max = np.max(Q[next_state])
+            terminal = is_terminal(done, action, reward)
+            old_value = float(Q[row, action])
+            next_max = 0.0 if terminal else float(np.max(Q[next_row]))
             
             # Bellman denklemi
             new_value = old_value + alpha * (reward + gamma * next_max - old_value)
-            Q[state, action] = new_value
+            Q[row, action] = new_value
+            
+            env_steps += 1
+            if replay_buffer is not None:
+                replay_buffer.add(row, action, reward, next_row, terminal)
+                if env_steps % replay_interval == 0 and len(replay_buffer) >= replay_batch_size:
+                    replay_update(Q, replay_buffer, replay_batch_size, alpha, gamma)
+            
+            if profiler:
+                t_end = clock()
+                profiler.add_step(t_step - t_action, t_update - t_step, t_end - t_update)
             
             state = next_state
+            row = next_row
             total_reward += reward
             steps += 1
             
@@ -70,29 +251,81 @@ def train_qtable(episodes=50000, alpha=0.1, gamma=0.95, epsilon_start=1.0,
             if steps > 500:
                 done = True
         
+        if profiler:
+            t_stats = clock()
+        
         # İstatistikleri kaydet
-        rewards_history.append(total_reward)
-        steps_history.append(steps)
-        success_history.append(1 if total_reward > 0 else 0)
+        success = total_reward > 0
+        stats_writer.append(rewards=total_reward, steps=steps, success=success)
+        for rolling in (window_stats, final_stats):
+            rolling[0].add(total_reward)
+            rolling[1].add(steps)
+            rolling[2].add(success)
+        
+        if profiler:
+            profiler.add('stats', clock() - t_stats)
         
         # Epsilon'u azalt (exploration'dan exploitation'a geçiş)
         epsilon = max(epsilon_end, epsilon * epsilon_decay)
         
+        # Yakınsama ölçümleri (açgözlü değerlendirme dahil)
+        stop = False
+        if monitor is not None and episode % monitor.window == 0:
+            if profiler:
+                t_monitor = clock()
+            signals = monitor.update(Q, episode, env)
+            if adaptive_epsilon:
+                epsilon = monitor.adapt_epsilon(epsilon, epsilon_start, epsilon_end)
+            stop = early_stop and monitor.converged
+            if profiler:
+                profiler.add('monitor', clock() - t_monitor)
+        
         # İlerleme raporu
         if episode % save_interval == 0:
-            avg_reward = np.mean(rewards_history[-save_interval:])
-            avg_steps = np.mean(steps_history[-save_interval:])
-            success_rate = np.mean(success_history[-save_interval:]) * 100
+            avg_reward, avg_steps, success_rate = (rolling.mean for rolling in window_stats)
+            success_rate *= 100
             
             print(f"Episode {episode}/{episodes}")
             print(f"  Ortalama Ödül: {avg_reward:.2f}")
             print(f"  Ortalama Adım: {avg_steps:.1f}")
             print(f"  Başarı Oranı: {success_rate:.1f}%")
             print(f"  Epsilon: {epsilon:.4f}")
+            if storage == "sparse":
+                print(f"  Ayrılmış satır: {Q.visited} ({Q.nbytes / 1e6:.1f} MB)")
+            if monitor is not None and monitor.history:
+                monitor.print_report(monitor.history[-1])
+            if profiler:
+                profiler.print_report()
             print("-" * 60)
             
-            # Ara kayıt
-            np.save(f"q_table_checkpoint_{episode}.npy", Q)
+            # Ara kayıt: Q ile birlikte devam için gereken tüm eğitici durumu
+            if profiler:
+                t_checkpoint = clock()
+            stats_writer.flush()
+            checkpoints.save(Q, episode, {
+                'episode': episode,
+                'epsilon': epsilon,
+                'env_steps': env_steps,
+                'timestamp': timestamp,
+                'stats_path': stats_path,
+                'hyperparameters': hyperparameters,
+                'rng': rng.bit_generator.state,
+                'env_rng': env.np_random.bit_generator.state,
+                'window_stats': [rolling.get_state() for rolling in window_stats],
+                'final_stats': [rolling.get_state() for rolling in final_stats],
+                'replay': replay_buffer.get_state() if replay_buffer is not None else None,
+                'monitor': monitor.get_state() if monitor is not None else None,
+            })
+            if profiler:
+                profiler.add('checkpoint', clock() - t_checkpoint)
+    
+        if stop:
+            print(f"✓ Yakınsadı: {episode}. episode'da erken durduruldu")
+            monitor.print_report(signals)
+            break
+    
+    checkpoints.close()
+    stats_writer.close()
     
     # Final istatistikleri
     print("\n" + "=" * 60)
@@ -100,10 +333,8 @@ def train_qtable(episodes=50000, alpha=0.1, gamma=0.95, epsilon_start=1.0,
     print("=" * 60)
     
     # Son 1000 episode istatistikleri
-    final_window = min(1000, episodes)
-    final_avg_reward = np.mean(rewards_history[-final_window:])
-    final_avg_steps = np.mean(steps_history[-final_window:])
-    final_success_rate = np.mean(success_history[-final_window:]) * 100
+    final_avg_reward, final_avg_steps, final_success_rate = (rolling.mean for rolling in final_stats)
+    final_success_rate *= 100
     
     print(f"Son {final_window} Episode Ortalamaları:")
     print(f"  Ödül: {final_avg_reward:.2f}")
@@ -112,45 +343,1520 @@ def train_qtable(episodes=50000, alpha=0.1, gamma=0.95, epsilon_start=1.0,
     print("=" * 60)
     
     # Q-table'ı kaydet
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"q_table_{timestamp}.npy"
-    np.save(filename, Q)
-    np.save("q_table.npy", Q)  # Son sürüm için
+    save_q_table(Q, timestamp)
     
-    print(f"\n✓ Q-table kaydedildi: {filename}")
-    print(f"✓ Q-table kaydedildi: q_table.npy (latest)")
+    # İstatistikler eğitim boyunca diske yazıldı (okumak için StatsReader)
+    stats = {
+        'path': stats_path,
+        'episodes': stats_writer.rows,
+        'env_steps': env_steps,
+        'converged': monitor is not None and monitor.converged,
+        'convergence': monitor.history if monitor is not None else [],
+        'final': {
+            'reward': final_avg_reward,
+            'steps': final_avg_steps,
+            'success_rate': final_success_rate
+        },
+        'hyperparameters': hyperparameters
+    }
+    print(f"✓ Eğitim istatistikleri kaydedildi: {stats_path}/")
+    
+    if profiler:
+        profile_path = f"training_profile_{timestamp}.json"
+        profiler.export(profile_path)
+        stats['profile'] = profiler.to_dict()
+        print(f"✓ Profil kaydedildi: {profile_path}")
     
-    # İstatistikleri de kaydet
+    env.close()
+    return Q, stats
+
+
+def _check_resume_state(state, hyperparameters, monitor):
+    """Devam edilecek kaydın bu eğitimle uyumlu olduğunu doğrula"""
+    saved = state['hyperparameters']
+    mismatched = [f"{name}: {saved.get(name)!r} != {value!r}"
+                  for name, value in hyperparameters.items()
+                  if name != 'episodes' and saved.get(name) != value]
+    if mismatched:
+        raise ValueError("Devam kaydının hiperparametreleri farklı: " + ", ".join(mismatched))
+    if state['episode'] > hyperparameters['episodes']:
+        raise ValueError(f"Kayıt {state['episode']}. episode'da; episodes en az bu kadar olmalı")
+    if (state['monitor'] is None) != (monitor is None):
+        raise ValueError("Devam kaydı ile yakınsama izleme ayarı uyuşmuyor")
+    if monitor is not None and state['monitor']['config'] != monitor.config:
+        raise ValueError("Devam kaydının yakınsama eşikleri farklı")
+
+
+# Hogwild işçi istatistik sütunları (her işçi kendi satırına yazar)
+_WORKER_EPISODES, _WORKER_REWARD, _WORKER_STEPS, _WORKER_SUCCESS, _WORKER_UPDATES = range(5)
+
+
+def _hogwild_worker(worker_id, seed_seq, q_name, q_shape, stats_name, n_workers,
+                    episode_counter, episodes, alpha, gamma,
+                    epsilon_start, epsilon_end, epsilon_decay):
+    """
+    Hogwild işçisi: paylaşılan Q'yu kilitsiz günceller.
+    Episode numarası ortak sayaçtan alınır; epsilon bu global numaradan
+    hesaplandığı için tüm işçiler aynı takvimi izler.
+    """
+    q_shm = shared_memory.SharedMemory(name=q_name)
+    stats_shm = shared_memory.SharedMemory(name=stats_name)
+    Q = np.ndarray(q_shape, dtype=np.float64, buffer=q_shm.buf)
+    worker_stats = np.ndarray((n_workers, 5), dtype=np.float64, buffer=stats_shm.buf)[worker_id]
+
+    # Bağımsız RNG akışları: keşif ve ortam doğumları
+    env_seed, explore_seed = seed_seq.spawn(2)
+    rng = np.random.default_rng(explore_seed)
+    env = CustomTaxiEnv()
+    env.reset(seed=int(env_seed.generate_state(1)[0]))
+    n_actions = env.action_space.n
+
+    try:
+        while True:
+            with episode_counter.get_lock():
+                if episode_counter.value >= episodes:
+                    break
+                episode_counter.value += 1
+                episode = episode_counter.value
+
+            epsilon = max(epsilon_end, epsilon_start * epsilon_decay ** (episode - 1))
+
+            state, _ = env.reset()
+            total_reward = 0
+            steps = 0
+            done = False
+
+            while not done:
+                # Epsilon-greedy action selection
+                if rng.random() < epsilon:
+                    action = rng.integers(n_actions)  # Explore
+                else:
+                    action = np.argmax(Q[state])  # Exploit
+
+                next_state, reward, done, _, info = env.step(action)
+
+                # Kilitsiz Bellman güncellemesi
+                q_learning_step(Q, state, action, reward, next_state, done, alpha, gamma)
+
+                state = next_state
+                total_reward += reward
+                steps += 1
+
+                # Sonsuz döngü kontrolü
+                if steps > 500:
+                    done = True
+
+            worker_stats[_WORKER_EPISODES] += 1
+            worker_stats[_WORKER_REWARD] += total_reward
+            worker_stats[_WORKER_STEPS] += steps
+            worker_stats[_WORKER_SUCCESS] += 1 if total_reward > 0 else 0
+            worker_stats[_WORKER_UPDATES] += steps
+    finally:
+        env.close()
+        del Q, worker_stats
+        q_shm.close()
+        stats_shm.close()
+
+
+def train_qtable_parallel(episodes=50000, workers=None, alpha=0.1, gamma=0.95,
+                          epsilon_start=1.0, epsilon_end=0.01, epsilon_decay=0.995,
+                          save_interval=5000, seed=None):
+    """
+    Çok işlemcili Hogwild Q-Learning
+
+    Q-table paylaşılan bellekte tutulur; her işçi kendi CustomTaxiEnv'i ve
+    bağımsız RNG akışıyla Q'yu kilitsiz günceller. İlerleme raporu tüm
+    işçilerden toplanır.
+
+    Args:
+        episodes: Toplam eğitim episode sayısı (tüm işçiler toplamı)
+        workers: İşçi süreç sayısı (None = CPU sayısı)
+        seed: RNG akışları için ana tohum (None = rastgele)
+        Diğerleri: train_qtable() ile aynı
+    """
+    workers = workers or os.cpu_count()
+    env = CustomTaxiEnv()
+    q_shape = (env.observation_space.n, env.action_space.n)
+    env.close()
+
+    q_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(q_shape)) * 8)
+    stats_shm = shared_memory.SharedMemory(create=True, size=workers * 5 * 8)
+    Q = np.ndarray(q_shape, dtype=np.float64, buffer=q_shm.buf)
+    worker_stats = np.ndarray((workers, 5), dtype=np.float64, buffer=stats_shm.buf)
+    Q[:] = 0
+    worker_stats[:] = 0
+
+    episode_counter = mp.Value('q', 0)
+    seed_seqs = np.random.SeedSequence(seed).spawn(workers)
+
+    print("=" * 60)
+    print("TAKSI HOGWILD Q-LEARNING EĞİTİMİ BAŞLIYOR")
+    print("=" * 60)
+    print(f"Episodes: {episodes}")
+    print(f"İşçi sayısı: {workers}")
+    print(f"Alpha (öğrenme oranı): {alpha}")
+    print(f"Gamma (indirim faktörü): {gamma}")
+    print(f"Epsilon: {epsilon_start} → {epsilon_end} (decay: {epsilon_decay})")
+    print("=" * 60)
+
+    processes = [
+        mp.Process(target=_hogwild_worker,
+                   args=(i, seed_seqs[i], q_shm.name, q_shape, stats_shm.name, workers,
+                         episode_counter, episodes, alpha, gamma,
+                         epsilon_start, epsilon_end, epsilon_decay))
+        for i in range(workers)
+    ]
+
+    checkpoints = CheckpointWriter()
+
+    try:
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+
+        # İşçi istatistiklerini topla ve her save_interval'da raporla
+        last_totals = np.zeros(5)
+        last_time = start
+        next_report = save_interval
+        while any(process.is_alive() for process in processes):
+            time.sleep(0.2)
+            totals = worker_stats.sum(axis=0)
+            finished = int(totals[_WORKER_EPISODES])
+            if finished == last_totals[_WORKER_EPISODES]:
+                continue
+            if finished < next_report and finished < episodes:
+                continue
+
+            now = time.perf_counter()
+            window = totals - last_totals
+            n_window = max(window[_WORKER_EPISODES], 1)
+            epsilon = max(epsilon_end, epsilon_start * epsilon_decay ** finished)
+
+            print(f"Episode {finished}/{episodes}")
+            print(f"  Ortalama Ödül: {window[_WORKER_REWARD] / n_window:.2f}")
+            print(f"  Ortalama Adım: {window[_WORKER_STEPS] / n_window:.1f}")
+            print(f"  Başarı Oranı: {window[_WORKER_SUCCESS] / n_window * 100:.1f}%")
+            print(f"  Epsilon: {epsilon:.4f}")
+            print(f"  Güncelleme/sn: {window[_WORKER_UPDATES] / (now - last_time):,.0f}")
+            print("-" * 60)
+
+            # Ara kayıt
+            checkpoints.save(Q, finished)
+
+            last_totals = totals
+            last_time = now
+            while next_report <= finished:
+                next_report += save_interval
+
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        totals = worker_stats.sum(axis=0)
+        Q_final = Q.copy()
+    finally:
+        checkpoints.close()
+        del Q, worker_stats
+        q_shm.close()
+        q_shm.unlink()
+        stats_shm.close()
+        stats_shm.unlink()
+
+    n_done = max(totals[_WORKER_EPISODES], 1)
+    print("\n" + "=" * 60)
+    print("EĞİTİM TAMAMLANDI!")
+    print("=" * 60)
+    print(f"Toplam süre: {elapsed:.1f} sn")
+    print(f"Toplam güncelleme: {totals[_WORKER_UPDATES]:,.0f}")
+    print(f"Güncelleme/sn: {totals[_WORKER_UPDATES] / elapsed:,.0f}")
+    print(f"Başarı Oranı (tüm episode'lar): {totals[_WORKER_SUCCESS] / n_done * 100:.1f}%")
+    print("=" * 60)
+
+    save_q_table(Q_final)
+
     stats = {
-        'rewards': rewards_history,
-        'steps': steps_history,
-        'success': success_history,
+        'episodes': int(totals[_WORKER_EPISODES]),
+        'updates': int(totals[_WORKER_UPDATES]),
+        'elapsed': elapsed,
+        'updates_per_sec': totals[_WORKER_UPDATES] / elapsed,
         'hyperparameters': {
             'episodes': episodes,
+            'workers': workers,
             'alpha': alpha,
             'gamma': gamma,
             'epsilon_start': epsilon_start,
             'epsilon_end': epsilon_end,
-            'epsilon_decay': epsilon_decay
+            'epsilon_decay': epsilon_decay,
+            'seed': seed
         }
     }
-    np.save(f"training_stats_{timestamp}.npy", stats)
-    print(f"✓ Eğitim istatistikleri kaydedildi: training_stats_{timestamp}.npy")
-    
+    return Q_final, stats
+
+
+# Aktör istatistik sütunları (her aktör kendi satırına yazar)
+_ACTOR_EPISODES, _ACTOR_REWARD, _ACTOR_STEPS, _ACTOR_SUCCESS, _ACTOR_STALLS = range(5)
+
+
+def _actor_worker(actor_id, seed_seq, ring_name, ring_capacity, ring_lock, policy_name,
+                  policy_lock, n_states, stats_name, n_actors, episode_counter, episodes,
+                  epsilon_start, epsilon_end, epsilon_decay, refresh_interval):
+    """
+    Aktör: paylaşılan açgözlü politikanın yerel kopyasıyla epsilon-greedy
+    oynar ve geçişleri kendi halkasına yazar. Q'ya dokunmaz; her
+    refresh_interval adımda (ve episode başında) yeni sürüm yayımlandıysa
+    politika yenilenir. Epsilon, Hogwild'daki gibi ortak sayaçtan alınan
+    global episode numarasından hesaplanır.
+    """
+    ring = TransitionRing(ring_capacity, name=ring_name, lock=ring_lock)
+    policy = SharedPolicy(n_states, name=policy_name, lock=policy_lock)
+    stats_shm = shared_memory.SharedMemory(name=stats_name)
+    actor_stats = np.ndarray((n_actors, 5), dtype=np.float64, buffer=stats_shm.buf)[actor_id]
+
+    # Bağımsız RNG akışları: keşif ve ortam doğumları
+    env_seed, explore_seed = seed_seq.spawn(2)
+    rng = np.random.default_rng(explore_seed)
+    env = CustomTaxiEnv()
+    env.reset(seed=int(env_seed.generate_state(1)[0]))
+    n_actions = env.action_space.n
+    greedy = np.zeros(n_states, dtype=np.uint8)
+    version = 0
+
+    try:
+        while True:
+            with episode_counter.get_lock():
+                if episode_counter.value >= episodes:
+                    break
+                episode_counter.value += 1
+                episode = episode_counter.value
+
+            epsilon = max(epsilon_end, epsilon_start * epsilon_decay ** (episode - 1))
+
+            state, _ = env.reset()
+            total_reward = 0
+            steps = 0
+            stalls = 0
+            done = False
+
+            while not done:
+                if steps % refresh_interval == 0 and policy.version != version:
+                    version = policy.read(greedy)
+
+                # Epsilon-greedy action selection
+                if rng.random() < epsilon:
+                    action = rng.integers(n_actions)  # Explore
+                else:
+                    action = greedy[state]  # Exploit
+
+                next_state, reward, done, _, info = env.step(action)
+
+                stalls += ring.push_wait(state, action, reward, next_state,
+                                         is_terminal(done, action, reward), version)
+
+                state = next_state
+                total_reward += reward
+                steps += 1
+
+                # Sonsuz döngü kontrolü
+                if steps > 500:
+                    done = True
+
+            actor_stats[_ACTOR_EPISODES] += 1
+            actor_stats[_ACTOR_REWARD] += total_reward
+            actor_stats[_ACTOR_STEPS] += steps
+            actor_stats[_ACTOR_SUCCESS] += 1 if total_reward > 0 else 0
+            actor_stats[_ACTOR_STALLS] += stalls
+    finally:
+        env.close()
+        del actor_stats
+        ring.close()
+        policy.close()
+        stats_shm.close()
+
+
+def train_qtable_actor_learner(episodes=50000, actors=None, alpha=0.1, gamma=0.95,
+                               epsilon_start=1.0, epsilon_end=0.01, epsilon_decay=0.995,
+                               save_interval=5000, ring_capacity=8192, batch_size=1024,
+                               publish_interval=4096, refresh_interval=32,
+                               replay="uniform", replay_ratio=8, replay_capacity=100000,
+                               replay_batch_size=256, duplicates="sequential", seed=None):
+    """
+    Aktör–öğrenici Q-Learning
+
+    Deneyim üretimi öğrenmeden ayrılır: her aktör süreci kendi
+    CustomTaxiEnv'ini açgözlü politikanın salt okunur kopyasıyla oynatır ve
+    geçişleri paylaşılan bellekteki kendi SPSC halkasına yazar
+    (transition_ring.TransitionRing; x86'da kilitsiz, diğer platformlarda
+    sayaçlar kilitle sıralanır). Bu süreç öğrenicidir:
+    halkaları batch_size'lık dilimlerle boşaltır, q_learning_batch_update
+    ile Q'yu günceller ve her publish_interval geçişte yeni politikayı
+    (argmax Q) yayımlar. Raporlar aktör ve öğrenici verimini, halka
+    doluluğunu ve politika gecikmesini (geçişi üreten politikanın
+    yayımlanan son sürümün kaç sürüm gerisinde olduğu) içerir; aktör
+    sayısı ile öğrenici hızını ayrı ayrı boyutlandırmak için.
+
+    Öğrenici gelen geçişleri ayrıca bir replay tamponuna ekler ve her
+    geçiş başına replay_ratio geçiş tekrar eder. Bu ortamda keşif, çevrimiçi
+    güncellemelerin aynı episode içinde döngüleri cezalandırmasına dayanır;
+    gecikmeli politika ve gruplanmış güncellemeler bunu kaybettirir ve
+    replay olmadan açgözlü başarı çok yavaş artar.
+
+    Halka dolarsa aktör bekler (sayılır: 'dolu halka beklemesi'); aktörler
+    öğreniciden hızlıysa gecikme ve bekleme artar. Halka kapasitesi
+    gecikmenin üst sınırını belirler (aktör sayısı * ring_capacity /
+    publish_interval sürüm). Sonuç aktörlerin
+    zamanlamasına bağlıdır, tohum yalnızca RNG akışlarını sabitler.
+
+    Args:
+        actors: Aktör süreç sayısı (None = CPU sayısı - 1, öğreniciye bir çekirdek)
+        ring_capacity: Aktör başına halka kapasitesi (geçiş)
+        batch_size: Öğrenicinin halka başına tek seferde okuduğu en fazla geçiş
+        publish_interval: Kaç alınan geçişte bir politika yayımlanacağı
+        refresh_interval: Aktörün kaç adımda bir yeni sürümü kontrol edeceği
+        replay: None, "uniform" ya da "prioritized" öğrenici tarafı replay
+        replay_ratio: Alınan geçiş başına tekrar edilen geçiş sayısı
+        replay_capacity, replay_batch_size: train_qtable() ile aynı
+        duplicates: Gruptaki tekrar eden (state, action) semantiği
+                    (bkz. q_learning_batch_update)
+        seed: RNG akışları için ana tohum (None = rastgele)
+        Diğerleri: train_qtable() ile aynı
+    """
+    actors = actors or max(1, (os.cpu_count() or 2) - 1)
+    env = CustomTaxiEnv()
+    n_states, n_actions = env.observation_space.n, env.action_space.n
+    env.close()
+
+    if replay not in (None, "uniform", "prioritized"):
+        raise ValueError(f"Geçersiz replay modu: {replay}")
+
+    # Aktör başına bağımsız RNG akışı; sonuncusu replay örneklemesi için
+    seed_seqs = np.random.SeedSequence(seed).spawn(actors + 1)
+
+    Q = np.zeros((n_states, n_actions))
+    replay_buffer = None
+    if replay:
+        replay_buffer = ReplayBuffer(replay_capacity, prioritized=(replay == "prioritized"),
+                                     seed=seed_seqs[-1])
+    # x86 dışında sayaç yayımı kilitle sıralanır (bkz. transition_ring.ordering_lock)
+    ring_locks = [ordering_lock() for _ in range(actors)]
+    policy_lock = ordering_lock()
+    rings = [TransitionRing(ring_capacity, lock=lock) for lock in ring_locks]
+    policy = SharedPolicy(n_states, lock=policy_lock)
+    stats_shm = shared_memory.SharedMemory(create=True, size=actors * 5 * 8)
+    actor_stats = np.ndarray((actors, 5), dtype=np.float64, buffer=stats_shm.buf)
+    actor_stats[:] = 0
+    version = policy.publish(np.argmax(Q, axis=1))
+
+    episode_counter = mp.Value('q', 0)
+
+    print("=" * 60)
+    print("TAKSI AKTÖR–ÖĞRENİCİ Q-LEARNING EĞİTİMİ BAŞLIYOR")
+    print("=" * 60)
+    print(f"Episodes: {episodes}")
+    print(f"Aktör sayısı: {actors}")
+    print(f"Halka: aktör başına {ring_capacity} geçiş ({rings[0].nbytes / 1e6:.1f} MB)")
+    print(f"Öğrenici: grup {batch_size}, her {publish_interval} geçişte politika yayımı")
+    if replay_buffer is not None:
+        print(f"Replay: {replay}, kapasite {replay_capacity}, geçiş başına {replay_ratio} tekrar")
+    print(f"Alpha (öğrenme oranı): {alpha}")
+    print(f"Gamma (indirim faktörü): {gamma}")
+    print(f"Epsilon: {epsilon_start} → {epsilon_end} (decay: {epsilon_decay})")
+    print("=" * 60)
+
+    processes = [
+        mp.Process(target=_actor_worker,
+                   args=(i, seed_seqs[i], rings[i].name, ring_capacity, ring_locks[i],
+                         policy.name, policy_lock, n_states, stats_shm.name, actors,
+                         episode_counter, episodes, epsilon_start, epsilon_end, epsilon_decay,
+                         refresh_interval))
+        for i in range(actors)
+    ]
+
+    checkpoints = CheckpointWriter()
+
+    try:
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+
+        updates = 0
+        replayed = 0
+        replay_credit = 0
+        since_publish = 0
+        staleness_sum = 0
+        staleness_max = 0
+        occupancy_sum = 0.0
+        occupancy_samples = 0
+        # Pencere başı değerleri (rapor farkları için)
+        last_totals = np.zeros(5)
+        last_updates = 0
+        last_replayed = 0
+        last_staleness = 0
+        last_time = start
+        window_staleness_max = 0
+        window_occupancy = [0.0, 0]
+        next_report = save_interval
+
+        while True:
+            # Aktörler bittikten sonra halkalar tamamen boşalana kadar devam
+            alive = any(process.is_alive() for process in processes)
+            backlog = sum(len(ring) for ring in rings)
+            drained = 0
+            for ring in rings:
+                count, states, actions, rewards, next_states, dones, versions = ring.read(batch_size)
+                if count == 0:
+                    continue
+                q_learning_batch_update(Q, states, actions, rewards, next_states,
+                                        alpha, gamma, duplicates, dones=dones)
+                lag = version - versions
+                staleness_sum += int(lag.sum())
+                window_staleness_max = max(window_staleness_max, int(lag.max()))
+                if replay_buffer is not None:
+                    replay_buffer.extend(states, actions, rewards, next_states, dones)
+                ring.release(count)
+                drained += count
+
+            if drained and replay_buffer is not None:
+                replay_credit += drained * replay_ratio
+                while replay_credit >= replay_batch_size and len(replay_buffer) >= replay_batch_size:
+                    replay_update(Q, replay_buffer, replay_batch_size, alpha, gamma, duplicates)
+                    replay_credit -= replay_batch_size
+                    replayed += replay_batch_size
+
+            if drained:
+                updates += drained
+                since_publish += drained
+                if since_publish >= publish_interval:
+                    version = policy.publish(np.argmax(Q, axis=1))
+                    since_publish = 0
+                window_occupancy[0] += backlog / (ring_capacity * actors)
+                window_occupancy[1] += 1
+            elif not alive:
+                break
+            else:
+                time.sleep(0.0005)
+
+            totals = actor_stats.sum(axis=0)
+            finished = int(totals[_ACTOR_EPISODES])
+            if finished < next_report:
+                continue
+
+            now = time.perf_counter()
+            window = totals - last_totals
+            n_window = max(window[_ACTOR_EPISODES], 1)
+            window_updates = updates - last_updates
+            epsilon = max(epsilon_end, epsilon_start * epsilon_decay ** finished)
+            mean_lag = (staleness_sum - last_staleness) / max(window_updates, 1)
+            mean_fill = window_occupancy[0] / max(window_occupancy[1], 1)
+            elapsed_window = now - last_time
+
+            print(f"Episode {finished}/{episodes}")
+            print(f"  Ortalama Ödül: {window[_ACTOR_REWARD] / n_window:.2f}")
+            print(f"  Ortalama Adım: {window[_ACTOR_STEPS] / n_window:.1f}")
+            print(f"  Başarı Oranı: {window[_ACTOR_SUCCESS] / n_window * 100:.1f}%")
+            print(f"  Epsilon: {epsilon:.4f}")
+            print(f"  Aktör adım/sn: {window[_ACTOR_STEPS] / elapsed_window:,.0f} "
+                  f"(dolu halka beklemesi: {window[_ACTOR_STALLS]:,.0f})")
+            print(f"  Öğrenici geçiş/sn: {window_updates / elapsed_window:,.0f} "
+                  f"(+ replay {(replayed - last_replayed) / elapsed_window:,.0f}/sn)")
+            print(f"  Halka doluluğu: ort. {mean_fill * 100:.1f}%")
+            print(f"  Politika gecikmesi: ort. {mean_lag:.2f} sürüm, en fazla "
+                  f"{window_staleness_max} (sürüm {version})")
+            print("-" * 60)
+
+            # Ara kayıt
+            checkpoints.save(Q, finished)
+
+            occupancy_sum += window_occupancy[0]
+            occupancy_samples += window_occupancy[1]
+            staleness_max = max(staleness_max, window_staleness_max)
+            last_totals = totals
+            last_updates = updates
+            last_replayed = replayed
+            last_staleness = staleness_sum
+            last_time = now
+            window_staleness_max = 0
+            window_occupancy = [0.0, 0]
+            while next_report <= finished:
+                next_report += save_interval
+
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        totals = actor_stats.sum(axis=0)
+        occupancy_sum += window_occupancy[0]
+        occupancy_samples += window_occupancy[1]
+        staleness_max = max(staleness_max, window_staleness_max)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        checkpoints.close()
+        del actor_stats
+        stats_shm.close()
+        stats_shm.unlink()
+        for shared in rings + [policy]:
+            shared.close()
+            shared.unlink()
+
+    n_done = max(totals[_ACTOR_EPISODES], 1)
+    print("\n" + "=" * 60)
+    print("EĞİTİM TAMAMLANDI!")
+    print("=" * 60)
+    print(f"Toplam süre: {elapsed:.1f} sn")
+    print(f"Aktör adım/sn: {totals[_ACTOR_STEPS] / elapsed:,.0f}")
+    print(f"Öğrenici geçiş/sn: {updates / elapsed:,.0f} (toplam {updates:,}; "
+          f"replay {replayed:,})")
+    print(f"Halka doluluğu: ort. {occupancy_sum / max(occupancy_samples, 1) * 100:.1f}%")
+    print(f"Politika gecikmesi: ort. {staleness_sum / max(updates, 1):.2f} sürüm, "
+          f"en fazla {staleness_max}")
+    print(f"Başarı Oranı (tüm episode'lar): {totals[_ACTOR_SUCCESS] / n_done * 100:.1f}%")
+    print("=" * 60)
+
+    save_q_table(Q)
+
+    stats = {
+        'episodes': int(totals[_ACTOR_EPISODES]),
+        'env_steps': int(totals[_ACTOR_STEPS]),
+        'updates': updates,
+        'elapsed': elapsed,
+        'actor_steps_per_sec': totals[_ACTOR_STEPS] / elapsed,
+        'updates_per_sec': updates / elapsed,
+        'replayed': replayed,
+        'ring_stalls': int(totals[_ACTOR_STALLS]),
+        'mean_occupancy': occupancy_sum / max(occupancy_samples, 1),
+        'staleness': {
+            'mean': staleness_sum / max(updates, 1),
+            'max': staleness_max,
+            'policy_versions': version,
+        },
+        'hyperparameters': {
+            'episodes': episodes,
+            'actors': actors,
+            'alpha': alpha,
+            'gamma': gamma,
+            'epsilon_start': epsilon_start,
+            'epsilon_end': epsilon_end,
+            'epsilon_decay': epsilon_decay,
+            'ring_capacity': ring_capacity,
+            'batch_size': batch_size,
+            'publish_interval': publish_interval,
+            'refresh_interval': refresh_interval,
+            'replay': replay,
+            'replay_ratio': replay_ratio,
+            'replay_capacity': replay_capacity,
+            'replay_batch_size': replay_batch_size,
+            'duplicates': duplicates,
+            'seed': seed
+        }
+    }
+    return Q, stats
+
+
+def is_terminal(done, action, reward):
+    """
+    Geçiş terminal mi (hedefe bootstrap edilmez)
+
+    Yalnızca başarılı teslimat terminaldir (CustomTaxiEnv.terminal_table
+    ile aynı tanım); timeout'ta episode biter ama state terminal değildir,
+    bootstrap edilir. Skaler ya da dizi argümanlarla çalışır.
+    """
+    return done & (action == 5) & (reward > 0)
+
+
+def q_learning_step(Q, state, action, reward, next_state, done, alpha, gamma):
+    """Tek geçişin Bellman güncellemesi (yerinde; terminal tanımı is_terminal)"""
+    old_value = Q[state, action]
+    next_max = 0.0 if is_terminal(done, action, reward) else np.max(Q[next_state])
+    Q[state, action] = old_value + alpha * (reward + gamma * next_max - old_value)
+
+
+def q_learning_batch_update(Q, states, actions, rewards, next_states, alpha, gamma,
+                            duplicates="sequential", dones=None, importance_weights=None):
+    """
+    Bir geçiş grubunu tek seferde Q-table'a uygula (dizi işlemleriyle)
+
+    Hedefler (reward + gamma * max Q[next_state]) grup başındaki Q'dan
+    hesaplanır. Aynı (state, action) grupta birden fazla kez geçerse:
+        duplicates="sequential": güncellemeler grup sırasıyla art arda
+            uygulanmış gibi birleştirilir:
+            Q <- (1-alpha)^k * Q + sum_i alpha * (1-alpha)^(k-1-i) * hedef_i
+        duplicates="average": hedeflerin ortalamasıyla tek bir güncelleme
+            Q <- Q + alpha * (ortalama_hedef - Q)
+
+    Args:
+        Q: (n_states, n_actions) boyutlu, C-ardışık Q-table (yerinde güncellenir)
+        states, actions, rewards, next_states: Aynı uzunlukta diziler
+        alpha: Öğrenme oranı
+        gamma: İndirim faktörü
+        duplicates: "sequential" veya "average"
+        dones: Terminal geçiş maskesi (None = hepsi sonraki state'ten bootstrap)
+        importance_weights: Geçiş başına öğrenme oranı çarpanı (öncelikli
+                            replay önem ağırlıkları; None = hepsi 1)
+
+    Returns:
+        Güncelleme öncesi TD hataları (hedef - Q), öncelik güncellemesi için
+    """
+    n_actions = Q.shape[1]
+    next_values = Q[next_states].max(axis=1)
+    if dones is not None:
+        next_values = np.where(dones, 0.0, next_values)
+    targets = rewards + gamma * next_values
+    keys = np.asarray(states, dtype=np.int64) * n_actions + actions
+    flat_Q = Q.reshape(-1)
+    errors = targets - flat_Q[keys]
+
+    if importance_weights is not None:
+        return _weighted_batch_update(flat_Q, keys, targets, errors,
+                                      alpha * importance_weights, duplicates)
+
+    if duplicates == "average":
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        mean_targets = np.bincount(inverse, weights=targets) / counts
+        flat_Q[unique] += alpha * (mean_targets - flat_Q[unique])
+
+    elif duplicates == "sequential":
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+
+        # Her geçişin kendi grubundaki sırası ve sonraki güncellemelerin sönümü
+        group = np.repeat(np.arange(len(starts)), counts)
+        rank = np.arange(len(keys)) - starts[group]
+        weights = alpha * (1 - alpha) ** (counts[group] - 1 - rank)
+        contributions = np.bincount(group, weights=weights * targets[order],
+                                    minlength=len(starts))
+
+        unique = sorted_keys[starts]
+        flat_Q[unique] = (1 - alpha) ** counts * flat_Q[unique] + contributions
+
+    else:
+        raise ValueError(f"Geçersiz duplicates modu: {duplicates}")
+
+    return errors
+
+
+def replay_update(Q, replay_buffer, batch_size, alpha, gamma, duplicates="sequential"):
+    """Tampondan bir geçiş grubu örnekle, uygula ve öncelikleri güncelle"""
+    indices, states, actions, rewards, next_states, dones, weights = replay_buffer.sample(batch_size)
+    errors = q_learning_batch_update(Q, states, actions, rewards, next_states, alpha, gamma,
+                                     duplicates, dones, weights)
+    replay_buffer.update_priorities(indices, errors)
+
+
+def _weighted_batch_update(flat_Q, keys, targets, errors, step_sizes, duplicates):
+    """q_learning_batch_update'in geçiş başına öğrenme oranlı hali"""
+    if duplicates == "average":
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        flat_Q[unique] += np.bincount(inverse, weights=step_sizes * errors) / counts
+
+    elif duplicates == "sequential":
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+        group = np.repeat(np.arange(len(starts)), counts)
+
+        # Sönüm çarpımları log uzayında grup içi son ek toplamlarıyla;
+        # adım 1'e kırpılmaz ki log1p(-1) sonsuza gitmesin
+        steps = np.minimum(step_sizes[order], 1 - 1e-12)
+        log_keep = np.log1p(-steps)
+        cumulative = np.cumsum(log_keep)
+        group_end = cumulative[starts + counts - 1]
+        group_start = cumulative[starts] - log_keep[starts]
+        weights = steps * np.exp(group_end[group] - cumulative)
+        contributions = np.bincount(group, weights=weights * targets[order],
+                                    minlength=len(starts))
+
+        unique = sorted_keys[starts]
+        flat_Q[unique] = np.exp(group_end - group_start) * flat_Q[unique] + contributions
+
+    else:
+        raise ValueError(f"Geçersiz duplicates modu: {duplicates}")
+
+    return errors
+
+
+def train_qtable_vectorized(episodes=50000, num_envs=256, alpha=0.1, gamma=0.95,
+                            epsilon_start=1.0, epsilon_end=0.01, epsilon_decay=0.995,
+                            save_interval=5000, duplicates="sequential",
+                            random_block=1024, seed=None):
+    """
+    VectorCustomTaxiEnv ile toplu Q-Learning eğitimi
+
+    Her adımda num_envs ortam birlikte ilerler; epsilon-greedy seçim ve
+    Bellman güncellemesi tüm grup için dizi işlemleriyle yapılır. Keşif
+    için rastgele sayılar random_block adımlık bloklar halinde üretilir.
+    Epsilon, tamamlanan episode sayısına göre train_qtable() ile aynı
+    takvimde azalır.
+
+    Args:
+        num_envs: Paralel ortam sayısı
+        duplicates: Gruptaki tekrar eden (state, action) semantiği
+                    (bkz. q_learning_batch_update)
+        random_block: Önceden üretilen rastgele sayı bloğu (adım sayısı)
+        seed: Ortam ve keşif RNG tohumu
+        Diğerleri: train_qtable() ile aynı
+    """
+    env_seed, explore_seed = np.random.SeedSequence(seed).spawn(2)
+    env = VectorCustomTaxiEnv(num_envs, seed=env_seed)
+    rng = np.random.default_rng(explore_seed)
+    n_actions = env.action_space.n
+
+    Q = np.zeros((env.observation_space.n, n_actions))
+
+    hyperparameters = {
+        'episodes': episodes,
+        'num_envs': num_envs,
+        'alpha': alpha,
+        'gamma': gamma,
+        'epsilon_start': epsilon_start,
+        'epsilon_end': epsilon_end,
+        'epsilon_decay': epsilon_decay,
+        'duplicates': duplicates,
+        'seed': seed
+    }
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stats_path = f"training_stats_{timestamp}"
+    stats_writer = StatsWriter(stats_path, metadata={'hyperparameters': hyperparameters})
+    final_window = min(1000, episodes)
+    window_stats = [RollingMean(save_interval) for _ in range(3)]
+    final_stats = [RollingMean(final_window) for _ in range(3)]
+    finished = 0
+    episode_rewards = np.zeros(num_envs)
+    epsilon = epsilon_start
+
+    print("=" * 60)
+    print("TAKSI VEKTÖREL Q-LEARNING EĞİTİMİ BAŞLIYOR")
+    print("=" * 60)
+    print(f"Episodes: {episodes}")
+    print(f"Paralel ortam: {num_envs}")
+    print(f"Alpha (öğrenme oranı): {alpha}")
+    print(f"Gamma (indirim faktörü): {gamma}")
+    print(f"Epsilon: {epsilon_start} → {epsilon_end} (decay: {epsilon_decay})")
+    print("=" * 60)
+
+    checkpoints = CheckpointWriter()
+    states, _ = env.reset()
+    block_index = random_block
+    next_report = save_interval
+    start = time.perf_counter()
+
+    while finished < episodes:
+        # Önceden üretilmiş rastgele sayı blokları
+        if block_index == random_block:
+            explore_draws = rng.random((random_block, num_envs))
+            random_actions = rng.integers(n_actions, size=(random_block, num_envs))
+            block_index = 0
+
+        # Epsilon-greedy action selection
+        actions = np.argmax(Q[states], axis=1)
+        explore = explore_draws[block_index] < epsilon
+        actions[explore] = random_actions[block_index, explore]
+        block_index += 1
+
+        next_states, rewards, dones, _, info = env.step(actions)
+        q_learning_batch_update(Q, states, actions, rewards, info['final_state'], alpha, gamma,
+                                duplicates, dones=is_terminal(dones, actions, rewards))
+        episode_rewards += rewards
+
+        # Biten episode'ların istatistikleri
+        if dones.any():
+            # Hedef episode sayısını aşan fazlalık kaydedilmez
+            finished_rewards = episode_rewards[dones][:episodes - finished]
+            finished_steps = info['step_count'][dones][:episodes - finished]
+            finished_success = finished_rewards > 0
+            stats_writer.extend(rewards=finished_rewards, steps=finished_steps,
+                                success=finished_success)
+            for rolling in (window_stats, final_stats):
+                rolling[0].extend(finished_rewards)
+                rolling[1].extend(finished_steps)
+                rolling[2].extend(finished_success)
+            finished += len(finished_rewards)
+            episode_rewards[dones] = 0
+
+            # Epsilon'u azalt (tamamlanan episode sayısına göre)
+            epsilon = max(epsilon_end, epsilon_start * epsilon_decay ** finished)
+
+        states = next_states
+
+        # İlerleme raporu (bir adımda birden çok rapor aralığı geçilebilir)
+        if finished >= next_report:
+            avg_reward, avg_steps, success_rate = (rolling.mean for rolling in window_stats)
+            print(f"Episode {finished}/{episodes}")
+            print(f"  Ortalama Ödül: {avg_reward:.2f}")
+            print(f"  Ortalama Adım: {avg_steps:.1f}")
+            print(f"  Başarı Oranı: {success_rate * 100:.1f}%")
+            print(f"  Epsilon: {epsilon:.4f}")
+            print("-" * 60)
+
+            # Ara kayıt: tablonun gerçekte ulaştığı episode sayısıyla
+            checkpoints.save(Q, finished)
+            while next_report <= finished:
+                next_report += save_interval
+
+    checkpoints.close()
+    stats_writer.close()
+    elapsed = time.perf_counter() - start
+
+    final_avg_reward, final_avg_steps, final_success_rate = (rolling.mean for rolling in final_stats)
+    final_success_rate *= 100
+    print("\n" + "=" * 60)
+    print("EĞİTİM TAMAMLANDI!")
+    print("=" * 60)
+    print(f"Toplam süre: {elapsed:.1f} sn ({episodes / elapsed:,.0f} episode/sn)")
+    print(f"Son {final_window} Episode Ortalamaları:")
+    print(f"  Ödül: {final_avg_reward:.2f}")
+    print(f"  Adım: {final_avg_steps:.1f}")
+    print(f"  Başarı Oranı: {final_success_rate:.1f}%")
+    print("=" * 60)
+
+    save_q_table(Q, timestamp)
+    print(f"✓ Eğitim istatistikleri kaydedildi: {stats_path}/")
+
+    stats = {
+        'path': stats_path,
+        'episodes': stats_writer.rows,
+        'final': {
+            'reward': final_avg_reward,
+            'steps': final_avg_steps,
+            'success_rate': final_success_rate
+        },
+        'elapsed': elapsed,
+        'hyperparameters': hyperparameters
+    }
+
     env.close()
     return Q, stats
 
 
+def train_qtable_planning(episodes=20000, alpha=0.1, gamma=0.95, epsilon_start=1.0,
+                          epsilon_end=0.01, epsilon_decay=0.995, planning="dyna",
+                          planning_steps=10, planning_alpha=1.0, theta=1e-3, eval_interval=100,
+                          target_success=95.0, stop_at_target=True, seed=None, save=True):
+    """
+    Model tabanlı hızlandırmalı Q-Learning (Dyna-Q / öncelikli tarama)
+
+    Gözlenen geçişler (state, action) -> (sonraki state, ödül, terminal)
+    modeline kaydedilir (ortam deterministik; timeout cezası modelden
+    çıkarılır; terminal tanımı is_terminal ile aynı).
+    Her gerçek adımdan sonra:
+        planning="dyna": modelden düzgün örneklenen planning_steps geçiş
+            q_learning_batch_update ile tek seferde uygulanır
+        planning="prioritized": Bellman hatası theta'yı aşan (state, action)
+            çiftleri öncelik kuyruğuna (heapq) girer; en büyük hatalı
+            planning_steps çift güncellenir ve öncülleri kuyruğa eklenir
+        planning="none": train_qtable() ile aynı düz Q-Learning (karşılaştırma için)
+
+    Açgözlü politika her eval_interval episode'da tüm başlangıç
+    state'lerinde değerlendirilir (evaluate.evaluate_policy); başarı
+    target_success'e ulaştığında episode, ortam adımı ve süre kaydedilir
+    (değerlendirme süresi eğitim süresine dahil edilmez).
+
+    Args:
+        planning: "dyna", "prioritized" veya "none"
+        planning_steps: Gerçek adım başına planlama güncellemesi
+        planning_alpha: Planlama güncellemelerinin öğrenme oranı (None = alpha).
+                        Model deterministik olduğundan varsayılan 1.0 tam
+                        Bellman yedeğidir (komut satırı varsayılanıyla aynı).
+        theta: Öncelikli taramada kuyruğa girme eşiği
+        eval_interval: Açgözlü değerlendirme aralığı (episode)
+        target_success: Hedef başarı oranı (%)
+        stop_at_target: Hedefe ulaşınca eğitimi bitir
+        save: Sonda Q-table'ı kaydet
+        Diğerleri: train_qtable() ile aynı
+
+    Returns:
+        Q, stats (target_episode / target_env_steps / target_time: hedefe
+        ulaşılamadıysa None)
+    """
+    from evaluate import evaluate_policy
+
+    if planning not in ("dyna", "prioritized", "none"):
+        raise ValueError(f"Geçersiz planlama modu: {planning}")
+    if planning_alpha is None:
+        planning_alpha = alpha
+
+    env = CustomTaxiEnv()
+    env_seed, explore_seed = np.random.SeedSequence(seed).spawn(2)
+    env.reset(seed=int(env_seed.generate_state(1)[0]))
+    rng = np.random.default_rng(explore_seed)
+    n_states, n_actions = env.observation_space.n, env.action_space.n
+
+    Q = np.zeros((n_states, n_actions))
+    flat_Q = Q.reshape(-1)
+
+    # Deterministik model: anahtar = state * n_actions + action
+    model_next = np.full(n_states * n_actions, -1, dtype=np.int64)
+    model_reward = np.zeros(n_states * n_actions)
+    model_terminal = np.zeros(n_states * n_actions, dtype=bool)
+    observed = np.empty(n_states * n_actions, dtype=np.int64)
+    n_observed = 0
+    predecessors = {}  # state -> o state'e götüren anahtarlar
+    queue = []         # (-öncelik, anahtar)
+    queued = np.zeros(n_states * n_actions)  # kuyruktaki güncel öncelik (0 = yok)
+
+    hyperparameters = {
+        'episodes': episodes,
+        'alpha': alpha,
+        'gamma': gamma,
+        'epsilon_start': epsilon_start,
+        'epsilon_end': epsilon_end,
+        'epsilon_decay': epsilon_decay,
+        'planning': planning,
+        'planning_steps': planning_steps,
+        'planning_alpha': planning_alpha,
+        'theta': theta,
+        'seed': seed
+    }
+
+    print("=" * 60)
+    print(f"TAKSI PLANLAMALI Q-LEARNING EĞİTİMİ ({planning})")
+    print("=" * 60)
+    print(f"Episodes: {episodes}")
+    print(f"Planlama adımı (gerçek adım başına): {planning_steps if planning != 'none' else 0}")
+    print(f"Hedef: açgözlü başarı ≥ {target_success}% (her {eval_interval} episode'da)")
+    print("=" * 60)
+
+    epsilon = epsilon_start
+    env_steps = 0
+    planning_updates = 0
+    eval_time = 0.0
+    evaluations = []
+    target_episode = target_env_steps = target_time = None
+    start = time.perf_counter()
+
+    for episode in range(1, episodes + 1):
+        state, _ = env.reset()
+        done = False
+
+        while not done:
+            # Epsilon-greedy action selection
+            if rng.random() < epsilon:
+                action = int(rng.integers(n_actions))
+            else:
+                action = int(np.argmax(Q[state]))
+
+            next_state, reward, done, _, info = env.step(action)
+            env_steps += 1
+
+            # Modeli güncelle (timeout cezası geçişin kendisine ait değil)
+            key = state * n_actions + action
+            if model_next[key] < 0:
+                observed[n_observed] = key
+                n_observed += 1
+                if planning == "prioritized":
+                    predecessors.setdefault(next_state, []).append(key)
+            model_next[key] = next_state
+            model_reward[key] = reward + 10 if info['step_count'] > 200 else reward
+            model_terminal[key] = terminal = is_terminal(done, action, reward)
+
+            if planning == "prioritized":
+                # Doğrudan güncelleme yerine Bellman hatasıyla kuyruğa al
+                # (taramaların yedeklediği model ödülüyle, timeout cezası hariç)
+                next_max = 0.0 if terminal else float(np.max(Q[next_state]))
+                error = abs(model_reward[key] + gamma * next_max - flat_Q[key])
+                if error > theta and error > queued[key]:
+                    queued[key] = error
+                    heapq.heappush(queue, (-error, key))
+
+                updates = 0
+                while updates < planning_steps and queue:
+                    priority, plan_key = heapq.heappop(queue)
+                    # Daha yüksek öncelikle yeniden eklenmiş çiftin eski kaydı
+                    if -priority != queued[plan_key]:
+                        continue
+                    queued[plan_key] = 0
+                    updates += 1
+                    plan_next = model_next[plan_key]
+                    next_max = 0.0 if model_terminal[plan_key] else float(np.max(Q[plan_next]))
+                    flat_Q[plan_key] += planning_alpha * (model_reward[plan_key] + gamma * next_max -
+                                                          flat_Q[plan_key])
+                    planning_updates += 1
+
+                    # Güncellenen state'e götüren çiftlerin önceliklerini yenile
+                    plan_state = plan_key // n_actions
+                    pred_keys = predecessors.get(plan_state)
+                    if pred_keys is None:
+                        continue
+                    pred_keys = np.array(pred_keys)
+                    pred_errors = np.abs(model_reward[pred_keys] +
+                                         gamma * Q[plan_state].max() * ~model_terminal[pred_keys] -
+                                         flat_Q[pred_keys])
+                    push = (pred_errors > theta) & (pred_errors > queued[pred_keys])
+                    for pred_key, pred_error in zip(pred_keys[push].tolist(),
+                                                    pred_errors[push].tolist()):
+                        queued[pred_key] = pred_error
+                        heapq.heappush(queue, (-pred_error, pred_key))
+            else:
+                # Q-değerini güncelle (Q-Learning update rule)
+                old_value = float(Q[state, action])
+                next_max = 0.0 if terminal else float(np.max(Q[next_state]))
+                Q[state, action] = old_value + alpha * (reward + gamma * next_max - old_value)
+
+                if planning == "dyna":
+                    keys = observed[rng.integers(n_observed, size=planning_steps)]
+                    q_learning_batch_update(Q, keys // n_actions, keys % n_actions,
+                                            model_reward[keys], model_next[keys],
+                                            planning_alpha, gamma, dones=model_terminal[keys])
+                    planning_updates += planning_steps
+
+            state = next_state
+
+        # Epsilon'u azalt (exploration'dan exploitation'a geçiş)
+        epsilon = max(epsilon_end, epsilon * epsilon_decay)
+
+        # Açgözlü politikanın tam değerlendirmesi
+        if episode % eval_interval == 0:
+            t_eval = time.perf_counter()
+            results = evaluate_policy(Q, env)
+            eval_time += time.perf_counter() - t_eval
+            train_time = time.perf_counter() - start - eval_time
+            evaluations.append((episode, results['success_rate'], train_time))
+
+            reached = target_episode is None and results['success_rate'] >= target_success
+            if reached:
+                target_episode, target_env_steps, target_time = episode, env_steps, train_time
+            if reached or episode % (eval_interval * 10) == 0:
+                print(f"Episode {episode}/{episodes}  başarı {results['success_rate']:.1f}%  "
+                      f"ortalama adım {results['mean_steps']:.1f}  "
+                      f"ortam adımı {env_steps}  süre {train_time:.1f} sn")
+            if reached and stop_at_target:
+                break
+
+    elapsed = time.perf_counter() - start - eval_time
+    final_success = evaluations[-1][1] if evaluations else evaluate_policy(Q, env)['success_rate']
+
+    print("\n" + "=" * 60)
+    print("EĞİTİM TAMAMLANDI!")
+    print("=" * 60)
+    print(f"Episode: {episode}, ortam adımı: {env_steps}, planlama güncellemesi: {planning_updates}")
+    print(f"Eğitim süresi: {elapsed:.1f} sn (değerlendirme hariç)")
+    print(f"Açgözlü başarı: {final_success:.1f}%")
+    if target_episode is None:
+        print(f"Hedef ({target_success}%) ulaşılamadı")
+    else:
+        print(f"Hedef ({target_success}%): {target_episode}. episode, "
+              f"{target_env_steps} ortam adımı, {target_time:.1f} sn")
+    print("=" * 60)
+
+    if save:
+        save_q_table(Q)
+
+    stats = {
+        'episodes': episode,
+        'env_steps': env_steps,
+        'planning_updates': planning_updates,
+        'elapsed': elapsed,
+        'final_success_rate': final_success,
+        'target_episode': target_episode,
+        'target_env_steps': target_env_steps,
+        'target_time': target_time,
+        'evaluations': evaluations,
+        'hyperparameters': hyperparameters
+    }
+    env.close()
+    return Q, stats
+
+
+def compare_planning(episodes=20000, planning_steps=10, target_success=95.0,
+                     eval_interval=100, seed=0, **kwargs):
+    """
+    Düz Q-Learning, Dyna-Q ve öncelikli taramayı aynı tohumla çalıştırıp
+    hedef başarıya ulaşma maliyetini karşılaştır.
+
+    Returns:
+        {mod: stats}
+    """
+    results = {}
+    for planning in ("none", "dyna", "prioritized"):
+        _, results[planning] = train_qtable_planning(
+            episodes=episodes, planning=planning, planning_steps=planning_steps,
+            target_success=target_success, eval_interval=eval_interval,
+            seed=seed, save=False, **kwargs)
+
+    print("\n" + "=" * 60)
+    print(f"KARŞILAŞTIRMA: açgözlü başarı ≥ {target_success}%")
+    print("=" * 60)
+    print(f"{'Mod':<14}{'Episode':>10}{'Ortam adımı':>14}{'Süre (sn)':>12}")
+    for planning, stats in results.items():
+        if stats['target_episode'] is None:
+            print(f"{planning:<14}{'-':>10}{'-':>14}{'-':>12}  (ulaşılamadı, "
+                  f"son başarı {stats['final_success_rate']:.1f}%)")
+        else:
+            print(f"{planning:<14}{stats['target_episode']:>10}{stats['target_env_steps']:>14}"
+                  f"{stats['target_time']:>12.1f}")
+    print("=" * 60)
+    return results
+
+
+def save_q_table(Q, timestamp=None):
+    """
+    Q-table'ı zaman damgalı dosyaya ve q_table.npy'ye kaydet.
+    Seyrek Q-table'lar .sparse.npz olarak kaydedilir (q_table.sparse.npz);
+    yoğun formata çevirmek için: python q_storage.py q_table.sparse.npz q_table.npy
+
+    Returns:
+        Kayıtta kullanılan zaman damgası
+    """
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    if isinstance(Q, SparseQTable):
+        filename = f"q_table_{timestamp}{SPARSE_SUFFIX}"
+        latest = f"q_table{SPARSE_SUFFIX}"
+        Q.save(filename)
+        Q.save(latest)
+    else:
+        filename = f"q_table_{timestamp}.npy"
+        latest = "q_table.npy"
+        atomic_save(filename, Q)
+        atomic_save(latest, Q)  # Son sürüm için (okuyanlar yarım dosya görmez)
+
+    print(f"\n✓ Q-table kaydedildi: {filename}")
+    print(f"✓ Q-table kaydedildi: {latest} (latest)")
+    return timestamp
+
+
+def _action_major_tables(env, gamma):
+    """
+    Geçiş tablolarını (aksiyon, state) düzeninde hazırla.
+    Aksiyon ekseni boyunca max, bu düzende ardışık bellekte yapılır.
+    """
+    next_state, reward, terminal = env.build_transition_tables()
+    next_state = np.ascontiguousarray(next_state.T, dtype=np.int64)
+    reward = np.ascontiguousarray(reward.T)
+    discount = gamma * ~np.ascontiguousarray(terminal.T)
+    return next_state, reward, discount
+
+
+def value_iteration(gamma=0.98, tol=1e-6, max_iterations=10000, env=None):
+    """
+    Model tabanlı çözüm: geçiş tabloları üzerinde değer iterasyonu
+
+    Args:
+        gamma: İndirim faktörü (discount factor)
+        tol: Yakınsama toleransı (max |V_yeni - V|)
+        max_iterations: Maksimum iterasyon sayısı
+        env: Haritası çözülecek ortam (None = varsayılan CustomTaxiEnv)
+
+    Returns:
+        Q, bilgi sözlüğü (iterations, delta, converged)
+    """
+    env = env or CustomTaxiEnv()
+    next_state, reward, discount = _action_major_tables(env, gamma)
+
+    V = np.zeros(env.observation_space.n)
+    Q = np.empty_like(reward)
+    delta = np.inf
+    iteration = 0
+
+    while iteration < max_iterations and delta > tol:
+        iteration += 1
+        # Q = reward + gamma * V[next_state] (ara dizi oluşturmadan)
+        np.take(V, next_state, out=Q)
+        Q *= discount
+        Q += reward
+        V_new = Q.max(axis=0)
+        delta = np.max(np.abs(V_new - V))
+        V = V_new
+
+    Q = np.ascontiguousarray(Q.T)
+    return Q, {'iterations': iteration, 'delta': delta, 'converged': delta <= tol}
+
+
+def policy_iteration(gamma=0.98, tol=1e-6, max_iterations=1000, env=None):
+    """
+    Model tabanlı çözüm: politika iterasyonu
+    (iteratif politika değerlendirme + açgözlü iyileştirme)
+
+    Args:
+        gamma: İndirim faktörü (discount factor)
+        tol: Politika değerlendirme toleransı
+        max_iterations: Maksimum politika iyileştirme sayısı
+        env: Haritası çözülecek ortam (None = varsayılan CustomTaxiEnv)
+
+    Returns:
+        Q, bilgi sözlüğü (iterations, evaluation_sweeps, delta, converged)
+    """
+    env = env or CustomTaxiEnv()
+    next_state, reward, discount = _action_major_tables(env, gamma)
+    states = np.arange(env.observation_space.n)
+
+    policy = np.zeros(env.observation_space.n, dtype=np.int64)
+    V = np.zeros(env.observation_space.n)
+    evaluation_sweeps = 0
+    stable = False
+    iteration = 0
+
+    while iteration < max_iterations and not stable:
+        iteration += 1
+
+        # Politika değerlendirme
+        policy_next = next_state[policy, states]
+        policy_reward = reward[policy, states]
+        policy_discount = discount[policy, states]
+        delta = np.inf
+        while delta > tol:
+            evaluation_sweeps += 1
+            V_new = policy_reward + policy_discount * V[policy_next]
+            delta = np.max(np.abs(V_new - V))
+            V = V_new
+
+        # Politika iyileştirme
+        Q = reward + discount * V[next_state]
+        new_policy = np.argmax(Q, axis=0)
+        # Eşitlikte mevcut aksiyonu koru (sonsuz salınımı önler)
+        keep = Q[policy, states] >= Q[new_policy, states]
+        new_policy[keep] = policy[keep]
+        stable = np.array_equal(new_policy, policy)
+        policy = new_policy
+
+    Q = np.ascontiguousarray(Q.T)
+    return Q, {'iterations': iteration, 'evaluation_sweeps': evaluation_sweeps,
+               'delta': delta, 'converged': stable}
+
+
+def solve_qtable(method="value-iteration", gamma=0.98, tol=1e-6, max_iterations=10000,
+                 compact=False, dtype=np.float64):
+    """
+    Model tabanlı çözücüyü çalıştır, raporla ve Q-table'ı kaydet.
+    compact/dtype verilirse Q-table kaydetmeden önce indirgenir.
+    """
+    solvers = {
+        'value-iteration': value_iteration,
+        'policy-iteration': policy_iteration,
+    }
+
+    print("=" * 60)
+    print(f"MODEL TABANLI ÇÖZÜM: {method}")
+    print("=" * 60)
+    print(f"Gamma (indirim faktörü): {gamma}")
+    print(f"Tolerans: {tol}")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    Q, info = solvers[method](gamma=gamma, tol=tol, max_iterations=max_iterations)
+    elapsed = time.perf_counter() - start
+
+    print(f"İterasyon sayısı: {info['iterations']}")
+    if 'evaluation_sweeps' in info:
+        print(f"Değerlendirme taraması: {info['evaluation_sweeps']}")
+    print(f"Son değişim (delta): {info['delta']:.3e}")
+    print(f"Yakınsadı: {'Evet' if info['converged'] else 'Hayır'}")
+    print(f"Süre: {elapsed:.2f} sn")
+    print("=" * 60)
+
+    if compact:
+        Q = CustomTaxiEnv().compact_q_table(Q, dtype)
+    else:
+        Q = Q.astype(dtype)
+
+    save_q_table(Q)
+    return Q, info
+
+
 if __name__ == "__main__":
-    # Eğitimi başlat - iyileştirilmiş parametreler
-    Q, stats = train_qtable(
-        episodes=100000,     # Daha fazla episode (önceden 50000)
-        alpha=0.15,          # Daha hızlı öğrenme (önceden 0.1)
-        gamma=0.98,          # Gelecek ödüllere daha fazla önem (önceden 0.95)
-        epsilon_start=1.0,   # %100 exploration ile başla
-        epsilon_end=0.01,    # %1 exploration'a kadar düş
-        epsilon_decay=0.9995, # Daha yavaş azalma (önceden 0.995)
-        save_interval=10000  # Her 10K'da rapor (önceden 5000)
-    )
-    
+    parser = argparse.ArgumentParser(description="Taksi Q-table eğitimi")
+    parser.add_argument("--method", default="q-learning",
+                        choices=["q-learning", "hogwild", "actor-learner", "vectorized", "dyna",
+                                 "prioritized-sweeping", "compare-planning",
+                                 "value-iteration", "policy-iteration"])
+    parser.add_argument("--episodes", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Hogwild işçi sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--actors", type=int, default=None,
+                        help="Aktör–öğrenici: aktör süreç sayısı (varsayılan: CPU sayısı - 1)")
+    parser.add_argument("--ring-capacity", type=int, default=8192,
+                        help="Aktör–öğrenici: aktör başına geçiş halkası kapasitesi")
+    parser.add_argument("--publish-interval", type=int, default=4096,
+                        help="Aktör–öğrenici: kaç geçişte bir politika yayımlanacağı")
+    parser.add_argument("--replay-ratio", type=float, default=8,
+                        help="Aktör–öğrenici: alınan geçiş başına replay geçişi")
+    parser.add_argument("--num-envs", type=int, default=256,
+                        help="Vektörel eğitimde paralel ortam sayısı")
+    parser.add_argument("--duplicates", default="sequential",
+                        choices=["sequential", "average"],
+                        help="Vektörel eğitimde tekrar eden (state, action) semantiği")
+    parser.add_argument("--planning-steps", type=int, default=10,
+                        help="Dyna/öncelikli tarama: gerçek adım başına planlama güncellemesi")
+    parser.add_argument("--planning-alpha", type=float, default=1.0,
+                        help="Planlama güncellemelerinin öğrenme oranı (model deterministik; "
+                             "train_qtable_planning varsayılanıyla aynı)")
+    parser.add_argument("--target-success", type=float, default=95.0,
+                        help="Planlamalı eğitimde hedef açgözlü başarı oranı (%%)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--compact", action="store_true",
+                        help="Q-table'ı yalnızca erişilebilir state'lerle kaydet")
+    parser.add_argument("--dtype", default="float64",
+                        choices=["float64", "float32", "float16"],
+                        help="Q-table veri tipi (float16 yalnızca çözücü çıktıları için)")
+    parser.add_argument("--storage", default="dense", choices=["dense", "sparse"],
+                        help="Q-table depolaması (sparse: yalnızca ziyaret edilen state'ler)")
+    parser.add_argument("--grid-size", type=int, default=6,
+                        help="Ortam grid boyutu (q-learning)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Eğitim döngüsünü faz bazlı profille")
+    parser.add_argument("--replay", default=None, choices=["uniform", "prioritized"],
+                        help="Deneyim tekrarı (q-learning; actor-learner'da varsayılan uniform)")
+    parser.add_argument("--replay-capacity", type=int, default=100000,
+                        help="Replay tamponu kapasitesi (geçiş)")
+    parser.add_argument("--replay-batch-size", type=int, default=256,
+                        help="Replay grubu boyutu")
+    parser.add_argument("--replay-interval", type=int, default=8,
+                        help="Kaç ortam adımında bir replay yapılacağı")
+    parser.add_argument("--early-stop", action="store_true",
+                        help="Yakınsama eşikleri sağlanınca eğitimi durdur (q-learning)")
+    parser.add_argument("--adaptive-epsilon", action="store_true",
+                        help="Epsilon'u yakınsama ölçümleriyle uyarla (q-learning)")
+    parser.add_argument("--convergence-window", type=int, default=1000,
+                        help="Yakınsama ölçüm penceresi (episode)")
+    parser.add_argument("--patience", type=int, default=3,
+                        help="Eşiklerin sağlanması gereken ardışık pencere sayısı")
+    parser.add_argument("--min-success", type=float, default=99.0,
+                        help="Yakınsama için en düşük açgözlü başarı oranı (%%)")
+    parser.add_argument("--max-policy-change", type=float, default=0.005,
+                        help="Yakınsama için pencere başına en fazla politika değişimi oranı")
+    parser.add_argument("--max-q-change", type=float, default=None,
+                        help="Yakınsama için pencere başına en fazla |ΔQ|")
+    parser.add_argument("--mean-q-change", type=float, default=None,
+                        help="Yakınsama için pencere başına en fazla ortalama |ΔQ|")
+    parser.add_argument("--checkpoint-delta", action="store_true",
+                        help="Ara kayıtlarda yalnızca değişen satırları yaz")
+    parser.add_argument("--resume", default=None, metavar="PATH|latest",
+                        help="Ara kayıttan devam et (q-learning); 'latest' = dizindeki son kayıt. "
+                             "Hiperparametreler kayıttan alınır")
+    parser.add_argument("--gamma", type=float, default=0.98)
+    parser.add_argument("--tol", type=float, default=1e-6,
+                        help="Model tabanlı çözücüler için yakınsama toleransı")
+    parser.add_argument("--max-iterations", type=int, default=10000,
+                        help="Model tabanlı çözücüler için maksimum iterasyon")
+    args = parser.parse_args()
+
+    if args.method == "q-learning":
+        resume_from = args.resume
+        if resume_from == "latest":
+            resume_from = latest_trainer_state()
+            if resume_from is None:
+                print("HATA: Devam edilecek ara kayıt bulunamadı (q_table_checkpoint_*.state.npz)")
+                sys.exit(2)
+        monitor = None
+        if resume_from is None and (args.early_stop or args.adaptive_epsilon):
+            monitor = ConvergenceMonitor(window=args.convergence_window,
+                                         patience=args.patience,
+                                         min_success=args.min_success,
+                                         max_policy_change=args.max_policy_change,
+                                         max_q_change=args.max_q_change,
+                                         mean_q_change=args.mean_q_change)
+        # Eğitimi başlat - iyileştirilmiş parametreler
+        options = dict(
+            episodes=args.episodes,  # Daha fazla episode (önceden 50000)
+            alpha=0.15,          # Daha hızlı öğrenme (önceden 0.1)
+            gamma=args.gamma,    # Gelecek ödüllere daha fazla önem (önceden 0.95)
+            epsilon_start=1.0,   # %100 exploration ile başla
+            epsilon_end=0.01,    # %1 exploration'a kadar düş
+            epsilon_decay=0.9995, # Daha yavaş azalma (önceden 0.995)
+            save_interval=10000, # Her 10K'da rapor (önceden 5000)
+            compact=args.compact,
+            dtype=args.dtype,
+            checkpoint_delta=args.checkpoint_delta,
+            seed=args.seed,
+            profile=args.profile,
+            storage=args.storage,
+            grid_size=args.grid_size,
+            replay=args.replay,
+            replay_capacity=args.replay_capacity,
+            replay_batch_size=args.replay_batch_size,
+            replay_interval=args.replay_interval,
+            monitor=monitor,
+            early_stop=args.early_stop,
+            adaptive_epsilon=args.adaptive_epsilon
+        )
+        if resume_from is not None:
+            # Kayıtlı eğitimin hiperparametreleriyle devam (episodes komut satırından)
+            try:
+                saved = load_trainer_state(resume_from)['hyperparameters']
+            except (OSError, ValueError) as e:
+                print(f"HATA: {e}")
+                sys.exit(2)
+            options.update({name: value for name, value in saved.items() if name != 'episodes'})
+            options['resume_from'] = resume_from
+        try:
+            Q, stats = train_qtable(**options)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            sys.exit(2)
+    elif args.method == "hogwild":
+        Q, stats = train_qtable_parallel(
+            episodes=args.episodes,
+            workers=args.workers,
+            alpha=0.15,
+            gamma=args.gamma,
+            epsilon_start=1.0,
+            epsilon_end=0.01,
+            epsilon_decay=0.9995,
+            save_interval=10000,
+            seed=args.seed
+        )
+    elif args.method == "actor-learner":
+        Q, stats = train_qtable_actor_learner(
+            episodes=args.episodes,
+            actors=args.actors,
+            alpha=0.15,
+            gamma=args.gamma,
+            epsilon_start=1.0,
+            epsilon_end=0.01,
+            epsilon_decay=0.9995,
+            save_interval=10000,
+            ring_capacity=args.ring_capacity,
+            publish_interval=args.publish_interval,
+            replay=args.replay or "uniform",
+            replay_ratio=args.replay_ratio,
+            replay_capacity=args.replay_capacity,
+            replay_batch_size=args.replay_batch_size,
+            seed=args.seed
+        )
+    elif args.method == "vectorized":
+        Q, stats = train_qtable_vectorized(
+            episodes=args.episodes,
+            num_envs=args.num_envs,
+            alpha=0.15,
+            gamma=args.gamma,
+            epsilon_start=1.0,
+            epsilon_end=0.01,
+            epsilon_decay=0.9995,
+            save_interval=10000,
+            duplicates=args.duplicates,
+            seed=args.seed
+        )
+    elif args.method in ("dyna", "prioritized-sweeping"):
+        Q, stats = train_qtable_planning(
+            episodes=args.episodes,
+            alpha=0.15,
+            gamma=args.gamma,
+            epsilon_start=1.0,
+            epsilon_end=0.01,
+            epsilon_decay=0.9995,
+            planning="dyna" if args.method == "dyna" else "prioritized",
+            planning_steps=args.planning_steps,
+            planning_alpha=args.planning_alpha,
+            target_success=args.target_success,
+            seed=args.seed
+        )
+    elif args.method == "compare-planning":
+        compare_planning(
+            episodes=args.episodes,
+            planning_steps=args.planning_steps,
+            planning_alpha=args.planning_alpha,
+            target_success=args.target_success,
+            seed=0 if args.seed is None else args.seed,
+            alpha=0.15,
+            gamma=args.gamma,
+            epsilon_decay=0.9995
+        )
+    else:
+        Q, info = solve_qtable(args.method, gamma=args.gamma, tol=args.tol,
+                               max_iterations=args.max_iterations,
+                               compact=args.compact, dtype=args.dtype)
+
     print("\nEğitim tamamlandı! Şimdi 'python run_taxi.py' ile test edebilirsiniz.")
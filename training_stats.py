@@ -0,0 +1,208 @@
+import numpy as np
+import json
+import os
+
+from checkpoint import atomic_save
+
+
+# Eğitim istatistik sütunları ve tipleri (episode başına bir satır)
+STATS_COLUMNS = {
+    'rewards': np.float32,
+    'steps': np.uint16,
+    'success': np.bool_,
+}
+
+
+class RollingMean:
+    """
+    Sabit pencereli hareketli ortalama (halka tampon)
+    Ekleme O(1); ortalama O(1). Toplam, tampon her başa döndüğünde
+    yeniden hesaplanır (kayan nokta birikim hatası sınırlı kalır).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = np.zeros(window)
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.total += value - self.values[self.index]
+        self.values[self.index] = value
+        self.count = min(self.count + 1, self.window)
+        self.index += 1
+        if self.index == self.window:
+            self.index = 0
+            self.total = float(self.values.sum())
+
+    def extend(self, values):
+        """Birden çok değeri tek seferde ekle"""
+        values = np.asarray(values, dtype=np.float64)[-self.window:]
+        positions = (self.index + np.arange(len(values))) % self.window
+        # Boş yuvalar 0 olduğundan üzerine yazılanı çıkarmak her zaman doğru
+        self.total += values.sum() - self.values[positions].sum()
+        self.values[positions] = values
+        self.count = min(self.count + len(values), self.window)
+        wrapped = self.index + len(values) >= self.window
+        self.index = (self.index + len(values)) % self.window
+        if wrapped:
+            self.total = float(self.values.sum())
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def get_state(self):
+        return {'values': self.values.copy(), 'index': self.index,
+                'count': self.count, 'total': self.total}
+
+    def set_state(self, state):
+        self.values = np.array(state['values'], dtype=np.float64)
+        self.window = len(self.values)
+        self.index = state['index']
+        self.count = state['count']
+        self.total = state['total']
+
+    def __len__(self):
+        return self.count
+
+
+class StatsWriter:
+    """
+    Sütunlu, parça parça diske yazılan eğitim istatistikleri
+
+    Her sütun chunk_size satırlık tiplenmiş .npy parçalarına yazılır
+    ({sütun}_{parça:05d}.npy); bellekte yalnızca bir parçalık tampon
+    tutulur. meta.json sütun tiplerini, satır sayısını ve
+    hiperparametreleri içerir. Okumak için StatsReader kullanılır.
+
+    start_row > 0 ise dizindeki mevcut istatistikler o satırda kesilir ve
+    yazma oradan devam eder (checkpoint'ten devam eden eğitim için; o ana
+    kadarki satırlar flush() ile diske yazılmış olmalıdır).
+    """
+
+    def __init__(self, directory, columns=None, chunk_size=65536, metadata=None, start_row=0):
+        self.directory = directory
+        self.columns = {name: np.dtype(dtype) for name, dtype in (columns or STATS_COLUMNS).items()}
+        self.chunk_size = chunk_size
+        self.metadata = metadata or {}
+
+        self._buffers = {name: np.zeros(chunk_size, dtype=dtype)
+                         for name, dtype in self.columns.items()}
+        self._position = 0
+        self.rows = 0
+        self._chunk = 0
+
+        os.makedirs(directory, exist_ok=True)
+        if start_row:
+            self._truncate(start_row)
+        self._write_meta()
+
+    def _truncate(self, rows):
+        """Diskteki ilk rows satırı koru, sonrasını sil; son parçayı tampona al"""
+        self._chunk, self._position = divmod(rows, self.chunk_size)
+        self.rows = rows
+        for name, buffer in self._buffers.items():
+            if self._position:
+                path = os.path.join(self.directory, f"{name}_{self._chunk:05d}.npy")
+                data = np.load(path, mmap_mode="r")
+                if len(data) < self._position:
+                    raise ValueError(f"{path}: {rows} satıra kadar istatistik yok")
+                buffer[:self._position] = data[:self._position]
+                del data
+
+            # Kesme noktasından sonraki parçalar yeniden yazılacak
+            chunk = self._chunk + (1 if self._position else 0)
+            while os.path.exists(os.path.join(self.directory, f"{name}_{chunk:05d}.npy")):
+                os.remove(os.path.join(self.directory, f"{name}_{chunk:05d}.npy"))
+                chunk += 1
+
+    def append(self, **values):
+        """Tek satır (episode) ekle"""
+        for name, buffer in self._buffers.items():
+            buffer[self._position] = values[name]
+        self._position += 1
+        self.rows += 1
+        if self._position == self.chunk_size:
+            self.flush()
+
+    def extend(self, **values):
+        """Aynı uzunlukta dizilerden birden çok satır ekle"""
+        count = len(values[next(iter(self.columns))])
+        offset = 0
+        while offset < count:
+            n = min(count - offset, self.chunk_size - self._position)
+            for name, buffer in self._buffers.items():
+                buffer[self._position:self._position + n] = values[name][offset:offset + n]
+            self._position += n
+            self.rows += n
+            offset += n
+            if self._position == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Tampondaki satırları geçerli parçaya yaz (parça dolduysa sonrakine geç)"""
+        if self._position == 0:
+            return
+        for name, buffer in self._buffers.items():
+            path = os.path.join(self.directory, f"{name}_{self._chunk:05d}.npy")
+            atomic_save(path, buffer[:self._position])
+        self._write_meta()
+
+        if self._position == self.chunk_size:
+            self._chunk += 1
+            self._position = 0
+
+    def _write_meta(self):
+        meta = {
+            'columns': {name: dtype.str for name, dtype in self.columns.items()},
+            'chunk_size': self.chunk_size,
+            'rows': self.rows,
+            'metadata': self.metadata,
+        }
+        tmp_path = os.path.join(self.directory, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.directory, "meta.json"))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class StatsReader:
+    """
+    StatsWriter dizinini oku; yalnızca istenen sütun ve episode aralığına
+    düşen parçalar (mmap ile) açılır.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.columns = {name: np.dtype(dtype) for name, dtype in meta['columns'].items()}
+        self.chunk_size = meta['chunk_size']
+        self.rows = meta['rows']
+        self.metadata = meta['metadata']
+
+    def column(self, name, start=0, stop=None):
+        """Sütunun [start, stop) episode aralığını döndür"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return np.zeros(0, dtype=self.columns[name])
+
+        parts = []
+        for chunk in range(start // self.chunk_size, (stop - 1) // self.chunk_size + 1):
+            chunk_start = chunk * self.chunk_size
+            data = np.load(os.path.join(self.directory, f"{name}_{chunk:05d}.npy"), mmap_mode="r")
+            parts.append(data[max(start - chunk_start, 0):stop - chunk_start])
+        return np.concatenate(parts)
+
+    def __len__(self):
+        return self.rows
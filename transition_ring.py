@@ -0,0 +1,243 @@
+import numpy as np
+import multiprocessing as mp
+import platform
+import time
+from multiprocessing import shared_memory
+
+
+# Halka tampondaki geçiş alanları ve tipleri
+TRANSITION_FIELDS = (
+    ('states', np.uint32),
+    ('actions', np.uint8),
+    ('rewards', np.float32),
+    ('next_states', np.uint32),
+    ('dones', np.bool_),
+    ('versions', np.uint32),   # geçişi üreten politikanın sürümü
+)
+
+# Başlık: head ve tail ayrı 64 baytlık önbellek satırlarında (false sharing olmasın)
+_HEAD, _TAIL = 0, 8
+_HEADER_BYTES = 128
+
+
+# x86'da (TSO) store'lar diğer çekirdeklere yazıldıkları sırayla görünür;
+# kilitsiz yol yalnızca burada güvenlidir
+STRONG_MEMORY_ORDER = platform.machine().lower() in ("x86_64", "amd64", "i386", "i686", "x86")
+
+
+def ordering_lock():
+    """
+    Paylaşılan sayaç yayımı için süreçler arası kilit; x86'da None
+
+    ARM, POWER gibi zayıf bellek modelli platformlarda başka bir çekirdek
+    ilerlemiş head'i kaydın kendisinden önce görebilir. Kilidi almak ve
+    bırakmak tam bellek bariyeri olduğundan, sayaçlar kilit altında
+    yazılıp okunduğunda sayaçtan önceki yazımlar karşı tarafa görünür.
+    """
+    return None if STRONG_MEMORY_ORDER else mp.Lock()
+
+
+def _aligned(offset, alignment=64):
+    return -(-offset // alignment) * alignment
+
+
+class TransitionRing:
+    """
+    Paylaşılan bellekte tek üretici / tek tüketici (SPSC) geçiş halkası
+
+    Kilit kullanılmaz: head yalnızca üretici (aktör), tail yalnızca tüketici
+    (öğrenici) tarafından yazılır. Üretici önce kaydı yazar, sonra head'i
+    ilerletir; tüketici head'i okuduktan sonra kayıtları okur, işi bitince
+    tail'i ilerletir. Sayaçlar sürekli artar (indeks = sayaç % capacity).
+    Her taraf karşı sayacın son okunan değerini önbellekte tutar; paylaşılan
+    başlık yalnızca önbellekteki değer yetmediğinde yeniden okunur.
+
+    Kilitsiz yazma sırası x86'nın TSO bellek modeline dayanır. lock
+    verilirse (ordering_lock(); iki tarafta da aynı kilit) başlık sayaçları
+    kilit altında yazılıp okunur ve sıra her platformda bariyerle sağlanır.
+
+    name=None ise yeni bir blok oluşturulur; aksi halde var olana bağlanılır.
+    """
+
+    def __init__(self, capacity, name=None, lock=None):
+        self.capacity = capacity
+        self._lock = lock
+        offsets = {}
+        size = _HEADER_BYTES
+        for field, dtype in TRANSITION_FIELDS:
+            offsets[field] = size
+            size = _aligned(size + capacity * np.dtype(dtype).itemsize)
+
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self._header = np.ndarray(_HEADER_BYTES // 8, dtype=np.int64, buffer=self.shm.buf)
+        for field, dtype in TRANSITION_FIELDS:
+            setattr(self, field, np.ndarray(capacity, dtype=dtype, buffer=self.shm.buf,
+                                            offset=offsets[field]))
+        if name is None:
+            self._header[:] = 0
+
+        # Yerel sayaçlar: kendi sayacımız ve karşı tarafın son görülen sayacı
+        self._head = self._load(_HEAD)
+        self._tail = self._load(_TAIL)
+
+    def _load(self, index):
+        if self._lock is None:
+            return int(self._header[index])
+        with self._lock:
+            return int(self._header[index])
+
+    def _store(self, index, value):
+        if self._lock is None:
+            self._header[index] = value
+        else:
+            with self._lock:
+                self._header[index] = value
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def __len__(self):
+        """Okunmayı bekleyen geçiş sayısı (iki taraftan da çağrılabilir)"""
+        return self._load(_HEAD) - self._load(_TAIL)
+
+    def push(self, state, action, reward, next_state, done, version):
+        """Tek geçiş yaz (üretici); halka doluysa False"""
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self._tail = self._load(_TAIL)
+            if head - self._tail >= self.capacity:
+                return False
+        i = head % self.capacity
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.versions[i] = version
+        self._head = head + 1
+        self._store(_HEAD, self._head)
+        return True
+
+    def push_wait(self, state, action, reward, next_state, done, version, sleep=1e-4):
+        """Yer açılana kadar bekleyerek yaz; bekleme (dolu halka) sayısını döndür"""
+        stalls = 0
+        while not self.push(state, action, reward, next_state, done, version):
+            stalls += 1
+            time.sleep(sleep)
+        return stalls
+
+    def read(self, max_count):
+        """
+        En fazla max_count geçişi kopyalamadan oku (tüketici)
+
+        Returns:
+            (count, states, actions, rewards, next_states, dones, versions);
+            diziler halka üzerinde görünümdür ve release(count) çağrılana
+            kadar geçerlidir. Halkanın sonunu aşan kısım sonraki okumaya
+            kalır (görünümler her zaman ardışık).
+        """
+        tail = self._tail
+        available = self._head - tail
+        if available < max_count:
+            self._head = self._load(_HEAD)
+            available = self._head - tail
+        start = tail % self.capacity
+        count = min(available, max_count, self.capacity - start)
+        stop = start + count
+        return (count, self.states[start:stop], self.actions[start:stop],
+                self.rewards[start:stop], self.next_states[start:stop],
+                self.dones[start:stop], self.versions[start:stop])
+
+    def release(self, count):
+        """Okunan geçişlerin yerini üreticiye geri ver"""
+        self._tail += count
+        self._store(_TAIL, self._tail)
+
+    def close(self):
+        for field, _ in TRANSITION_FIELDS:
+            setattr(self, field, None)
+        self._header = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+class SharedPolicy:
+    """
+    Paylaşılan bellekte açgözlü politika tablosu (state -> aksiyon, uint8)
+
+    Tek yazıcı (öğrenici) publish() ile yeni sürüm yayımlar; okuyucular
+    (aktörler) read() ile yerel kopyalarını yeniler. Kilit yerine sıra
+    sayacı (seqlock) kullanılır: yazım sürerken sayaç tektir, okuyucu
+    kopyalama sırasında sayaç değiştiyse okumayı tekrarlar. Seqlock da
+    x86'nın yazma sırasına dayanır; lock verilirse (ordering_lock())
+    yayım ve kopyalama kilit altında yapılır.
+    """
+
+    def __init__(self, n_states, name=None, lock=None):
+        self.n_states = n_states
+        self._lock = lock
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None,
+                                              size=_HEADER_BYTES + n_states)
+        self._header = np.ndarray(2, dtype=np.int64, buffer=self.shm.buf)
+        self.actions = np.ndarray(n_states, dtype=np.uint8, buffer=self.shm.buf,
+                                  offset=_HEADER_BYTES)
+        if name is None:
+            self._header[:] = 0
+            self.actions[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def version(self):
+        if self._lock is None:
+            return int(self._header[1])
+        with self._lock:
+            return int(self._header[1])
+
+    def publish(self, actions):
+        """Yeni politikayı yaz; yeni sürüm numarasını döndür"""
+        if self._lock is not None:
+            with self._lock:
+                self.actions[:] = actions
+                self._header[1] += 1
+                return int(self._header[1])
+
+        self._header[0] += 1
+        self.actions[:] = actions
+        self._header[1] += 1
+        self._header[0] += 1
+        return int(self._header[1])
+
+    def read(self, out):
+        """Tutarlı bir kopyayı out'a al; kopyanın sürümünü döndür"""
+        if self._lock is not None:
+            with self._lock:
+                np.copyto(out, self.actions)
+                return int(self._header[1])
+
+        while True:
+            sequence = int(self._header[0])
+            if sequence & 1:
+                time.sleep(0)   # yazıcıya işlemci bırak
+                continue
+            version = int(self._header[1])
+            np.copyto(out, self.actions)
+            if int(self._header[0]) == sequence:
+                return version
+
+    def close(self):
+        self._header = None
+        self.actions = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()